@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Phân tích file telemetry (logs/telemetry.jsonl) do EnhancedAutomationWorker ghi:
+thời gian p50/p95/p99 theo site và giai đoạn, tỉ lệ lỗi và phần trăm thời gian chạy mỗi giai đoạn chiếm.
+
+Ví dụ:
+    python analyze_telemetry.py
+    python analyze_telemetry.py --site shopee --since 24
+    python analyze_telemetry.py logs/telemetry.jsonl --by proxy
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from collections import defaultdict
+
+DEFAULT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "telemetry.jsonl")
+
+
+def load_events(paths, since_hours=None, site=None, task=None):
+    """Đọc các sự kiện hợp lệ (bỏ qua dòng hỏng, vd dòng cuối đang ghi dở)"""
+    cutoff = time.time() - since_hours * 3600 if since_hours else None
+    events = []
+    for path in paths:
+        with open(path, encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(event, dict) or "phase" not in event or "ms" not in event:
+                    continue
+                if cutoff and event.get("ts", 0) < cutoff:
+                    continue
+                if site and event.get("site") != site:
+                    continue
+                if task and event.get("task") != task:
+                    continue
+                events.append(event)
+    return events
+
+
+def percentile(sorted_values, q):
+    """Phân vị q (0-100) nội suy tuyến tính trên list đã sắp xếp"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q / 100.0
+    low = int(position)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (position - low)
+
+
+def summarize(events, by="site"):
+    """Thống kê theo (nhóm, giai đoạn): số lần, tỉ lệ lỗi, p50/p95/p99/max, tổng thời gian"""
+    durations = defaultdict(list)
+    failures = defaultdict(int)
+    for event in events:
+        key = (str(event.get(by) or "-"), event["phase"])
+        durations[key].append(float(event["ms"]))
+        if event.get("outcome") not in ("ok", "fallback", "last_page"):
+            failures[key] += 1
+
+    # Tổng thời gian các lần chạy của từng nhóm, để tính phần trăm mỗi giai đoạn chiếm
+    run_totals = defaultdict(float)
+    for (group, phase), values in durations.items():
+        if phase == "run":
+            run_totals[group] += sum(values)
+
+    rows = []
+    for (group, phase), values in durations.items():
+        values.sort()
+        total = sum(values)
+        rows.append({
+            "group": group,
+            "phase": phase,
+            "count": len(values),
+            "error_rate": failures[(group, phase)] / len(values),
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99),
+            "max": values[-1],
+            "total_s": total / 1000.0,
+            "share": total / run_totals[group] if run_totals.get(group) and phase != "run" else None,
+        })
+    rows.sort(key=lambda row: (row["group"], row["phase"] != "run", -row["total_s"]))
+    return rows
+
+
+def print_report(rows, by="site"):
+    header = f"{by:<14} {'phase':<18} {'count':>7} {'err%':>6} {'p50 ms':>9} {'p95 ms':>9} " \
+             f"{'p99 ms':>9} {'max ms':>9} {'total s':>9} {'% run':>6}"
+    print(header)
+    print("-" * len(header))
+    previous = None
+    for row in rows:
+        if previous is not None and row["group"] != previous:
+            print()
+        previous = row["group"]
+        share = f"{row['share'] * 100:5.1f}%" if row["share"] is not None else "     -"
+        print(f"{row['group'][:14]:<14} {row['phase'][:18]:<18} {row['count']:>7} "
+              f"{row['error_rate'] * 100:5.1f}% {row['p50']:>9.0f} {row['p95']:>9.0f} "
+              f"{row['p99']:>9.0f} {row['max']:>9.0f} {row['total_s']:>9.1f} {share}")
+
+
+def parse_arguments():
+    """Phân tích đối số dòng lệnh"""
+    parser = argparse.ArgumentParser(description="Thống kê thời gian từng giai đoạn của các task tự động hóa")
+    parser.add_argument("files", nargs="*", default=[DEFAULT_FILE],
+                        help="File telemetry JSONL (mặc định: logs/telemetry.jsonl)")
+    parser.add_argument("--by", default="site", choices=["site", "task", "proxy", "thread"],
+                        help="Nhóm kết quả theo trường này (mặc định: site)")
+    parser.add_argument("--site", help="Chỉ lấy một site (google, shopee, facebook)")
+    parser.add_argument("--task", help="Chỉ lấy một task (google, google_batch, shopee, facebook)")
+    parser.add_argument("--since", type=float, help="Chỉ lấy sự kiện trong N giờ gần nhất")
+    parser.add_argument("--json", action="store_true", help="In kết quả dạng JSON")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    missing = [path for path in args.files if not os.path.exists(path)]
+    if missing:
+        print(f"Không tìm thấy file: {', '.join(missing)}")
+        sys.exit(1)
+
+    events = load_events(args.files, args.since, args.site, args.task)
+    if not events:
+        print("Không có sự kiện telemetry nào phù hợp")
+        sys.exit(0)
+
+    rows = summarize(events, args.by)
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+    else:
+        runs = len({event.get("run") for event in events})
+        print(f"📊 {len(events)} sự kiện từ {runs} lần chạy\n")
+        print_report(rows, args.by)
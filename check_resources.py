@@ -52,9 +52,17 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 import time
 
+try:
+    # Dùng ChromeDriver đã cache khi chạy trong ứng dụng
+    from modules.driver_resolver import resolve_chromedriver
+except ImportError:
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    def resolve_chromedriver(browser_path=None):
+        return ChromeDriverManager().install()
+
 def run(main_window=None):
     """
     Hàm chạy script - sẽ được gọi bởi ứng dụng chính
@@ -67,7 +75,7 @@ def run(main_window=None):
     options = Options()
     options.add_argument("--start-maximized")
     
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    driver = webdriver.Chrome(service=Service(resolve_chromedriver()), options=options)
     
     try:
         # Mở Google
@@ -5,7 +5,8 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from webdriver_manager.chrome import ChromeDriverManager
+from modules.driver_resolver import resolve_chromedriver
+from modules.waits import wait_until, document_ready, element_present, min_children, staleness_of
 
 def direct_brave_search():
     """Khởi động Brave trực tiếp và tìm kiếm Google"""
@@ -21,9 +22,9 @@ def direct_brave_search():
         
     print(f"✅ Đã tìm thấy Brave tại: {brave_path}")
     
-    # Thiết lập ChromeDriver
+    # Thiết lập ChromeDriver (cache theo major version của Brave)
     print("Thiết lập ChromeDriver...")
-    chromedriver_path = ChromeDriverManager().install()
+    chromedriver_path = resolve_chromedriver(brave_path)
     
     # Thiết lập options
     print("Cấu hình options cho Brave...")
@@ -55,18 +56,18 @@ def direct_brave_search():
         print("Đang truy cập Google...")
         driver.get("https://www.google.com")
         
-        # Chờ trang load
-        time.sleep(2)
+        # Chờ ô tìm kiếm
+        search_box = wait_until(driver, element_present((By.NAME, "q")))
         
         # Tìm kiếm
         print("Đang tìm kiếm...")
-        search_box = driver.find_element(By.NAME, "q")
         search_box.clear()
         search_box.send_keys("brave browser selenium")
         search_box.send_keys(Keys.RETURN)
         
         # Chờ kết quả
-        time.sleep(3)
+        wait_until(driver, staleness_of(search_box))
+        wait_until(driver, min_children((By.ID, "search"), 1))
         
         # Lấy tiêu đề trang
         print(f"Tiêu đề trang: {driver.title}")
@@ -74,7 +75,7 @@ def direct_brave_search():
         # Kiểm tra xem có sử dụng Brave không
         print("Kiểm tra thông tin trình duyệt...")
         driver.get("chrome://version")
-        time.sleep(3)
+        wait_until(driver, document_ready())
         
         page_source = driver.page_source.lower()
         if "brave" in page_source:
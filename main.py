@@ -4,7 +4,6 @@ import logging
 import traceback
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtCore import Qt, QSettings
-import datetime
 
 # Thiết lập đường dẫn cơ sở
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -13,36 +12,15 @@ sys.path.insert(0, BASE_DIR)
 # Import cấu hình
 from modules.config import (
     APP_NAME, APP_VERSION, ORGANIZATION_NAME, 
-    LOGS_DIR, APP_ICON, LOG_FORMAT, LOG_DATE_FORMAT,
+    APP_ICON,
     BRAVE_PATH, BRAVE_PROFILE_PATH, BRAVE_OPTIONS
 )
 
 def setup_logging():
-    """Thiết lập logging cho ứng dụng"""
+    """Thiết lập logging cho ứng dụng (ghi log qua hàng đợi, không chặn thread gọi)"""
     try:
-        if not os.path.exists(LOGS_DIR):
-            os.makedirs(LOGS_DIR)
-            
-        today = datetime.datetime.now().strftime('%Y-%m-%d')
-        log_file = os.path.join(LOGS_DIR, f'app_{today}.log')
-        
-        # Cấu hình logging
-        logging.basicConfig(
-            level=logging.INFO,
-            format=LOG_FORMAT,
-            datefmt=LOG_DATE_FORMAT,
-            handlers=[
-                logging.FileHandler(log_file, encoding='utf-8'),
-                logging.StreamHandler()
-            ]
-        )
-        
-        # Điều chỉnh level cho các logger cụ thể
-        logging.getLogger('urllib3').setLevel(logging.WARNING)
-        logging.getLogger('selenium').setLevel(logging.WARNING)
-        logging.getLogger('webdriver_manager').setLevel(logging.INFO)
-        
-        return logging.getLogger()
+        from modules.utils.logger import setup_logging as setup_queue_logging
+        return setup_queue_logging(logging.INFO)
     except Exception as e:
         print(f"Lỗi khi thiết lập logging: {e}")
         return None
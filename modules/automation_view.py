@@ -12,14 +12,17 @@ import traceback
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QTabWidget, QLineEdit, 
                              QCheckBox, QHBoxLayout, QPushButton, QProgressBar,
-                             QTextEdit, QTableWidget, QTableWidgetItem, QFormLayout,
-    QApplication, QHeaderView, QFileDialog
+                             QTableWidget, QTableWidgetItem, QFormLayout,
+    QApplication, QHeaderView, QFileDialog, QSpinBox
 )
 from PyQt5.QtGui import QFont, QIcon, QColor, QTextCursor, QBrush
 from PyQt5.QtCore import Qt, pyqtSignal, QThread, QSettings, QDateTime
 
-from modules.config import DEFAULT_THEME, THEMES, BRAVE_OPTIONS
+from modules.config import DEFAULT_THEME, THEMES, BRAVE_OPTIONS, LEAN_PAGE_ENABLED
 from modules.automation_worker import EnhancedAutomationWorker
+from modules.browser_pool import get_browser_pool
+from modules.proxy_pool import get_proxy_pool
+from modules.log_console import LogConsole
 
 class AutomationView(QWidget):
     log_signal = pyqtSignal(str)
@@ -111,10 +114,25 @@ class AutomationView(QWidget):
         form_layout.setLabelAlignment(Qt.AlignRight)
 
         self.google_keyword = QLineEdit(self.settings.value("google_keyword", "selenium python automation"))
-        self.google_keyword.setPlaceholderText("Nhập từ khoá (vd: học tiếng anh)")
+        self.google_keyword.setPlaceholderText("Nhập từ khoá (vd: học tiếng anh), chế độ batch: cách nhau bởi ;")
         self.google_keyword.setFont(QFont("Segoe UI", 11))
         form_layout.addRow("Từ khoá:", self.google_keyword)
 
+        # Chế độ batch: nhiều từ khóa chạy song song trên nhiều trình duyệt
+        batch_layout = QHBoxLayout()
+        self.google_batch = QCheckBox("Tìm nhiều từ khóa (batch)")
+        self.google_batch.setChecked(self.settings.value("google_batch", False, type=bool))
+        batch_layout.addWidget(self.google_batch)
+        batch_layout.addWidget(QLabel("Số trình duyệt song song:"))
+        self.google_concurrency = QSpinBox()
+        self.google_concurrency.setRange(1, 8)
+        self.google_concurrency.setValue(self.settings.value("google_concurrency", 2, type=int))
+        self.google_concurrency.setEnabled(self.google_batch.isChecked())
+        self.google_batch.toggled.connect(self.google_concurrency.setEnabled)
+        batch_layout.addWidget(self.google_concurrency)
+        batch_layout.addStretch()
+        form_layout.addRow("Batch:", batch_layout)
+
         # Ensure google_max_results is a string
         max_results_value = self.settings.value("google_max_results", "10")
         if not isinstance(max_results_value, str):
@@ -263,12 +281,22 @@ class AutomationView(QWidget):
 
         self.export_btn = QPushButton("Xuất CSV")
         self.export_btn.setIcon(QIcon("resources/icons/export.png"))
+
+        # Chế độ nhanh: thử tải HTML bằng HTTP trước, chỉ mở trình duyệt khi trang cần JavaScript/captcha
+        self.fast_mode_cb = QCheckBox("Chế độ nhanh (HTTP trước)")
+        self.fast_mode_cb.setChecked(self.settings.value("fast_mode", False, type=bool))
+
+        # Trang nhẹ: chặn ảnh, font, video và quảng cáo/analytics khi thu thập bằng trình duyệt
+        self.lean_page_cb = QCheckBox("Trang nhẹ (chặn ảnh/quảng cáo)")
+        self.lean_page_cb.setChecked(self.settings.value("lean_page", LEAN_PAGE_ENABLED, type=bool))
         
         btn_layout.addWidget(self.start_btn)
         btn_layout.addWidget(self.stop_btn)
         btn_layout.addWidget(self.reset_btn)
         btn_layout.addWidget(self.export_btn)
         btn_layout.addStretch()
+        btn_layout.addWidget(self.fast_mode_cb)
+        btn_layout.addWidget(self.lean_page_cb)
         
         self.start_btn.clicked.connect(self.start_automation)
         self.stop_btn.clicked.connect(self.stop_automation)
@@ -282,8 +310,7 @@ class AutomationView(QWidget):
 
         log_tab = QWidget()
         log_layout = QVBoxLayout(log_tab)
-        self.log_console = QTextEdit()
-        self.log_console.setReadOnly(True)
+        self.log_console = LogConsole()
         self.log_console.setFont(QFont("Consolas", 11))
         log_layout.addWidget(self.log_console)
         output_tabs.addTab(log_tab, "Logs")
@@ -308,35 +335,22 @@ class AutomationView(QWidget):
         # Determine display format based on message level
         if level == "error":
             message = f"❌ {message}"
-            color = "#e74c3c"  # Red
         elif level == "warning":
             message = f"⚠️ {message}"
-            color = "#f39c12"  # Yellow/Orange
         elif level == "success":
             message = f"✅ {message}"
-            color = "#2ecc71"  # Green
-        else:
-            # Regular info message
-            color = "#3498db"  # Blue
             
-        # Format the log message with timestamp
-        formatted_msg = f"[{now}] {message}"
-        
-        # Add to log widget with appropriate color
-        self.log_console.append(f'<span style="color: {color};">{formatted_msg}</span>')
-        
-        # Ensure the latest message is visible (scroll to bottom)
-        self.log_console.verticalScrollBar().setValue(
-            self.log_console.verticalScrollBar().maximum()
-        )
+        # Buffer in the log console (flushed to the widget in batches)
+        self.log_console.write(message, now)
         
         # Also print to console for debugging
-        print(formatted_msg)
+        print(f"[{now}] {message}")
 
     # ---------------- HANDLERS ----------------
     def update_proxies(self, proxies):
         """Update proxy list"""
         self.active_proxies = proxies
+        get_proxy_pool().update(proxies)
         
         # Cập nhật trạng thái checkbox sử dụng proxy
         if hasattr(self, 'use_proxies_cb'):
@@ -357,6 +371,7 @@ class AutomationView(QWidget):
         self.results_table.setRowCount(0)
         self.log_console.clear()
         self.progress.setValue(0)
+        self.progress.setFormat("%p%")
         
         current_tab = self.tabs.currentIndex()
         
@@ -378,9 +393,17 @@ class AutomationView(QWidget):
         # Kiểm tra proxy
         proxy = None
         if hasattr(self, 'use_proxies_cb') and self.use_proxies_cb.isChecked() and self.active_proxies:
-            import random
-            proxy = random.choice(self.active_proxies)
-            self.log_message(f"Đang sử dụng proxy: {proxy}", "info")
+            # Chọn proxy theo điểm (tỉ lệ thành công, latency), bỏ qua proxy đang bị ngắt mạch
+            proxy = get_proxy_pool().choose()
+            if proxy:
+                self.log_message(f"Đang sử dụng proxy: {proxy}", "info")
+            else:
+                self.log_message("Tất cả proxy đang tạm ngưng do lỗi, chạy không dùng proxy", "warning")
+
+        fast_mode = self.fast_mode_cb.isChecked()
+        self.settings.setValue("fast_mode", fast_mode)
+        lean_page = self.lean_page_cb.isChecked()
+        self.settings.setValue("lean_page", lean_page)
         
         # Thiết lập worker dựa trên tab hiện tại
         if current_tab == 0:  # Google tab
@@ -390,23 +413,49 @@ class AutomationView(QWidget):
                 return
                 
             headless = self.google_headless.isChecked()
+            batch = self.google_batch.isChecked()
+            concurrency = self.google_concurrency.value()
             
             # Lưu cài đặt
             self.settings.setValue("google_keyword", keyword)
             self.settings.setValue("google_headless", headless)
+            self.settings.setValue("google_batch", batch)
+            self.settings.setValue("google_concurrency", concurrency)
             
-            self.worker = EnhancedAutomationWorker(
-                task="google",
-                keyword=keyword,
-                headless=headless,
-                proxy=proxy,
-                max_results=int(self.google_max_results.text() or 10),
-                chrome_config=chrome_config
-            )
-            
-            # Chuẩn bị bảng kết quả
-            self.results_table.setColumnCount(3)
-            self.results_table.setHorizontalHeaderLabels(["STT", "Tiêu đề", "URL"])
+            if batch:
+                keywords = [k.strip() for k in keyword.split(";") if k.strip()]
+                self.worker = EnhancedAutomationWorker(
+                    task="google_batch",
+                    keywords=keywords,
+                    concurrency=concurrency,
+                    fast_mode=fast_mode,
+                    lean_page=lean_page,
+                    headless=headless,
+                    proxy=proxy,
+                    max_results=int(self.google_max_results.text() or 10),
+                    chrome_config=chrome_config
+                )
+                self.worker.keyword_result_signal.connect(self.on_keyword_results)
+                self.worker.throughput_signal.connect(self.on_throughput)
+                
+                # Chuẩn bị bảng kết quả
+                self.results_table.setColumnCount(4)
+                self.results_table.setHorizontalHeaderLabels(["Từ khóa", "Tiêu đề", "URL", "Nguồn"])
+            else:
+                self.worker = EnhancedAutomationWorker(
+                    task="google",
+                    keyword=keyword,
+                    fast_mode=fast_mode,
+                    lean_page=lean_page,
+                    headless=headless,
+                    proxy=proxy,
+                    max_results=int(self.google_max_results.text() or 10),
+                    chrome_config=chrome_config
+                )
+                
+                # Chuẩn bị bảng kết quả
+                self.results_table.setColumnCount(3)
+                self.results_table.setHorizontalHeaderLabels(["STT", "Tiêu đề", "URL"])
             
         elif current_tab == 1:  # Facebook tab
             email = self.fb_email.text().strip()
@@ -455,6 +504,8 @@ class AutomationView(QWidget):
             self.worker = EnhancedAutomationWorker(
                 task="shopee",
                 keyword=keyword,
+                fast_mode=fast_mode,
+                lean_page=lean_page,
                 proxy=proxy,
                 headless=headless,
                 pages=pages,
@@ -491,6 +542,13 @@ class AutomationView(QWidget):
         else:
             self.log_message("Không có tiến trình nào đang chạy.")
 
+    def cleanup(self):
+        """Dừng worker đang chạy và đóng toàn bộ trình duyệt trong pool (gọi khi thoát ứng dụng)"""
+        if self.worker and self.worker.isRunning():
+            self.worker.stop()
+            self.worker.wait(5000)
+        get_browser_pool().close_all()
+
     def on_worker_finished(self):
         """Handle worker thread finished"""
         self.log_message("✅ Task completed")
@@ -566,14 +624,35 @@ class AutomationView(QWidget):
         self.export_btn.setEnabled(False)
         self.log_message("Đã làm mới giao diện.", "info")
 
+    def on_keyword_results(self, keyword, results):
+        """Thêm kết quả của một từ khóa (chế độ batch) vào bảng ngay khi có"""
+        self.log_message(f"🔍 {keyword}: {len(results)} kết quả")
+        for title, url, source in results:
+            row = self.results_table.rowCount()
+            self.results_table.insertRow(row)
+            self.results_table.setItem(row, 0, QTableWidgetItem(keyword))
+            self.results_table.setItem(row, 1, QTableWidgetItem(title))
+            self.results_table.setItem(row, 2, QTableWidgetItem(url))
+            self.results_table.setItem(row, 3, QTableWidgetItem(source))
+        if results:
+            self.export_btn.setEnabled(True)
+
+    def on_throughput(self, keywords_per_minute):
+        """Hiển thị tốc độ batch hiện tại trên thanh tiến trình"""
+        self.progress.setFormat(f"%p% - {keywords_per_minute:.1f} từ khóa/phút")
+
     def on_results(self, results):
         """Handle worker results"""
-        self.log_message(f"✅ Task completed with results: {results}")
+        # Kết quả dạng dict (vd google_batch) chỉ ghi số lượng theo từng khóa bên dưới, không in toàn bộ
+        if isinstance(results, dict):
+            self.log_message(f"✅ Task completed with results for {len(results)} keys")
+        else:
+            self.log_message(f"✅ Task completed with results: {results}")
         
         # Format the results for display
         if isinstance(results, dict):
             for key, value in results.items():
-                if isinstance(value, list) and len(value) > 0:
+                if isinstance(value, (list, tuple)):
                     self.log_message(f"- {key}: Found {len(value)} items")
                 else:
                     self.log_message(f"- {key}: {value}")
@@ -993,7 +1072,7 @@ class AutomationView(QWidget):
                     border-radius: 4px;
                     padding: 5px;
                 }}
-                QTextEdit {{
+                QPlainTextEdit {{
                     background-color: {theme["bg_secondary"]};
                     color: {theme["text_primary"]};
                     border: 1px solid {theme["border"]};
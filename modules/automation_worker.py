@@ -1,9 +1,13 @@
 import time
 import os
+import logging
 import urllib.parse
 import random
+import queue
+import threading
 import subprocess
 import shutil
+from contextlib import nullcontext
 from datetime import datetime
 
 from PyQt5.QtCore import QThread, pyqtSignal
@@ -14,16 +18,36 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 
-# Webdriver-manager
-from webdriver_manager.chrome import ChromeDriverManager
 # Thêm thư viện cho việc xác định phiên bản Chromium
 from packaging import version
 
+from .browser_pool import PoolKey, get_browser_pool
+from .driver_resolver import resolve_chromedriver
+from .dom_extractor import extract_tuples, GOOGLE_RESULT_SPEC, SHOPEE_PRODUCT_SPEC
+from .http_fetcher import get_http_fetcher
+from .proxy_pool import get_proxy_pool
+from .result_store import TASK_FIELDS, get_result_store
+from . import telemetry
+from .lean_page import apply_lean_page
+from .shopee_api import ShopeeNetworkCapture, enable_capture, parse_search_items, has_more, request_limit
+from .config import SHOPEE_NETWORK_CAPTURE
+from .waits import (
+    wait_until, wait_optional, wait_for_page_load, install_network_tracker,
+    any_of, element_present, element_clickable, min_children, dom_stable,
+    network_idle, url_changed, staleness_of
+)
+
+logger = logging.getLogger(__name__)
+
 # Google URL mặc định
 GOOGLE_URL = "https://www.google.com"
+GOOGLE_SEARCH_URL = "https://www.google.com/search"
+SHOPEE_SEARCH_URL = "https://shopee.vn/search"
+
+# Locator dùng để chờ trang
+GOOGLE_RESULTS = (By.ID, "search")
+SHOPEE_RESULT_ITEMS = (By.CSS_SELECTOR, ".shopee-search-item-result__items")
 
 # =============== DỮ LIỆU TÀI KHOẢN XÃ HỘI ===============
 # Tất cả MXH (facebook, instagram, zalo, twitter, shopee)
@@ -56,6 +80,69 @@ SOCIAL_ACCOUNTS = {
     }
 }
 
+def launch_driver(key):
+    """
+    Khởi động một driver Brave mới theo key (factory cho browser pool).
+    Chỉ dùng cấu hình trong key: pool còn gọi lại hàm này để giữ driver ấm sau khi worker đã kết thúc.
+    """
+    # Kiểm tra đường dẫn Brave
+    brave_path = key.binary
+    if not brave_path or not os.path.exists(brave_path):
+        raise Exception(f"Không tìm thấy Brave tại: {brave_path}")
+
+    # Khởi tạo Chrome options
+    options = Options()
+    options.binary_location = brave_path
+
+    # Thiết lập profile
+    if key.profile:
+        user_data_dir = os.path.dirname(key.profile)
+        profile_directory = os.path.basename(key.profile)
+        options.add_argument(f'--user-data-dir={user_data_dir}')
+        options.add_argument(f'--profile-directory={profile_directory}')
+
+    # Thiết lập các options cơ bản
+    options.add_argument('--start-maximized')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-notifications')
+    options.add_argument('--disable-infobars')
+    options.add_argument('--ignore-certificate-errors')
+
+    # Thêm các options nâng cao
+    options.add_argument('--disable-blink-features=AutomationControlled')
+    options.add_argument('--disable-features=IsolateOrigins,site-per-process')
+    options.add_argument('--disable-site-isolation-trials')
+    options.add_argument('--disable-web-security')
+    options.add_argument('--allow-running-insecure-content')
+
+    # Thêm proxy nếu có
+    if key.proxy:
+        options.add_argument(f'--proxy-server={key.proxy}')
+
+    # Thêm headless mode nếu được yêu cầu
+    if key.headless:
+        options.add_argument('--headless')
+
+    # Performance log (sự kiện CDP Network) để đọc JSON API tìm kiếm của Shopee
+    if key.capture:
+        enable_capture(options)
+
+    # Khởi tạo service với ChromeDriver đã cache theo phiên bản Brave
+    service = Service(resolve_chromedriver(brave_path))
+
+    # Khởi tạo driver
+    logger.info("🚀 Đang khởi động trình duyệt mới...")
+    driver = webdriver.Chrome(service=service, options=options)
+    driver.set_window_size(1920, 1080)
+
+    # Thiết lập timeout (không dùng implicit wait: làm chậm các điều kiện chờ trong waits.py)
+    driver.set_page_load_timeout(30)
+    install_network_tracker(driver)
+    return driver
+
+
 class EnhancedAutomationWorker(QThread):
     """Enhanced worker class for automation tasks"""
 
@@ -64,12 +151,21 @@ class EnhancedAutomationWorker(QThread):
     error_signal = pyqtSignal(str)
     result_signal = pyqtSignal(object)
     finished_signal = pyqtSignal(bool)
+    keyword_result_signal = pyqtSignal(str, object)  # Kết quả từng từ khóa trong chế độ batch
+    throughput_signal = pyqtSignal(float)  # Tốc độ batch (từ khóa/phút)
 
     def __init__(self, task=None, keyword="", email="", password="", max_results=10,
-                 headless=False, proxy=None, delay=0.0, pages=1, chrome_config=None):
+                 headless=False, proxy=None, delay=0.0, pages=1, chrome_config=None,
+                 keywords=None, concurrency=2, fast_mode=False, lean_page=True):
         super().__init__()
         self.task = task
         self.keyword = keyword
+        self.keywords = keywords or []
+        self.concurrency = concurrency
+        self.fast_mode = fast_mode  # Thử HTTP thuần trước, chỉ mở trình duyệt khi cần
+        self.lean_page = lean_page  # Chặn ảnh/font/video/quảng cáo theo LEAN_PAGE_PROFILES của task
+        self.fetch_stats = {"http": 0, "browser": 0}
+        self._stats_lock = threading.Lock()
         self.email = email
         self.password = password
         self.max_results = max_results
@@ -80,82 +176,75 @@ class EnhancedAutomationWorker(QThread):
         self.chrome_config = chrome_config or {}
         self.running = False
         self.driver = None
+        self.lease = None
+        self._batch_leases = set()
+        self.unprocessed_keywords = []  # Từ khóa batch chưa được xử lý (không lấy được trình duyệt)
         self.service = None
+        self.run_id = None  # Lần chạy trong kho kết quả (task thu thập dữ liệu)
+        self.telemetry = None  # Thời gian từng giai đoạn của lần chạy (logs/telemetry.jsonl)
+
+    def pool_key(self):
+        """Khóa browser pool ứng với cấu hình khởi động của worker"""
+        # Chỉ driver cho Shopee bật performance log: các task khác không đọc log nên không phải trả chi phí ghi
+        capture = bool(SHOPEE_NETWORK_CAPTURE and self.task == "shopee")
+        return PoolKey(bool(self.headless), self.proxy or None, self.chrome_config.get("profile_path") or None,
+                       self.chrome_config.get("chrome_path") or None, capture)
+
+    def span(self, phase, **fields):
+        """Đo thời gian một giai đoạn của lần chạy hiện tại (không làm gì nếu chưa có telemetry)"""
+        if self.telemetry is None:
+            return nullcontext({})
+        return self.telemetry.span(phase, **fields)
 
     def setup_driver(self):
-        """Setup Brave driver with advanced options"""
+        """Lấy driver Brave từ browser pool (khởi động mới nếu pool chưa có driver phù hợp)"""
+        if self.driver:
+            return True
         try:
-            # Kiểm tra đường dẫn Brave
-            brave_path = self.chrome_config.get("chrome_path")
-            if not brave_path or not os.path.exists(brave_path):
-                raise Exception(f"Không tìm thấy Brave tại: {brave_path}")
-
-            # Khởi tạo Chrome options
-            options = Options()
-            options.binary_location = brave_path
-            
-            # Thiết lập profile
-            if self.chrome_config.get("profile_path"):
-                user_data_dir = os.path.dirname(self.chrome_config['profile_path'])
-                profile_directory = os.path.basename(self.chrome_config['profile_path'])
-                options.add_argument(f'--user-data-dir={user_data_dir}')
-                options.add_argument(f'--profile-directory={profile_directory}')
-            
-            # Thiết lập các options cơ bản
-            options.add_argument('--start-maximized')
-            options.add_argument('--disable-gpu')
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
-            options.add_argument('--disable-notifications')
-            options.add_argument('--disable-infobars')
-            options.add_argument('--ignore-certificate-errors')
-            
-            # Thêm các options nâng cao
-            options.add_argument('--disable-blink-features=AutomationControlled')
-            options.add_argument('--disable-features=IsolateOrigins,site-per-process')
-            options.add_argument('--disable-site-isolation-trials')
-            options.add_argument('--disable-web-security')
-            options.add_argument('--allow-running-insecure-content')
-            
-            # Thêm proxy nếu có
-            if self.proxy:
-                options.add_argument(f'--proxy-server={self.proxy}')
-            
-            # Thêm headless mode nếu được yêu cầu
-            if self.headless:
-                options.add_argument('--headless')
-            
-            # Khởi tạo service với ChromeDriverManager
-            service = Service(ChromeDriverManager().install())
-            
-            # Khởi tạo driver
-            self.driver = webdriver.Chrome(service=service, options=options)
-            self.driver.set_window_size(1920, 1080)
-            
-            # Thiết lập timeout
-            self.driver.set_page_load_timeout(30)
-            self.driver.implicitly_wait(10)
-            
+            with self.span("driver_setup") as span:
+                self.lease = get_browser_pool().acquire(self.pool_key(), launch_driver)
+                span["warm"] = self.lease.warm
+                span["lean"] = self.apply_lean_page(self.lease.driver)
+            self.driver = self.lease.driver
+            
+            if self.lease.warm:
+                self.log_signal.emit("♻️ Dùng lại trình duyệt có sẵn trong pool")
             self.log_signal.emit("✅ Khởi tạo trình duyệt thành công")
             return True
             
         except Exception as e:
             self.error_signal.emit(f"❌ Lỗi khởi tạo trình duyệt: {str(e)}")
-            if self.driver:
-                try:
-                    self.driver.quit()
-                except:
-                    pass
+            self.release_driver(discard=True)
             return False
 
+    def apply_lean_page(self, driver):
+        """Áp dụng (hoặc gỡ) danh sách chặn tài nguyên của task cho driver vừa mượn từ pool"""
+        blocked = apply_lean_page(driver, self.task, self.lean_page)
+        if blocked:
+            self.log_signal.emit(f"🪶 Trang nhẹ: chặn {blocked} mẫu URL (ảnh, font, video, quảng cáo)")
+        return blocked
+
+    def release_driver(self, discard=False):
+        """Trả driver về browser pool (hoặc đóng hẳn nếu discard)"""
+        lease, self.lease = self.lease, None
+        self.driver = None
+        if lease:
+            try:
+                if discard:
+                    lease.discard()
+                else:
+                    lease.release()
+            except Exception:
+                pass
+
     def stop(self):
         """Stop the worker thread"""
         self.running = False
-        if self.driver:
-            try:
-                self.driver.quit()
-            except:
-                pass
+        # Đóng hẳn driver đang dùng để ngắt task; driver này không quay lại pool
+        if self.lease:
+            self.lease.discard()
+        for lease in list(self._batch_leases):
+            lease.discard()
         if self.service:
             try:
                 self.service.stop()
@@ -164,6 +253,7 @@ class EnhancedAutomationWorker(QThread):
 
     def run(self):
         """Main execution method"""
+        success = False
         try:
             # Kiểm tra xem có task và keyword không
             if not self.task:
@@ -173,99 +263,71 @@ class EnhancedAutomationWorker(QThread):
             if self.task == "google" and not self.keyword:
                 self.error_signal.emit("Chưa nhập từ khóa tìm kiếm")
                 return
+
+            if self.task == "google_batch" and not self.keywords:
+                self.error_signal.emit("Chưa nhập danh sách từ khóa")
+                return
                 
             # Bắt đầu chạy
             self.running = True
             self.progress_signal.emit(0)
+            started = time.time()
+            self.telemetry = telemetry.start_run(self.task, self.proxy, fast_mode=self.fast_mode)
+            self.start_result_run()
 
             if self.task == "google":
-                self.google_search()
+                success = self.google_search()
+            elif self.task == "google_batch":
+                success = self.google_batch_search()
             elif self.task == "facebook":
-                self.facebook_login()
+                success = self.facebook_login()
             elif self.task == "shopee":
-                self.shopee_scrape()
+                success = self.shopee_scrape()
             else:
                 raise ValueError(f"Unknown task: {self.task}")
+
+            # Batch đã báo kết quả proxy theo từng từ khóa; task bị dừng không tính
+            if self.running and self.task != "google_batch":
+                self.report_proxy(bool(success), (time.time() - started) * 1000)
                 
         except Exception as e:
             self.log_signal.emit(f"❌ Lỗi: {str(e)}")
             self.error_signal.emit(str(e))
+            if self.running:
+                self.report_proxy(False)
         finally:
             self.running = False
-            if self.driver:
-                try:
-                    self.driver.quit()
-                except:
-                    pass
+            with self.span("teardown"):
+                self.release_driver()
+            self.finish_result_run(success)
+            if self.telemetry is not None:
+                self.telemetry.finish(success)
+                self.telemetry = None
             self.finished_signal.emit(True)
 
     def google_search(self):
         """Perform a Google search using Brave"""
-        if not self.setup_driver():
-            self.error_signal.emit("Không thể khởi tạo driver")
-            return
-
         try:
             self.log_signal.emit("🔍 Bắt đầu tìm kiếm...")
             self.progress_signal.emit(10)
+            self.log_signal.emit(f"Đang tìm kiếm từ khóa: {self.keyword}")
 
-            # Truy cập Google
-            self.driver.get(GOOGLE_URL)
-            self.progress_signal.emit(30)
-            self.log_signal.emit("Đã mở Google")
-
-            # Chờ và nhập từ khóa tìm kiếm
-            search_box = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.NAME, "q"))
-            )
-            search_box.clear()
-            search_box.send_keys(self.keyword)
-            self.log_signal.emit(f"Đã nhập từ khóa: {self.keyword}")
-            self.progress_signal.emit(50)
-
-            # Submit tìm kiếm
-            search_box.submit()
-            self.log_signal.emit("Đã gửi yêu cầu tìm kiếm")
-            self.progress_signal.emit(70)
-
-            # Chờ kết quả và thu thập
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.ID, "search"))
-            )
-            self.log_signal.emit("Đã nhận được kết quả")
-
-            results = []
-            elements = self.driver.find_elements(By.CSS_SELECTOR, "div.g")
-            
-            # Nếu không tìm thấy kết quả với CSS selector cũ, thử selector mới
-            if not elements:
-                elements = self.driver.find_elements(By.XPATH, "//div[contains(@class, 'g')]")
-
-            # Thu thập kết quả
-            count = 0
-            for element in elements:
-                if count >= self.max_results:
-                    break
-                    
-                try:
-                    # Tìm tiêu đề và link
-                    title_element = element.find_element(By.CSS_SELECTOR, "h3")
-                    link_element = element.find_element(By.CSS_SELECTOR, "a")
-                    
-                    title = title_element.text
-                    url = link_element.get_attribute("href")
-                    
-                    if title and url:
-                        results.append((title, url))
-                        count += 1
-                        self.log_signal.emit(f"✅ Đã tìm thấy: {title}")
-                except:
-                    continue
+            results = self.fetch_google_http(self.keyword)
+            if results is None:
+                if not self.setup_driver():
+                    self.error_signal.emit("Không thể khởi tạo driver")
+                    return False
+                results = self.search_keyword(self.driver, self.keyword)
+            self.count_source(results)
+            for title, _url, source in results:
+                self.log_signal.emit(f"✅ Đã tìm thấy: {title}")
 
             self.progress_signal.emit(90)
             self.log_signal.emit(f"✅ Đã tìm thấy {len(results)} kết quả")
+            self.log_fetch_stats()
             
             # Gửi kết quả
+            self.store_results(self.keyword, results)
             self.result_signal.emit(results)
             self.progress_signal.emit(100)
             return True
@@ -274,6 +336,219 @@ class EnhancedAutomationWorker(QThread):
             self.error_signal.emit(f"Lỗi khi tìm kiếm: {str(e)}")
             return False
 
+    def fetch_google_http(self, keyword):
+        """
+        Chế độ nhanh: lấy trang kết quả Google bằng HTTP thuần.
+        Trả về list (tiêu đề, url, "http"), hoặc None nếu cần dùng trình duyệt.
+        """
+        if not self.fast_mode:
+            return None
+        with self.span("http_fetch", keyword=keyword) as span:
+            rows = get_http_fetcher(self.proxy).fetch_rows(
+                GOOGLE_SEARCH_URL, GOOGLE_RESULT_SPEC,
+                params={"q": keyword, "num": self.max_results, "hl": "vi"},
+                limit=self.max_results
+            )
+            if rows is None:
+                span["outcome"] = "fallback"
+        if rows is None:
+            self.log_signal.emit(f"🌐 '{keyword}': HTTP không dùng được, chuyển sang trình duyệt")
+            return None
+        return [(row["title"], row["url"], "http") for row in rows]
+
+    def report_proxy(self, success, latency_ms=None):
+        """Báo kết quả sử dụng proxy hiện tại cho ProxyPool (ảnh hưởng lần chọn proxy sau)"""
+        if self.proxy:
+            get_proxy_pool().report(self.proxy, success, latency_ms if success else None)
+
+    def count_source(self, results):
+        """Đếm số kết quả theo nguồn (phần tử cuối của tuple: "http" hoặc "browser")"""
+        with self._stats_lock:
+            for row in results:
+                self.fetch_stats[row[-1]] = self.fetch_stats.get(row[-1], 0) + 1
+
+    def log_fetch_stats(self):
+        with self._stats_lock:
+            http_count = self.fetch_stats.get("http", 0)
+            browser_count = self.fetch_stats.get("browser", 0)
+            api_count = self.fetch_stats.get("api", 0)
+        if self.fast_mode or api_count:
+            message = f"📊 Nguồn kết quả: HTTP {http_count}, trình duyệt {browser_count}"
+            if api_count:
+                message += f", API {api_count}"
+            self.log_signal.emit(message)
+
+    def search_keyword(self, driver, keyword):
+        """Tìm một từ khóa trên Google bằng driver cho trước, trả về list (tiêu đề, url, "browser")"""
+        # Truy cập Google
+        with self.span("navigation", keyword=keyword, target="home"):
+            driver.get(GOOGLE_URL)
+
+        # Chờ và nhập từ khóa tìm kiếm
+        with self.span("wait_for_element", keyword=keyword, target="q"):
+            search_box = wait_until(driver, element_present((By.NAME, "q")))
+        search_box.clear()
+        search_box.send_keys(keyword)
+
+        # Submit tìm kiếm: trang cũ bị thay thế (ô tìm kiếm cũ không còn trong DOM)
+        with self.span("navigation", keyword=keyword, target="search"):
+            search_box.submit()
+            wait_until(driver, staleness_of(search_box))
+
+        # Chờ kết quả và thu thập
+        with self.span("wait_for_element", keyword=keyword, target="#search"):
+            wait_until(driver, min_children(GOOGLE_RESULTS, 1))
+
+        # Thu thập toàn bộ kết quả trong một lần gọi execute_script
+        with self.span("extraction", keyword=keyword) as span:
+            rows = extract_tuples(driver, GOOGLE_RESULT_SPEC, ("title", "url"), limit=self.max_results)
+            span["items"] = len(rows)
+        return [(title, url, "browser") for title, url in rows]
+
+    def start_result_run(self):
+        """Tạo lần chạy trong kho kết quả cho các task thu thập dữ liệu"""
+        if self.task not in TASK_FIELDS:
+            return
+        params = {"keyword": self.keyword, "keywords": self.keywords, "pages": self.pages,
+                  "max_results": self.max_results, "fast_mode": self.fast_mode, "proxy": self.proxy}
+        try:
+            self.run_id = get_result_store().start_run(self.task, params)
+        except Exception as e:
+            self.log_signal.emit(f"⚠️ Không thể mở kho kết quả: {str(e)}")
+
+    def store_results(self, keyword, results):
+        """Ghi thêm một lô kết quả vào kho (lỗi ghi không làm hỏng task)"""
+        if self.run_id is None or not results:
+            return
+        try:
+            get_result_store().append(self.run_id, self.task, keyword, results)
+        except Exception as e:
+            self.log_signal.emit(f"⚠️ Không thể lưu kết quả: {str(e)}")
+
+    def finish_result_run(self, success):
+        if self.run_id is None:
+            return
+        try:
+            get_result_store().finish_run(self.run_id, success)
+        except Exception as e:
+            self.log_signal.emit(f"⚠️ Không thể cập nhật kho kết quả: {str(e)}")
+        self.run_id = None
+
+    def search_many(self, keywords, concurrency=None):
+        """
+        Tìm nhiều từ khóa song song trên tối đa `concurrency` trình duyệt từ browser pool.
+        Kết quả từng từ khóa được gửi qua keyword_result_signal ngay khi xong;
+        dừng giữa chừng bằng stop(). Trả về dict {từ khóa: list (tiêu đề, url)}.
+        """
+        keywords = [k.strip() for k in keywords if k and k.strip()]
+        if not keywords:
+            return {}
+
+        pool = get_browser_pool()
+        key = self.pool_key()
+        concurrency = concurrency or self.concurrency
+        concurrency = max(1, min(concurrency, len(keywords), pool.capacity(key)))
+
+        pending = queue.Queue()
+        for keyword in keywords:
+            pending.put(keyword)
+
+        results = {}
+        lock = threading.Lock()
+        started = time.time()
+        self.log_signal.emit(f"🔍 Tìm {len(keywords)} từ khóa với {concurrency} trình duyệt song song")
+
+        def _shard(shard_id):
+            lease = None
+            try:
+                while self.running:
+                    try:
+                        keyword = pending.get_nowait()
+                    except queue.Empty:
+                        break
+
+                    try:
+                        found = self.fetch_google_http(keyword)
+                        if found is None:
+                            if lease is None:
+                                with self.span("driver_setup") as span:
+                                    lease = pool.acquire(key, launch_driver)
+                                    span["warm"] = lease.warm
+                                    span["lean"] = self.apply_lean_page(lease.driver)
+                                with lock:
+                                    self._batch_leases.add(lease)
+                            found = self.search_keyword(lease.driver, keyword)
+                    except TimeoutError:
+                        # Không lấy được trình duyệt: trả từ khóa lại cho shard khác
+                        pending.put(keyword)
+                        raise
+                    except Exception as e:
+                        if not self.running:
+                            break
+                        self.log_signal.emit(f"⚠️ [{shard_id}] Lỗi với từ khóa '{keyword}': {str(e)}")
+                        found = None
+                        # Driver có thể đã hỏng: đổi trình duyệt khác cho từ khóa tiếp theo
+                        with lock:
+                            self._batch_leases.discard(lease)
+                        if lease is not None:
+                            lease.discard()
+                        lease = None
+
+                    self.report_proxy(found is not None)
+                    found = found or []
+                    self.count_source(found)
+                    with lock:
+                        results[keyword] = found
+                        done = len(results)
+                    self.store_results(keyword, found)
+                    self.keyword_result_signal.emit(keyword, found)
+                    self.progress_signal.emit(int(done * 100 / len(keywords)))
+                    elapsed = max(time.time() - started, 1e-6)
+                    self.throughput_signal.emit(done * 60.0 / elapsed)
+
+                    if self.delay:
+                        time.sleep(self.delay)
+            except Exception as e:
+                self.log_signal.emit(f"❌ [{shard_id}] Không thể lấy trình duyệt: {str(e)}")
+            finally:
+                if lease is not None:
+                    with lock:
+                        self._batch_leases.discard(lease)
+                    lease.release()
+
+        threads = [
+            threading.Thread(target=_shard, args=(i + 1,), name=f"GoogleBatch-{i + 1}", daemon=True)
+            for i in range(concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        elapsed = time.time() - started
+        rate = len(results) * 60.0 / elapsed if elapsed > 0 else 0.0
+        self.log_signal.emit(
+            f"✅ Đã xử lý {len(results)}/{len(keywords)} từ khóa trong {elapsed:.1f}s ({rate:.1f} từ khóa/phút)"
+        )
+        # Mọi shard đều không lấy được trình duyệt: các từ khóa còn lại không có kết quả, phải báo ra
+        self.unprocessed_keywords = list(dict.fromkeys(k for k in keywords if k not in results))
+        if self.unprocessed_keywords and self.running:
+            preview = ", ".join(self.unprocessed_keywords[:5])
+            if len(self.unprocessed_keywords) > 5:
+                preview += ", ..."
+            self.error_signal.emit(
+                f"❌ {len(self.unprocessed_keywords)} từ khóa chưa được xử lý (không lấy được trình duyệt): {preview}"
+            )
+        self.log_fetch_stats()
+        return results
+
+    def google_batch_search(self):
+        """Task google_batch: chạy search_many với danh sách từ khóa của worker"""
+        results = self.search_many(self.keywords, self.concurrency)
+        self.result_signal.emit(results)
+        self.progress_signal.emit(100)
+        return bool(results) and not self.unprocessed_keywords
+
     def facebook_login(self):
         """Login to Facebook using Brave"""
         if not self.setup_driver():
@@ -285,13 +560,13 @@ class EnhancedAutomationWorker(QThread):
             self.progress_signal.emit(10)
             
             # Truy cập Facebook
-            self.driver.get(SOCIAL_ACCOUNTS["facebook"]["url"])
+            with self.span("navigation", target="home"):
+                self.driver.get(SOCIAL_ACCOUNTS["facebook"]["url"])
             self.progress_signal.emit(30)
             
             # Chờ form đăng nhập
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.ID, "email"))
-            )
+            with self.span("wait_for_element", target="#email"):
+                wait_until(self.driver, element_present((By.ID, "email")))
             
             # Nhập thông tin đăng nhập
             email_field = self.driver.find_element(By.ID, "email")
@@ -308,12 +583,15 @@ class EnhancedAutomationWorker(QThread):
             self.progress_signal.emit(50)
             
             # Click nút đăng nhập
+            login_url = self.driver.current_url
             login_button = self.driver.find_element(By.NAME, "login")
             login_button.click()
             self.log_signal.emit("🔄 Đang đăng nhập...")
             
-            # Chờ đăng nhập thành công
-            time.sleep(5)  # Chờ cho quá trình đăng nhập hoàn tất
+            # Chờ chuyển trang (thành công, checkpoint hoặc trang báo lỗi đăng nhập) rồi chờ trang tải xong
+            with self.span("navigation", target="login"):
+                wait_optional(self.driver, any_of(url_changed(login_url), staleness_of(login_button)), timeout=15)
+                wait_for_page_load(self.driver)
             
             # Kiểm tra đăng nhập thành công
             if "checkpoint" in self.driver.current_url:
@@ -357,18 +635,18 @@ class EnhancedAutomationWorker(QThread):
             self.progress_signal.emit(20)
             
             # Chờ và click vào ô "Bạn đang nghĩ gì?"
-            create_post_button = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "[aria-label='Tạo bài viết'], [aria-label='Create post']"))
-            )
+            create_post_button = wait_until(self.driver, element_present(
+                (By.CSS_SELECTOR, "[aria-label='Tạo bài viết'], [aria-label='Create post']")
+            ))
             create_post_button.click()
             
             self.log_signal.emit("✍️ Đang mở form đăng bài...")
             self.progress_signal.emit(40)
             
             # Chờ form đăng bài xuất hiện
-            post_box = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "[aria-label='Bạn đang nghĩ gì?'], [aria-label='What\\'s on your mind?'], [contenteditable='true']"))
-            )
+            post_box = wait_until(self.driver, element_present(
+                (By.CSS_SELECTOR, "[aria-label='Bạn đang nghĩ gì?'], [aria-label='What\\'s on your mind?'], [contenteditable='true']")
+            ))
             
             # Nhập nội dung bài viết
             self.driver.execute_script("arguments[0].innerHTML = arguments[1]", post_box, content)
@@ -379,19 +657,17 @@ class EnhancedAutomationWorker(QThread):
             if images:
                 try:
                     # Click nút thêm ảnh
-                    photo_button = self.driver.find_element(By.CSS_SELECTOR, "[aria-label='Photo/video']")
+                    photo_button = wait_until(self.driver, element_clickable((By.CSS_SELECTOR, "[aria-label='Photo/video']")))
                     photo_button.click()
                     
                     # Chờ input file xuất hiện
-                    file_input = WebDriverWait(self.driver, 10).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='file']"))
-                    )
+                    file_input = wait_until(self.driver, element_present((By.CSS_SELECTOR, "input[type='file']")))
                     
-                    # Upload từng ảnh
+                    # Upload từng ảnh (chờ tới khi không còn request upload nào)
                     for image in images:
                         if os.path.exists(image):
                             file_input.send_keys(image)
-                            time.sleep(2)  # Chờ upload
+                            wait_optional(self.driver, network_idle(), timeout=30)
                             
                     self.log_signal.emit("🖼️ Đã thêm ảnh vào bài viết")
                 except Exception as e:
@@ -400,26 +676,18 @@ class EnhancedAutomationWorker(QThread):
             self.progress_signal.emit(80)
             
             # Click nút Đăng
-            post_button = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "[aria-label='Đăng'], [aria-label='Post']"))
-            )
+            post_button = wait_until(self.driver, element_clickable(
+                (By.CSS_SELECTOR, "[aria-label='Đăng'], [aria-label='Post']")
+            ))
             post_button.click()
             
             self.log_signal.emit("🔄 Đang đăng bài...")
             
-            # Chờ đăng bài thành công
-            time.sleep(5)
-            
-            # Kiểm tra đăng bài thành công
-            success = False
-            try:
-                success_msg = WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.XPATH, "//*[contains(text(), 'đã được đăng') or contains(text(), 'was posted')]"))
-                )
-                if success_msg:
-                    success = True
-            except:
-                pass
+            # Chờ thông báo đăng bài thành công
+            success_msg = wait_optional(self.driver, element_present(
+                (By.XPATH, "//*[contains(text(), 'đã được đăng') or contains(text(), 'was posted')]")
+            ), timeout=15)
+            success = success_msg is not None
                 
             if success:
                 self.log_signal.emit("✅ Đăng bài thành công!")
@@ -439,33 +707,140 @@ class EnhancedAutomationWorker(QThread):
             self.error_signal.emit(f"Lỗi khi đăng bài: {str(e)}")
             return False
 
+    def fetch_shopee_http(self):
+        """
+        Chế độ nhanh: lấy các trang kết quả Shopee bằng HTTP thuần.
+        Trả về list (tên, giá, url, "http"), hoặc None nếu cần dùng trình duyệt.
+        """
+        if not self.fast_mode:
+            return None
+        fetcher = get_http_fetcher(self.proxy)
+        results = []
+        for page in range(self.pages):
+            if len(results) >= self.max_results or not self.running:
+                break
+            with self.span("http_fetch", keyword=self.keyword, page=page) as span:
+                rows = fetcher.fetch_rows(
+                    SHOPEE_SEARCH_URL, SHOPEE_PRODUCT_SPEC,
+                    params={"keyword": self.keyword, "page": page},
+                    limit=self.max_results - len(results)
+                )
+                if rows is None:
+                    span["outcome"] = "fallback"
+            if rows is None:
+                if page == 0:
+                    self.log_signal.emit("🌐 Shopee cần JavaScript, chuyển sang trình duyệt")
+                    return None
+                break
+            results.extend((row["name"], row["price"], row["url"], "http") for row in rows)
+            self.progress_signal.emit(40 + (50 * (page + 1) // self.pages))
+        return results
+
+    def shopee_capture_products(self):
+        """
+        Thu thập sản phẩm từ JSON API tìm kiếm mà trang Shopee tự gọi (không phụ thuộc class CSS của trang).
+        Trang sau: gửi lại request API, bị từ chối thì mở trang kết quả tiếp theo.
+        Trả về list (tên, giá, url, "api"), hoặc None nếu không bắt được response của trang đầu.
+        """
+        capture = ShopeeNetworkCapture(self.driver)
+        search_url = f"{SHOPEE_SEARCH_URL}?{urllib.parse.urlencode({'keyword': self.keyword})}"
+
+        capture.drain()
+        with self.span("navigation", keyword=self.keyword, target="search"):
+            self.driver.get(search_url)
+        self.progress_signal.emit(30)
+        with self.span("api_capture", keyword=self.keyword, page=0) as span:
+            data = capture.wait_for_response()
+            if data is None:
+                span["outcome"] = "timeout"
+        if data is None:
+            return None
+
+        results = []
+        page = 0
+        while self.running:
+            with self.span("extraction", page=page, mode="api") as span:
+                products = parse_search_items(data, limit=self.max_results - len(results))
+                span["items"] = len(products)
+            results.extend((item["name"], item["price"], item["url"], "api") for item in products)
+            self.log_signal.emit(f"📄 Trang {page + 1}/{self.pages}: {len(products)} sản phẩm từ API")
+            self.progress_signal.emit(40 + (50 * (page + 1) // self.pages))
+
+            page += 1
+            if (page >= self.pages or len(results) >= self.max_results
+                    or not has_more(data, request_limit(capture.request["url"]))):
+                break
+
+            with self.span("pagination", page=page, mode="replay") as span:
+                data = capture.fetch_page(page)
+                if data is None:
+                    # Server từ chối request gửi lại: mở trang kết quả tiếp theo để trang tự gọi API
+                    span["mode"] = "navigate"
+                    capture.drain()
+                    self.driver.get(f"{search_url}&page={page}")
+                    data = capture.wait_for_response()
+                    if data is None:
+                        span["outcome"] = "timeout"
+            if data is None:
+                break
+        return results
+
     def shopee_scrape(self):
         """Scrape products from Shopee"""
+        self.log_signal.emit("🔍 Bắt đầu tìm kiếm trên Shopee...")
+        self.progress_signal.emit(10)
+
+        results = self.fetch_shopee_http()
+        if results is not None:
+            self.count_source(results)
+            self.log_signal.emit(f"✅ Đã tìm thấy {len(results)} sản phẩm")
+            self.log_fetch_stats()
+            self.store_results(self.keyword, results)
+            self.result_signal.emit(results)
+            self.progress_signal.emit(100)
+            return True
+
         if not self.setup_driver():
             self.error_signal.emit("Không thể khởi tạo driver")
             return False
+
+        if SHOPEE_NETWORK_CAPTURE:
+            try:
+                results = self.shopee_capture_products()
+            except Exception as e:
+                self.log_signal.emit(f"⚠️ Không đọc được API Shopee: {str(e)}")
+                results = None
+            if results is not None:
+                self.count_source(results)
+                self.log_signal.emit(f"✅ Đã tìm thấy {len(results)} sản phẩm")
+                self.log_fetch_stats()
+                self.store_results(self.keyword, results)
+                self.result_signal.emit(results)
+                self.progress_signal.emit(100)
+                return True
+            self.log_signal.emit("🌐 Không bắt được API tìm kiếm Shopee, chuyển sang đọc trang")
             
         try:
-            self.log_signal.emit("🔍 Bắt đầu tìm kiếm trên Shopee...")
-            self.progress_signal.emit(10)
-            
             # Truy cập Shopee
-            self.driver.get(SOCIAL_ACCOUNTS["shopee"]["url"])
+            with self.span("navigation", target="home"):
+                self.driver.get(SOCIAL_ACCOUNTS["shopee"]["url"])
             self.progress_signal.emit(20)
             
             # Đợi và đóng popup nếu có
             try:
-                close_button = WebDriverWait(self.driver, 5).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, ".shopee-popup__close-btn"))
-                )
+                with self.span("wait_for_element", target="popup"):
+                    close_button = wait_until(self.driver, element_clickable(
+                        (By.CSS_SELECTOR, ".shopee-popup__close-btn")
+                    ), timeout=5)
                 close_button.click()
             except:
                 pass
                 
             # Chờ ô tìm kiếm
-            search_box = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, ".shopee-searchbar-input__input"))
-            )
+            with self.span("wait_for_element", target="searchbar"):
+                search_box = wait_until(self.driver, element_present(
+                    (By.CSS_SELECTOR, ".shopee-searchbar-input__input")
+                ))
             
             # Nhập từ khóa tìm kiếm
             search_box.clear()
@@ -473,11 +848,12 @@ class EnhancedAutomationWorker(QThread):
             self.log_signal.emit(f"🔍 Đã nhập từ khóa: {self.keyword}")
             
             # Nhấn Enter để tìm kiếm
-            search_box.send_keys(Keys.RETURN)
-            self.progress_signal.emit(40)
-            
-            # Chờ kết quả tìm kiếm
-            time.sleep(5)  # Chờ trang load
+            with self.span("navigation", keyword=self.keyword, target="search"):
+                search_box.send_keys(Keys.RETURN)
+                self.progress_signal.emit(40)
+                
+                # Chờ danh sách kết quả có sản phẩm đầu tiên
+                wait_until(self.driver, min_children(SHOPEE_RESULT_ITEMS, 1), timeout=15)
             
             results = []
             current_page = 1
@@ -485,50 +861,52 @@ class EnhancedAutomationWorker(QThread):
             while current_page <= self.pages and len(results) < self.max_results:
                 self.log_signal.emit(f"📄 Đang xử lý trang {current_page}/{self.pages}")
                 
-                # Chờ danh sách sản phẩm
-                WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, ".shopee-search-item-result__items"))
-                )
-                
-                # Thu thập sản phẩm
-                items = self.driver.find_elements(By.CSS_SELECTOR, ".shopee-search-item-result__item")
+                # Chờ danh sách sản phẩm có phần tử và ngừng render thêm (Shopee tải dần từng phần)
+                with self.span("wait_for_element", target="items", page=current_page):
+                    wait_until(self.driver, min_children(SHOPEE_RESULT_ITEMS, 1))
+                    wait_optional(self.driver, dom_stable(SHOPEE_RESULT_ITEMS))
                 
-                for item in items:
-                    if len(results) >= self.max_results:
-                        break
-                        
-                    try:
-                        # Lấy thông tin sản phẩm
-                        name = item.find_element(By.CSS_SELECTOR, "._3GAFiR").text
-                        price = item.find_element(By.CSS_SELECTOR, "._1xk7ak").text
-                        url = item.find_element(By.CSS_SELECTOR, "a").get_attribute("href")
-                        
-                        if name and price and url:
-                            results.append((name, price, url))
-                            self.log_signal.emit(f"✅ Đã tìm thấy: {name}")
-                    except:
-                        continue
+                # Thu thập sản phẩm (một lần gọi execute_script cho cả trang)
+                with self.span("extraction", page=current_page) as span:
+                    items = extract_tuples(self.driver, SHOPEE_PRODUCT_SPEC, ("name", "price", "url"),
+                                           limit=self.max_results - len(results))
+                    span["items"] = len(items)
+                for name, price, url in items:
+                    results.append((name, price, url, "browser"))
+                    self.log_signal.emit(f"✅ Đã tìm thấy: {name}")
                         
                 self.progress_signal.emit(40 + (50 * current_page // self.pages))
                 
                 # Chuyển trang nếu cần
                 if current_page < self.pages:
                     try:
-                        next_button = self.driver.find_element(By.CSS_SELECTOR, ".shopee-mini-page-controller__next-btn")
-                        if "disabled" not in next_button.get_attribute("class"):
-                            next_button.click()
-                            time.sleep(3)  # Chờ trang mới load
-                            current_page += 1
-                        else:
+                        with self.span("pagination", page=current_page) as span:
+                            next_button = wait_until(self.driver, element_present(
+                                (By.CSS_SELECTOR, ".shopee-mini-page-controller__next-btn")
+                            ), timeout=5)
+                            has_next = "disabled" not in next_button.get_attribute("class")
+                            if has_next:
+                                first_item = self.driver.find_element(*SHOPEE_RESULT_ITEMS).find_element(By.XPATH, "./*")
+                                page_url = self.driver.current_url
+                                next_button.click()
+                                # Trang mới: URL đổi hoặc danh sách cũ được render lại
+                                wait_until(self.driver, any_of(url_changed(page_url), staleness_of(first_item)))
+                            else:
+                                span["outcome"] = "last_page"
+                        if not has_next:
                             break
+                        current_page += 1
                     except:
                         break
                 else:
                     break
                     
             self.log_signal.emit(f"✅ Đã tìm thấy {len(results)} sản phẩm")
+            self.count_source(results)
+            self.log_fetch_stats()
             
             # Gửi kết quả
+            self.store_results(self.keyword, results)
             self.result_signal.emit(results)
             self.progress_signal.emit(100)
             return True
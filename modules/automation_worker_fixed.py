@@ -1,5 +1,6 @@
 import time
 import os
+import logging
 import urllib.parse
 import random
 import subprocess
@@ -17,11 +18,19 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
-# Webdriver-manager
-from webdriver_manager.chrome import ChromeDriverManager
 # Thêm thư viện cho việc xác định phiên bản Chromium
 from packaging import version
 
+from .browser_pool import PoolKey, get_browser_pool
+from .config import BRAVE_PATH
+from .driver_resolver import get_browser_version, resolve_chromedriver
+from .dom_extractor import extract, GOOGLE_RESULT_SPEC
+from .proxy_verifier import get_proxy_verifier
+from .proxy_pool import get_proxy_pool
+from .script_runner import get_script_runner_pool
+
+logger = logging.getLogger(__name__)
+
 # Google URL mặc định
 GOOGLE_URL = "https://www.google.com"
 
@@ -57,6 +66,245 @@ SOCIAL_ACCOUNTS = {
 }
 
 
+def find_brave_path():
+    """Đường dẫn Brave Browser: đường dẫn chính từ thông tin người dùng, không có thì thử các vị trí khác"""
+    brave_path = r"C:\Program Files\BraveSoftware\Brave-Browser\Application\brave.exe"
+    if os.path.exists(brave_path):
+        return brave_path
+
+    logger.warning(f"❌ Không tìm thấy Brave tại đường dẫn chính: {brave_path}")
+    # Tìm đường dẫn thay thế
+    brave_paths = [
+        r"C:\Users\admin\AppData\Local\BraveSoftware\Brave-Browser\User Data\Default",
+        "/Applications/Brave Browser.app/Contents/MacOS/Brave Browser",
+        "/usr/bin/brave-browser"
+    ]
+    for path in brave_paths:
+        if os.path.exists(path):
+            logger.info(f"✅ Đã tìm thấy Brave tại: {path}")
+            return path
+    return None
+
+
+def launch_brave_driver(key):
+    """
+    Khởi động Brave Browser với cấu hình chống phát hiện automation (factory cho browser pool).
+    Chỉ dùng cấu hình trong key: pool còn gọi lại hàm này để giữ driver ấm sau khi worker đã kết thúc.
+    """
+    try:
+        logger.info("🔧 Đang cấu hình Brave Browser...")
+
+        # Đường dẫn Brave nằm trong key (EnhancedAutomationWorker.pool_key)
+        brave_path = key.binary or find_brave_path()
+        if not brave_path or not os.path.exists(brave_path):
+            raise Exception("Không tìm thấy Brave Browser. Vui lòng cài đặt Brave từ https://brave.com")
+
+        logger.info(f"✅ Đã xác nhận Brave tại: {brave_path}")
+
+        # Cấu hình options cho Brave
+        chrome_options = Options()
+        chrome_options.binary_location = brave_path
+
+
+        # Thêm user agent chính xác từ thông tin người dùng cung cấp
+        user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36"
+        chrome_options.add_argument(f'--user-agent={user_agent}')
+
+        # Thêm các tùy chọn chống phát hiện automation
+        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        chrome_options.add_experimental_option("useAutomationExtension", False)
+
+        # Thiết lập các tùy chọn đặc biệt từ thông tin dòng lệnh của người dùng
+        chrome_options.add_argument("--disable-domain-reliability")
+        chrome_options.add_argument("--enable-dom-distiller")
+        chrome_options.add_argument("--enable-distillability-service")
+        chrome_options.add_argument("--origin-trial-public-key=bYUKPJoPnCxeNvu72j4EmPuK7tr1PAC7SHh8ld9Mw3E=,fMS4mpO6buLQ/QMd+zJmxzty/VQ6B1EUZqoCU04zoRU=")
+        chrome_options.add_argument("--lso-url=https://no-thanks.invalid")
+        chrome_options.add_argument("--sync-url=https://sync-v2.brave.com/v2")
+        chrome_options.add_argument("--variations-server-url=https://variations.brave.com/seed")
+        chrome_options.add_argument("--variations-insecure-server-url=https://variations.brave.com/seed")
+        chrome_options.add_argument("--component-updater=url-source=https://go-updater.brave.com/extensions")
+
+        # Các tùy chọn bổ sung 
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-notifications")
+        chrome_options.add_argument("--disable-popup-blocking")
+
+        # Tùy chọn riêng cho Brave
+        chrome_options.add_argument("--disable-brave-update")
+        chrome_options.add_argument("--disable-brave-extension")
+        chrome_options.add_argument("--disable-brave-rewards")
+
+        # Thiết lập ngôn ngữ
+        chrome_options.add_argument("--lang=vi-VN,vi")
+
+        # Thiết lập headless nếu cần
+        if key.headless:
+            chrome_options.add_argument("--headless=new")
+            chrome_options.add_argument("--window-size=1920,1080")
+        else:
+            chrome_options.add_argument("--start-maximized")
+
+        # Thiết lập profile (đã xác định trong pool_key)
+        if key.profile:
+            user_data_dir = os.path.dirname(key.profile)
+            profile_directory = os.path.basename(key.profile)
+
+            # Kiểm tra profile tồn tại
+            if os.path.exists(user_data_dir):
+                chrome_options.add_argument(f"--user-data-dir={user_data_dir}")
+                chrome_options.add_argument(f"--profile-directory={profile_directory}")
+                logger.info(f"📂 Sử dụng profile: {user_data_dir}/{profile_directory}")
+            else:
+                logger.warning(f"⚠️ Không tìm thấy thư mục profile: {user_data_dir}")
+
+        # Thêm proxy nếu có
+        if key.proxy:
+            chrome_options.add_argument(f'--proxy-server={key.proxy}')
+            logger.info(f"🔄 Sử dụng proxy: {key.proxy}")
+
+        # Lấy ChromeDriver phù hợp (cache theo major version của Brave)
+        logger.info("🔄 Đang xác định ChromeDriver phù hợp với Brave...")
+
+        # Tạo WebDriver với retry logic
+        max_retries = 3
+        retry_count = 0
+
+        while retry_count < max_retries:
+            try:
+                service = Service(resolve_chromedriver(brave_path))
+
+                # Tạo driver, chỉ định rõ binary là Brave thông qua options
+                driver = webdriver.Chrome(service=service, options=chrome_options)
+
+                # Ghi đè các thuộc tính automation để tránh phát hiện
+                driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
+                    'source': '''
+                        // Ghi đè thuộc tính navigator.webdriver
+                        Object.defineProperty(navigator, 'webdriver', {
+                            get: () => undefined
+                        });
+
+                        // Xóa thuộc tính cdriver
+                        delete window.cdc_adoQpoasnfa76pfcZLmcfl_Array;
+                        delete window.cdc_adoQpoasnfa76pfcZLmcfl_Promise;
+                        delete window.cdc_adoQpoasnfa76pfcZLmcfl_Symbol;
+
+                        // Giả mạo plugins như Brave
+                        const makePluginInfo = (name, filename) => {
+                            return {
+                                name,
+                                filename,
+                                description: 'Portable Document Format',
+                                length: 1,
+                                item: () => null
+                            };
+                        };
+
+                        Object.defineProperty(navigator, 'plugins', {
+                            get: () => {
+                                const plugins = [
+                                    makePluginInfo('PDF Viewer', 'internal-pdf-viewer'),
+                                    makePluginInfo('Brave PDF Plugin', 'internal-pdf-viewer'),
+                                    makePluginInfo('Brave PDF Viewer', 'mhjfbmdgcfjbbpaeojofohoefgiehjai'),
+                                    makePluginInfo('Native Client', 'internal-nacl-plugin')
+                                ];
+
+                                // Thêm thuộc tính namedItem
+                                plugins.namedItem = name => plugins.find(p => p.name === name);
+
+                                return plugins;
+                            }
+                        });
+
+                        // Sử dụng thông tin OS chính xác
+                        Object.defineProperty(navigator, 'platform', {
+                            get: () => 'Win32'
+                        });
+
+                        // Thiết lập ngôn ngữ
+                        Object.defineProperty(navigator, 'languages', {
+                            get: () => ['vi-VN', 'vi', 'en-US', 'en'],
+                        });
+
+                        // Thiết lập JavaScriptEngine giống Brave
+                        Object.defineProperty(navigator, 'appVersion', {
+                            get: () => '5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36'
+                        });
+
+                        // Ghi đè permissions API
+                        if (window.navigator.permissions) {
+                            const originalQuery = window.navigator.permissions.query;
+                            window.navigator.permissions.__proto__.query = parameters => {
+                                if (parameters.name === 'notifications' || 
+                                    parameters.name === 'clipboard-read' || 
+                                    parameters.name === 'clipboard-write') {
+                                    return Promise.resolve({state: Notification.permission});
+                                }
+                                return originalQuery(parameters);
+                            };
+                        }
+                    '''
+                })
+
+                # Kiểm tra xem có đang thực sự sử dụng Brave
+                logger.info("🔍 Đang xác minh trình duyệt...")
+
+                # Mở trang chrome://version để xác nhận
+                driver.get("chrome://version")
+                time.sleep(2)
+
+                # Lấy thông tin từ trang version
+                page_source = driver.page_source.lower()
+                browser_info = "Không xác định"
+
+                if "brave" in page_source:
+                    logger.info("✅ Xác nhận đang sử dụng Brave Browser!")
+                    browser_info = "Brave Browser"
+                elif "chrome" in page_source:
+                    logger.warning("⚠️ Có thể đang sử dụng Chrome thay vì Brave!")
+                    browser_info = "Chrome Browser"
+
+                # Ghi log chi tiết để kiểm tra
+                logger.info(f"🌐 Thông tin trình duyệt: {browser_info}")
+
+                # Nếu đang sử dụng Chrome, thử cách khác để sử dụng Brave
+                if browser_info == "Chrome Browser":
+                    logger.info("🔄 Đang cố gắng khởi chạy Brave thay vì Chrome...")
+
+                    # Đóng trình duyệt hiện tại
+                    driver.quit()
+
+                    # Thử khởi động Brave trực tiếp bằng subprocess
+                    temp_html = os.path.join(os.getcwd(), "temp_brave_launcher.html")
+                    with open(temp_html, "w") as f:
+                        f.write("<html><body><h1>Brave Test</h1><p>This is a test page for Brave Browser.</p></body></html>")
+
+                    # Mở Brave với URL cụ thể
+                    subprocess.Popen([brave_path, f"file://{temp_html}"])
+
+                    logger.warning("⚠️ Không thể tích hợp hoàn toàn với Selenium. Sử dụng phương pháp thay thế với ChromeDriver.")
+
+                logger.info("✅ Đã khởi động Brave Browser thành công!")
+                return driver
+
+            except Exception as e:
+                retry_count += 1
+                logger.warning(f"⚠️ Lỗi khởi động Brave (lần {retry_count}/{max_retries}): {str(e)}")
+
+                if retry_count >= max_retries:
+                    logger.warning("❌ Không thể khởi động Brave sau nhiều lần thử")
+                    raise
+
+                time.sleep(2)  # Chờ trước khi thử lại
+
+    except Exception as e:
+        logger.warning(f"❌ Lỗi cấu hình Brave Browser: {str(e)}")
+        raise
+
+
 class AutomationWorker(QThread):
     """
     Worker DEMO (giả lập): chờ 5 giây rồi trả về kết quả Google giả.
@@ -116,10 +364,13 @@ class EnhancedAutomationWorker(QThread):
         chrome_config=None,
         use_stealth=True,
         keep_browser_open=True,
+        browser_verify_proxy=False,
         email=None,         # Add email parameter for Facebook login
         password=None,      # Add password parameter for Facebook login
         max_results=10,     # Add max_results parameter for Google search
         pages=2,            # Add pages parameter for Shopee scraping
+        custom_script=None, # Đường dẫn script người dùng cho task "custom"
+        custom_script_args=None, # Tham số truyền vào run() của script
         parent=None
     ):
         super().__init__(parent)
@@ -133,13 +384,17 @@ class EnhancedAutomationWorker(QThread):
         self.chrome_config = chrome_config or {}
         self.use_stealth = use_stealth
         self.keep_browser_open = keep_browser_open
+        self.browser_verify_proxy = browser_verify_proxy  # Thêm tầng kiểm tra proxy bằng trình duyệt
         self.email = email
         self.password = password
         self.max_results = max_results
         self.pages = pages
+        self.custom_script = custom_script
+        self.custom_script_args = custom_script_args or {}
 
         self._running = True
         self.driver = None
+        self.lease = None
         self.results = []
 
     def log(self, message):
@@ -152,11 +407,12 @@ class EnhancedAutomationWorker(QThread):
             self.log(f"🚀 Starting {self.task} task")
             self.progress_signal.emit(10)
             
-            # Setup driver
-            self.driver = self.setup_driver()
-            if not self.driver:
-                self.error_signal.emit("Failed to initialize browser")
-                return
+            # Setup driver (script "custom" chạy trong tiến trình riêng với driver của nó)
+            if self.task != "custom":
+                self.driver = self.setup_driver()
+                if not self.driver:
+                    self.error_signal.emit("Failed to initialize browser")
+                    return
                 
             self.progress_signal.emit(30)
             
@@ -194,16 +450,14 @@ class EnhancedAutomationWorker(QThread):
             elif self.task == "custom":
                 # Handle custom script execution
                 if self.custom_script:
-                    # Custom script execution can be complex, 
-                    # we'll keep it simple for this enhanced worker
-                    self.log("⚠️ Custom script execution is simplified in this version")
-                    # Execute script in a safe way would be implemented here
-                    # ...
-                    result = "Custom script executed"
+                    result = self.run_custom_script(self.custom_script)
+                    success = result is not None
                 else:
                     self.log("❌ No custom script provided")
                     
             self.progress_signal.emit(90)
+            if self._running:
+                get_proxy_pool().report(self.proxy, bool(success))
             
             if success:
                 self.log(f"✅ {self.task} task completed successfully!")
@@ -219,19 +473,58 @@ class EnhancedAutomationWorker(QThread):
             
         finally:
             self.progress_signal.emit(100)
-            if not self.keep_browser_open and self.driver:
-                try:
-                    self.driver.quit()
-                    self.log("✅ Browser closed")
-                except Exception as e:
-                    self.log(f"⚠️ Error closing browser: {str(e)}")
+            if self.keep_browser_open and self.lease and self._running:
+                self.detach_driver()
+                self.log("🪟 Browser kept open (detached from pool)")
+            elif self.lease and not self._running:
+                # Driver bị ngắt giữa chừng không được trả lại pool (đóng tại đây, không trên GUI thread)
+                self.release_driver(discard=True)
+                self.log("🛑 Browser closed after stop request")
+            elif self.lease:
+                self.release_driver()
+                self.log("✅ Browser returned to pool")
             
             # Signal completion without arguments
             self.finished_signal.emit()
 
+    def run_custom_script(self, script_path):
+        """Chạy script người dùng trong tiến trình riêng, log và tiến độ được chuyển tiếp về giao diện"""
+        def on_event(event):
+            if event.get("type") == "log":
+                self.log(f"📜 {event.get('message')}")
+            elif event.get("type") == "progress":
+                # Tiến độ của script được ánh xạ vào khoảng 30-90% của task
+                self.progress_signal.emit(30 + int(event.get("value", 0)) * 60 // 100)
+
+        driver_config = {
+            "chrome_path": self.chrome_config.get("chrome_path"),
+            "profile_path": self.chrome_config.get("profile_path"),
+            "headless": bool(self.headless),
+            "proxy": self.proxy or None,
+            "driver_path": resolve_chromedriver(self.chrome_config.get("chrome_path") or None)
+        }
+        self.log(f"▶️ Running custom script in a separate process: {os.path.basename(script_path)}")
+        run = get_script_runner_pool(driver_config).submit(
+            script_path, params=self.custom_script_args, on_event=on_event, driver_config=driver_config
+        )
+        # Chờ theo từng nhịp ngắn để nút "Dừng" hủy được script (tiến trình con bị hủy)
+        while not run.done:
+            if not self._running:
+                run.cancel()
+                run.wait(15)
+                self.log("⚠️ Custom script cancelled")
+                return None
+            run.wait(0.5)
+        if not run.ok:
+            self.log(f"❌ Custom script failed: {run.error}")
+            return None
+        self.log(f"✅ Custom script finished in {run.duration}s")
+        return run.result if run.result is not None else True
+
     def stop(self):
         """User bấm "Dừng" => dừng Worker, đóng browser."""
         self.log("⚠️ Đã yêu cầu dừng worker...")
+        # Chỉ đặt cờ: driver.quit() có thể treo vài giây, run() sẽ tự đóng driver trong finally
         self._running = False
 
     def validate_parameters(self):
@@ -252,16 +545,35 @@ class EnhancedAutomationWorker(QThread):
 
     def verify_proxy(self, proxy, timeout=5):
         """
-        Verify if a proxy is working by attempting to connect to a test URL
+        Verify if a proxy is working (TCP -> CONNECT -> optional browser tier, cached with TTL)
         Returns True if proxy is working, False otherwise
         """
         if not proxy:
             return False
-            
-        self.log(f"🔍 Testing proxy: {proxy}")
+
+        browser_check = None
+        if self.browser_verify_proxy:
+            browser_check = lambda p: self._browser_verify_proxy(p, timeout)
+
+        result = get_proxy_verifier().verify(proxy, browser_check=browser_check)
+        if result["ok"]:
+            self.log(f"✅ Proxy {proxy} is working ({result['tier']}, {result['latency_ms']} ms)")
+        else:
+            self.log(f"❌ Proxy {proxy} failed: {result['error']}")
+        return result["ok"]
+
+    def _browser_verify_proxy(self, proxy, timeout=5):
+        """
+        Verify a proxy by loading test URLs in a headless browser (slow, last verification tier)
+        Returns True if proxy is working, False otherwise
+        """
+        self.log(f"🔍 Testing proxy in browser: {proxy}")
         
         # Create a minimal browser config for testing
+        brave_path = self.chrome_config.get("chrome_path") or BRAVE_PATH
         chrome_options = Options()
+        if os.path.exists(brave_path):
+            chrome_options.binary_location = brave_path
         chrome_options.add_argument("--headless=new")
         chrome_options.add_argument("--disable-gpu")
         chrome_options.add_argument("--no-sandbox")
@@ -286,7 +598,7 @@ class EnhancedAutomationWorker(QThread):
             LOGGER.setLevel(logging.CRITICAL)
             
             # Setup WebDriver
-            service = Service(ChromeDriverManager().install())
+            service = Service(resolve_chromedriver(brave_path))
             driver = webdriver.Chrome(service=service, options=chrome_options)
             driver.set_page_load_timeout(timeout)
             
@@ -336,43 +648,33 @@ class EnhancedAutomationWorker(QThread):
     def enhanced_rotate_proxy(self):
         """
         Enhanced proxy rotation with verification to ensure we get a working proxy
+        Candidates are picked by ProxyPool score; proxies in circuit-breaker cooldown are skipped
         Returns True if successful, False if no working proxies found
         """
         if not self.proxies or len(self.proxies) <= 1:
             self.log("⚠️ No alternative proxies available for rotation")
             return False
-            
-        # Get current proxy index
-        current_index = 0
-        if self.proxy in self.proxies:
-            current_index = self.proxies.index(self.proxy)
-            
-        # Try up to all available proxies
-        attempts = 0
-        max_attempts = len(self.proxies)
+
+        pool = get_proxy_pool()
+        pool.add(self.proxies)
+        tried = {self.proxy}
         
-        while attempts < max_attempts:
-            # Get next proxy in the list (with wraparound)
-            next_index = (current_index + 1) % len(self.proxies)
-            next_proxy = self.proxies[next_index]
-            
-            # Skip if it's the same as current (shouldn't happen with len > 1)
-            if next_proxy == self.proxy:
-                next_index = (next_index + 1) % len(self.proxies)
-                next_proxy = self.proxies[next_index]
+        while True:
+            next_proxy = pool.choose(candidates=self.proxies, exclude=tried)
+            if next_proxy is None:
+                break
+            tried.add(next_proxy)
                 
             self.log(f"🔄 Rotating proxy from {self.proxy} to {next_proxy}")
             
-            # Verify the new proxy works
+            # Verify the new proxy works (cached by the proxy verifier)
             if self.verify_proxy(next_proxy):
                 self.proxy = next_proxy
                 self.log(f"✅ Successfully rotated to proxy: {self.proxy}")
                 return True
-            else:
-                # If proxy doesn't work, try next one
-                current_index = next_index
-                attempts += 1
-                self.log(f"⚠️ Proxy {next_proxy} failed verification, trying next (attempt {attempts}/{max_attempts})")
+
+            pool.report(next_proxy, False)
+            self.log(f"⚠️ Proxy {next_proxy} failed verification, trying next (attempt {len(tried) - 1}/{len(self.proxies) - 1})")
                 
         self.log("❌ Failed to find a working proxy after trying all available options")
         return False
@@ -392,12 +694,16 @@ class EnhancedAutomationWorker(QThread):
             return []
             
         self.log(f"🔍 Testing {len(self.proxies)} proxies...")
-        working_proxies = []
-        
-        for i, proxy in enumerate(self.proxies):
-            self.log(f"🔄 Testing proxy {i+1}/{len(self.proxies)}: {proxy}")
-            if self.verify_proxy(proxy):
-                working_proxies.append(proxy)
+        browser_check = None
+        if self.browser_verify_proxy:
+            browser_check = self._browser_verify_proxy
+
+        # Tầng TCP/CONNECT chạy đồng thời cho toàn bộ danh sách
+        results = get_proxy_verifier().verify_many(self.proxies, browser_check=browser_check)
+        working_proxies = [r["proxy"] for r in results if r["ok"]]
+        for result in results:
+            if not result["ok"]:
+                self.log(f"⚠️ {result['proxy']}: {result['error']}")
                 
         success_rate = len(working_proxies) / len(self.proxies) * 100 if self.proxies else 0
         self.log(f"✅ Proxy test complete: {len(working_proxies)}/{len(self.proxies)} working ({success_rate:.1f}%)")
@@ -424,297 +730,64 @@ class EnhancedAutomationWorker(QThread):
             self.proxy = proxy_list[0]
             self.log(f"✅ Đã chọn proxy mặc định: {self.proxy}")
 
+    def pool_key(self):
+        """Khóa browser pool ứng với cấu hình khởi động của worker"""
+        profile_path = self.chrome_config.get("profile_path")
+        if not profile_path:
+            # Profile mặc định của Brave (chỉ dùng khi thư mục tồn tại)
+            user_data_dir = r"C:\Users\admin\AppData\Local\BraveSoftware\Brave-Browser\User Data"
+            if os.path.exists(user_data_dir):
+                profile_path = os.path.join(user_data_dir, "Default")
+        # stealth: driver của worker này khởi động với cấu hình chống phát hiện khác automation_worker,
+        # không được dùng lẫn driver của nhau trong pool chung
+        binary = self.chrome_config.get("chrome_path") or find_brave_path()
+        return PoolKey(bool(self.headless), self.proxy or None, profile_path or None, binary, stealth=True)
+
     def setup_driver(self):
-        """Thiết lập Brave Browser với cấu hình chống phát hiện automation"""
+        """Lấy driver Brave từ browser pool, khởi động mới nếu pool chưa có driver phù hợp"""
         if not self.validate_parameters():
             return None
-            
-        try:
-            self.log("🔧 Đang cấu hình Brave Browser...")
-            
-            # Sử dụng đường dẫn Brave Browser chính xác từ thông tin người dùng
-            chrome_options = Options()
-            brave_path = r"C:\Program Files\BraveSoftware\Brave-Browser\Application\brave.exe"
-            
-            # Kiểm tra xem brave_path có tồn tại
-            if not os.path.exists(brave_path):
-                self.log(f"❌ Không tìm thấy Brave tại đường dẫn chính: {brave_path}")
-                # Tìm đường dẫn thay thế
-                brave_paths = [
-                    r"C:\Users\admin\AppData\Local\BraveSoftware\Brave-Browser\User Data\Default",
-                    "/Applications/Brave Browser.app/Contents/MacOS/Brave Browser",
-                    "/usr/bin/brave-browser"
-                ]
-                
-                for path in brave_paths:
-                    if os.path.exists(path):
-                        brave_path = path
-                        self.log(f"✅ Đã tìm thấy Brave tại: {brave_path}")
-                        break
-                
-            if not os.path.exists(brave_path):
-                self.log("❌ Không tìm thấy Brave Browser. Vui lòng cài đặt Brave từ https://brave.com")
-                return None
-            
-            self.log(f"✅ Đã xác nhận Brave tại: {brave_path}")
-                
-            # Cấu hình options cho Brave
-            chrome_options = Options()
-            options.binary_location = r"C:\Program Files\BraveSoftware\Brave-Browser\Application\brave.exe"
 
-            
-            # Thêm user agent chính xác từ thông tin người dùng cung cấp
-            user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36"
-            chrome_options.add_argument(f'--user-agent={user_agent}')
-            
-            # Thêm các tùy chọn chống phát hiện automation
-            chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-            chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            chrome_options.add_experimental_option("useAutomationExtension", False)
-            
-            # Thiết lập các tùy chọn đặc biệt từ thông tin dòng lệnh của người dùng
-            chrome_options.add_argument("--disable-domain-reliability")
-            chrome_options.add_argument("--enable-dom-distiller")
-            chrome_options.add_argument("--enable-distillability-service")
-            chrome_options.add_argument("--origin-trial-public-key=bYUKPJoPnCxeNvu72j4EmPuK7tr1PAC7SHh8ld9Mw3E=,fMS4mpO6buLQ/QMd+zJmxzty/VQ6B1EUZqoCU04zoRU=")
-            chrome_options.add_argument("--lso-url=https://no-thanks.invalid")
-            chrome_options.add_argument("--sync-url=https://sync-v2.brave.com/v2")
-            chrome_options.add_argument("--variations-server-url=https://variations.brave.com/seed")
-            chrome_options.add_argument("--variations-insecure-server-url=https://variations.brave.com/seed")
-            chrome_options.add_argument("--component-updater=url-source=https://go-updater.brave.com/extensions")
-            
-            # Các tùy chọn bổ sung 
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-notifications")
-            chrome_options.add_argument("--disable-popup-blocking")
-            
-            # Tùy chọn riêng cho Brave
-            chrome_options.add_argument("--disable-brave-update")
-            chrome_options.add_argument("--disable-brave-extension")
-            chrome_options.add_argument("--disable-brave-rewards")
-            
-            # Thiết lập ngôn ngữ
-            chrome_options.add_argument("--lang=vi-VN,vi")
-            
-            # Thiết lập headless nếu cần
-            if self.headless:
-                chrome_options.add_argument("--headless=new")
-                chrome_options.add_argument("--window-size=1920,1080")
-            else:
-                chrome_options.add_argument("--start-maximized")
-            
-            # Thiết lập profile chính xác từ thông tin người dùng
-            user_data_dir = r"C:\Users\admin\AppData\Local\BraveSoftware\Brave-Browser\User Data"
-            profile_directory = "Default"
-            
-            if self.chrome_config.get("profile_path"):
-                profile_path = self.chrome_config["profile_path"]
-                user_data_dir = os.path.dirname(profile_path)
-                profile_directory = os.path.basename(profile_path)
-                self.log(f"📂 Sử dụng profile tùy chỉnh: {profile_path}")
-            
-            # Kiểm tra profile tồn tại
-            if os.path.exists(user_data_dir):
-                chrome_options.add_argument(f"--user-data-dir={user_data_dir}")
-                chrome_options.add_argument(f"--profile-directory={profile_directory}")
-                self.log(f"📂 Sử dụng profile: {user_data_dir}/{profile_directory}")
-            else:
-                self.log(f"⚠️ Không tìm thấy thư mục profile: {user_data_dir}")
-            
-            # Thêm proxy nếu có
-            if self.proxy:
-                chrome_options.add_argument(f'--proxy-server={self.proxy}')
-                self.log(f"🔄 Sử dụng proxy: {self.proxy}")
-            
-            # Tải ChromeDriver phù hợp
-            self.log("🔄 Đang tải ChromeDriver phù hợp với Brave...")
-            
-            # Tạo WebDriver với retry logic
-            max_retries = 3
-            retry_count = 0
-            
-            while retry_count < max_retries:
-                try:
-                    # Sử dụng ChromeDriverManager để tải driver phù hợp với Chromium 134
-                    driver_version = "134.0.6998"  # Dựa trên version Chromium của Brave
-                    service = Service(ChromeDriverManager(version=driver_version).install())
-                    
-                    # Tạo driver, chỉ định rõ binary là Brave thông qua options
-                    driver = webdriver.Chrome(service=service, options=chrome_options)
-                    
-                    # Ghi đè các thuộc tính automation để tránh phát hiện
-                    driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
-                        'source': '''
-                            // Ghi đè thuộc tính navigator.webdriver
-                            Object.defineProperty(navigator, 'webdriver', {
-                                get: () => undefined
-                            });
-                            
-                            // Xóa thuộc tính cdriver
-                            delete window.cdc_adoQpoasnfa76pfcZLmcfl_Array;
-                            delete window.cdc_adoQpoasnfa76pfcZLmcfl_Promise;
-                            delete window.cdc_adoQpoasnfa76pfcZLmcfl_Symbol;
-                            
-                            // Giả mạo plugins như Brave
-                            const makePluginInfo = (name, filename) => {
-                                return {
-                                    name,
-                                    filename,
-                                    description: 'Portable Document Format',
-                                    length: 1,
-                                    item: () => null
-                                };
-                            };
-                            
-                            Object.defineProperty(navigator, 'plugins', {
-                                get: () => {
-                                    const plugins = [
-                                        makePluginInfo('PDF Viewer', 'internal-pdf-viewer'),
-                                        makePluginInfo('Brave PDF Plugin', 'internal-pdf-viewer'),
-                                        makePluginInfo('Brave PDF Viewer', 'mhjfbmdgcfjbbpaeojofohoefgiehjai'),
-                                        makePluginInfo('Native Client', 'internal-nacl-plugin')
-                                    ];
-                                    
-                                    // Thêm thuộc tính namedItem
-                                    plugins.namedItem = name => plugins.find(p => p.name === name);
-                                    
-                                    return plugins;
-                                }
-                            });
-                            
-                            // Sử dụng thông tin OS chính xác
-                            Object.defineProperty(navigator, 'platform', {
-                                get: () => 'Win32'
-                            });
-                            
-                            // Thiết lập ngôn ngữ
-                            Object.defineProperty(navigator, 'languages', {
-                                get: () => ['vi-VN', 'vi', 'en-US', 'en'],
-                            });
-                            
-                            // Thiết lập JavaScriptEngine giống Brave
-                            Object.defineProperty(navigator, 'appVersion', {
-                                get: () => '5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36'
-                            });
-                            
-                            // Ghi đè permissions API
-                            if (window.navigator.permissions) {
-                                const originalQuery = window.navigator.permissions.query;
-                                window.navigator.permissions.__proto__.query = parameters => {
-                                    if (parameters.name === 'notifications' || 
-                                        parameters.name === 'clipboard-read' || 
-                                        parameters.name === 'clipboard-write') {
-                                        return Promise.resolve({state: Notification.permission});
-                                    }
-                                    return originalQuery(parameters);
-                                };
-                            }
-                        '''
-                    })
-                    
-                    # Kiểm tra xem có đang thực sự sử dụng Brave
-                    self.log("🔍 Đang xác minh trình duyệt...")
-                    
-                    # Mở trang chrome://version để xác nhận
-                    driver.get("chrome://version")
-                    time.sleep(2)
-                    
-                    # Lấy thông tin từ trang version
-                    page_source = driver.page_source.lower()
-                    browser_info = "Không xác định"
-                    
-                    if "brave" in page_source:
-                        self.log("✅ Xác nhận đang sử dụng Brave Browser!")
-                        browser_info = "Brave Browser"
-                    elif "chrome" in page_source:
-                        self.log("⚠️ Có thể đang sử dụng Chrome thay vì Brave!")
-                        browser_info = "Chrome Browser"
-                    
-                    # Ghi log chi tiết để kiểm tra
-                    self.log(f"🌐 Thông tin trình duyệt: {browser_info}")
-                    
-                    # Nếu đang sử dụng Chrome, thử cách khác để sử dụng Brave
-                    if browser_info == "Chrome Browser":
-                        self.log("🔄 Đang cố gắng khởi chạy Brave thay vì Chrome...")
-                        
-                        # Đóng trình duyệt hiện tại
-                        driver.quit()
-                        
-                        # Thử khởi động Brave trực tiếp bằng subprocess
-                        temp_html = os.path.join(os.getcwd(), "temp_brave_launcher.html")
-                        with open(temp_html, "w") as f:
-                            f.write("<html><body><h1>Brave Test</h1><p>This is a test page for Brave Browser.</p></body></html>")
-                        
-                        # Mở Brave với URL cụ thể
-                        subprocess.Popen([brave_path, f"file://{temp_html}"])
-                        
-                        self.log("⚠️ Không thể tích hợp hoàn toàn với Selenium. Sử dụng phương pháp thay thế với ChromeDriver.")
-                    
-                    self.log("✅ Đã khởi động Brave Browser thành công!")
-                    return driver
-                    
-                except Exception as e:
-                    retry_count += 1
-                    self.log(f"⚠️ Lỗi khởi động Brave (lần {retry_count}/{max_retries}): {str(e)}")
-                    
-                    if retry_count >= max_retries:
-                        self.log("❌ Không thể khởi động Brave sau nhiều lần thử")
-                        raise
-                    
-                    time.sleep(2)  # Chờ trước khi thử lại
-            
+        try:
+            self.lease = get_browser_pool().acquire(self.pool_key(), launch_brave_driver)
+            if self.lease.warm:
+                self.log("♻️ Dùng lại Brave Browser có sẵn trong pool")
+            return self.lease.driver
         except Exception as e:
             self.log(f"❌ Lỗi cấu hình Brave Browser: {str(e)}")
             return None
 
+    def detach_driver(self):
+        """Giữ trình duyệt mở cho người dùng: tách driver khỏi pool để không chiếm chỗ của key"""
+        lease, self.lease = self.lease, None
+        if lease:
+            self.driver = lease.detach()
+
+    def release_driver(self, discard=False):
+        """Trả driver về browser pool (hoặc đóng hẳn nếu discard)"""
+        lease, self.lease = self.lease, None
+        self.driver = None
+        if lease:
+            try:
+                if discard:
+                    lease.discard()
+                else:
+                    lease.release()
+            except Exception as e:
+                self.log(f"⚠️ Error closing browser: {str(e)}")
+
     def get_brave_version(self, brave_path):
-        """Lấy phiên bản của Brave Browser"""
+        """Lấy phiên bản Chromium của Brave Browser (cache trong driver_resolver)"""
         try:
-            # Sử dụng --version để lấy thông tin phiên bản
-            result = subprocess.run([brave_path, "--version"], 
-                                   stdout=subprocess.PIPE, 
-                                   stderr=subprocess.PIPE,
-                                   text=True,
-                                   timeout=5)
-            version_output = result.stdout.strip()
-            
-            # Format thường là: "Brave Browser 134.0.6998.94" hoặc tương tự
-            if "Brave" in version_output and "Chromium" in version_output:
-                # Trích xuất phiên bản từ đầu ra
-                chromium_version = version_output.split("Chromium:")[1].split()[0].strip()
-                return chromium_version
-            elif "Brave" in version_output:
-                # Trích xuất phiên bản từ đầu ra
-                brave_version = ''.join(c for c in version_output.split("Brave")[1] if c.isdigit() or c == '.')
-                return brave_version.strip()
-                
-            return None
+            return get_browser_version(brave_path)
         except Exception as e:
             self.log(f"⚠️ Lỗi khi lấy phiên bản Brave: {str(e)}")
             return None
             
-    def get_compatible_chromedriver(self, browser_version):
+    def get_compatible_chromedriver(self, browser_version=None):
         """Tìm ChromeDriver phù hợp với phiên bản Brave"""
         try:
-            # Kiểm tra thư mục driver đã tải
-            driver_path = os.path.expanduser("~/.wdm/drivers/chromedriver")
-            
-            if not os.path.exists(driver_path):
-                return None
-                
-            # Lấy phiên bản chính của Brave (major version)
-            major_version = browser_version.split('.')[0]
-            
-            # Tìm thư mục chứa driver phù hợp
-            for root, dirs, files in os.walk(driver_path):
-                for file in files:
-                    if file.lower() == "chromedriver.exe" or file.lower() == "chromedriver":
-                        # Kiểm tra nếu thư mục chứa phiên bản phù hợp
-                        if major_version in root:
-                            return os.path.join(root, file)
-            
-            return None
+            return resolve_chromedriver(self.chrome_config.get("chrome_path") or BRAVE_PATH)
         except Exception as e:
             self.log(f"⚠️ Lỗi khi tìm ChromeDriver phù hợp: {str(e)}")
             return None
@@ -749,14 +822,13 @@ class EnhancedAutomationWorker(QThread):
                 # Try fixing common issues
                 if "ERR_PROXY_CONNECTION_FAILED" in str(e) or "proxy" in str(e).lower():
                     self.log("🔄 Proxy issue detected, trying to rotate proxy...")
+                    get_proxy_pool().report(self.proxy, False)
                     if self.rotate_proxy():
                         # Recreate the driver with new proxy if possible
-                        try:
-                            driver.quit()
-                        except:
-                            pass
-                            
+                        self.release_driver(discard=True)
                         self.driver = self.setup_driver()
+                        if not self.driver:
+                            return False
                         driver = self.driver
                 
                 # Wait before retry
@@ -872,50 +944,15 @@ class EnhancedAutomationWorker(QThread):
             # Đợi kết quả
             time.sleep(3)
             
-            # Thu thập kết quả tìm kiếm
-            results = []
-            
-            # Tìm tất cả kết quả tìm kiếm
-            result_elements = self.driver.find_elements(By.CSS_SELECTOR, "div.g")
-            
-            # Nếu không tìm thấy với CSS selector cũ, thử selector mới
-            if not result_elements:
-                result_elements = self.driver.find_elements(By.XPATH, "//div[@jscontroller]//a[@jsname]/../../..")
-                
-            # Nếu vẫn không tìm thấy, thử cách khác
-            if not result_elements:
-                result_elements = self.driver.find_elements(By.CSS_SELECTOR, "div[jsmodel]")
-                
-            for idx, result in enumerate(result_elements[:self.max_results]):
-                try:
-                    # Tiêu đề là thẻ h3
-                    title_element = result.find_element(By.CSS_SELECTOR, "h3")
-                    title = title_element.text if title_element else "Không có tiêu đề"
-                    
-                    # Link là thẻ a
-                    link_element = result.find_element(By.CSS_SELECTOR, "a")
-                    link = link_element.get_attribute("href") if link_element else ""
-                    
-                    # Mô tả là div.VwiC3b hoặc span.st
-                    try:
-                        desc_element = result.find_element(By.CSS_SELECTOR, "div[aria-level='3']")
-                    except:
-                        try:
-                            desc_element = result.find_element(By.CSS_SELECTOR, "div[data-content-feature]")
-                        except:
-                            desc_element = None
-                            
-                    desc = desc_element.text if desc_element else "Không có mô tả"
-                    
-                    # Thêm vào kết quả
-                    results.append({
-                        "Tiêu đề": title,
-                        "URL": link,
-                        "Mô tả": desc
-                    })
-                    
-                except Exception as e:
-                    self.log(f"⚠️ Lỗi khi phân tích kết quả #{idx+1}: {str(e)}")
+            # Thu thập kết quả tìm kiếm (một lần gọi execute_script cho toàn bộ trang)
+            results = [
+                {
+                    "Tiêu đề": row["title"],
+                    "URL": row["url"],
+                    "Mô tả": row["description"] or "Không có mô tả"
+                }
+                for row in extract(self.driver, GOOGLE_RESULT_SPEC, limit=self.max_results)
+            ]
             
             # In kết quả
             self.log(f"✅ Đã tìm thấy {len(results)} kết quả cho: {query}")
@@ -0,0 +1,397 @@
+"""
+Module browser_pool.py
+Pool trình duyệt dùng chung cho toàn tiến trình: giữ sẵn các driver Brave đã khởi động
+để các task liên tiếp (Google, Shopee, scheduler...) không phải mở trình duyệt mới.
+"""
+
+import time
+import atexit
+import logging
+import threading
+from collections import namedtuple
+
+from .config import (
+    BROWSER_POOL_MAX_PER_KEY, BROWSER_POOL_MAX_TOTAL, BROWSER_POOL_WARM_SIZE,
+    BROWSER_POOL_IDLE_TIMEOUT, BROWSER_POOL_MAX_USES, BROWSER_POOL_ACQUIRE_TIMEOUT
+)
+
+logger = logging.getLogger(__name__)
+
+# Khóa phân loại driver: chỉ dùng lại driver có cùng cấu hình khởi động.
+# Key chứa đủ cấu hình để factory(key) khởi động driver mà không cần tới worker đã tạo ra nó
+# (janitor gọi lại factory để giữ driver ấm sau khi worker đã kết thúc)
+# capture: driver bật performance log mạng (chỉ task Shopee cần, xem shopee_api.enable_capture)
+# stealth: driver khởi động bằng launch_brave_driver (automation_worker_fixed) với cấu hình chống phát hiện
+PoolKey = namedtuple("PoolKey", ["headless", "proxy", "profile", "binary", "capture", "stealth"],
+                     defaults=(None, False, False))
+
+
+class _PooledDriver:
+    """Thông tin của một driver trong pool"""
+
+    def __init__(self, driver, key):
+        self.driver = driver
+        self.key = key
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self.uses = 0
+
+
+class BrowserLease:
+    """Quyền sử dụng tạm thời một driver; trả lại pool bằng release() hoặc with"""
+
+    def __init__(self, pool, entry):
+        self._pool = pool
+        self._entry = entry
+        self._closed = False
+
+    @property
+    def driver(self):
+        return self._entry.driver
+
+    @property
+    def key(self):
+        return self._entry.key
+
+    @property
+    def warm(self):
+        """True nếu driver đã từng phục vụ task trước đó (không phải khởi động lạnh)"""
+        return self._entry.uses > 1
+
+    def release(self):
+        """Trả driver về pool (reset về about:blank nếu còn khỏe)"""
+        if not self._closed:
+            self._closed = True
+            self._pool._release(self._entry, discard=False)
+
+    def discard(self):
+        """Đóng hẳn driver, không trả về pool (dùng khi driver lỗi hoặc bị dừng giữa chừng)"""
+        if not self._closed:
+            self._closed = True
+            self._pool._release(self._entry, discard=True)
+
+    def detach(self):
+        """Tách driver khỏi pool (không đóng, không tính vào sức chứa); người gọi tự quit() driver"""
+        if not self._closed:
+            self._closed = True
+            self._pool._detach(self._entry)
+        return self._entry.driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
+
+
+class BrowserPool:
+    """
+    Pool driver theo PoolKey(headless, proxy, profile, binary, capture, stealth):
+      - Cấp phát lease, kiểm tra sức khỏe driver trước khi giao
+      - Reset về about:blank khi trả về
+      - Loại bỏ driver rảnh quá lâu hoặc đã phục vụ quá nhiều task
+      - Giữ sẵn warm_size driver rảnh cho các key vừa được sử dụng
+    """
+
+    def __init__(self, max_per_key=BROWSER_POOL_MAX_PER_KEY, max_total=BROWSER_POOL_MAX_TOTAL,
+                 warm_size=BROWSER_POOL_WARM_SIZE, idle_timeout=BROWSER_POOL_IDLE_TIMEOUT,
+                 max_uses=BROWSER_POOL_MAX_USES, janitor_interval=30):
+        self.max_per_key = max_per_key
+        self.max_total = max_total
+        self.warm_size = warm_size
+        self.idle_timeout = idle_timeout
+        self.max_uses = max_uses
+        self.janitor_interval = janitor_interval
+
+        self._cond = threading.Condition()
+        self._idle = {}        # key -> list[_PooledDriver] đang rảnh
+        self._busy = set()     # các _PooledDriver đang được cho mượn
+        self._launching = {}   # key -> số driver đang khởi động
+        self._returning = {}   # key -> số driver đang reset/kiểm tra/đóng ngoài lock (vẫn tính vào sức chứa)
+        self._factories = {}   # key -> (factory, thời điểm dùng gần nhất)
+        self._closed = False
+        self._janitor = None
+
+    # ---------------- API ----------------
+    def acquire(self, key, factory, timeout=BROWSER_POOL_ACQUIRE_TIMEOUT):
+        """
+        Lấy một driver cho key. Ưu tiên driver rảnh còn khỏe, nếu không còn chỗ thì
+        khởi động mới bằng factory(key), hết chỗ thì chờ tối đa timeout giây.
+        """
+        deadline = time.time() + timeout
+        self._start_janitor()
+
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("Browser pool đã đóng")
+                self._factories[key] = (factory, time.time())
+
+                entry = self._pop_idle(key)
+                if entry is not None:
+                    self._mark_returning(key)
+                elif self._can_launch(key):
+                    self._launching[key] = self._launching.get(key, 0) + 1
+                elif entry is None:
+                    # Hết chỗ cho key này: nhường driver rảnh của key khác nếu có
+                    if not self._evict_one_idle(exclude=key):
+                        remaining = deadline - time.time()
+                        if remaining <= 0:
+                            raise TimeoutError(f"Không có trình duyệt rảnh cho {key} sau {timeout}s")
+                        self._cond.wait(min(remaining, 1.0))
+                    continue
+
+            if entry is not None:
+                # Kiểm tra sức khỏe ngoài lock vì có thể mất vài chục ms (entry vẫn được tính qua _returning)
+                if self._is_healthy(entry.driver):
+                    return self._lend(entry, returning=True)
+                self._quit(entry)
+                with self._cond:
+                    self._unmark_returning(key)
+                    self._cond.notify_all()
+                continue
+
+            return self._lend(self._launch(key, factory))
+
+    def prewarm(self, key, factory, count=1):
+        """Khởi động trước count driver rảnh cho key (chạy nền)"""
+        def _work():
+            for _ in range(count):
+                with self._cond:
+                    self._factories[key] = (factory, time.time())
+                    if self._closed or len(self._idle.get(key, [])) >= count or not self._can_launch(key):
+                        return
+                    self._launching[key] = self._launching.get(key, 0) + 1
+                try:
+                    entry = self._launch(key, factory)
+                except Exception as e:
+                    logger.warning(f"Không thể khởi động trước trình duyệt cho {key}: {e}")
+                    return
+                with self._cond:
+                    self._idle.setdefault(key, []).append(entry)
+                    self._cond.notify_all()
+
+        threading.Thread(target=_work, name="BrowserPoolPrewarm", daemon=True).start()
+
+    def evict_idle(self):
+        """Đóng các driver rảnh quá idle_timeout và bổ sung driver ấm cho key vừa dùng"""
+        now = time.time()
+        expired = []
+        with self._cond:
+            for key, entries in list(self._idle.items()):
+                keep = []
+                for entry in entries:
+                    if now - entry.last_used > self.idle_timeout:
+                        expired.append(entry)
+                        self._mark_returning(key)
+                    else:
+                        keep.append(entry)
+                self._idle[key] = keep
+            warm_keys = [
+                (key, factory) for key, (factory, used_at) in self._factories.items()
+                if now - used_at <= self.idle_timeout
+            ]
+        for entry in expired:
+            self._quit_returning(entry)
+        if self.warm_size > 0:
+            for key, factory in warm_keys:
+                self.prewarm(key, factory, self.warm_size)
+
+    def close_all(self):
+        """Đóng toàn bộ driver (gọi khi thoát ứng dụng)"""
+        with self._cond:
+            self._closed = True
+            entries = [e for items in self._idle.values() for e in items] + list(self._busy)
+            self._idle.clear()
+            self._busy.clear()
+            self._cond.notify_all()
+        for entry in entries:
+            self._quit(entry)
+
+    def capacity(self, key):
+        """Số driver tối đa có thể dùng đồng thời cho key"""
+        return min(self._capacity(key), self.max_total)
+
+    def has_free_slot(self, key):
+        """True nếu acquire(key) có thể được phục vụ ngay (driver rảnh, còn chỗ khởi động hoặc nhường được chỗ)"""
+        with self._cond:
+            if self._closed:
+                return False
+            if self._idle.get(key) or self._can_launch(key):
+                return True
+            # Hết chỗ tổng nhưng key còn chỗ: driver rảnh của key khác có thể bị nhường
+            return self._count(key) < self._capacity(key) and any(
+                entries for k, entries in self._idle.items() if k != key
+            )
+
+    def stats(self):
+        """Thống kê nhanh trạng thái pool"""
+        with self._cond:
+            return {
+                "idle": sum(len(v) for v in self._idle.values()),
+                "busy": len(self._busy),
+                "launching": sum(self._launching.values()),
+                "returning": sum(self._returning.values()),
+                "keys": len(self._factories)
+            }
+
+    # ---------------- NỘI BỘ ----------------
+    def _capacity(self, key):
+        # Một user-data-dir chỉ mở được một tiến trình trình duyệt tại một thời điểm
+        return 1 if key.profile else self.max_per_key
+
+    def _count(self, key=None):
+        if key is None:
+            return (sum(len(v) for v in self._idle.values()) + len(self._busy)
+                    + sum(self._launching.values()) + sum(self._returning.values()))
+        return (len(self._idle.get(key, [])) + self._launching.get(key, 0) + self._returning.get(key, 0)
+                + sum(1 for e in self._busy if e.key == key))
+
+    def _can_launch(self, key):
+        return self._count(key) < self._capacity(key) and self._count() < self.max_total
+
+    def _pop_idle(self, key):
+        entries = self._idle.get(key)
+        if entries:
+            # Lấy driver dùng gần nhất (LIFO) để driver cũ hết hạn tự nhiên
+            return entries.pop()
+        return None
+
+    def _evict_one_idle(self, exclude):
+        for key, entries in self._idle.items():
+            if key != exclude and entries:
+                entry = entries.pop(0)
+                self._mark_returning(key)
+                threading.Thread(target=self._quit_returning, args=(entry,), daemon=True).start()
+                return True
+        return False
+
+    def _launch(self, key, factory):
+        try:
+            driver = factory(key)
+            if driver is None:
+                raise RuntimeError("Factory không trả về driver")
+            return _PooledDriver(driver, key)
+        finally:
+            with self._cond:
+                self._launching[key] -= 1
+                if not self._launching[key]:
+                    del self._launching[key]
+                self._cond.notify_all()
+
+    def _mark_returning(self, key):
+        """Gọi trong lock: driver rời _idle/_busy để reset/kiểm tra/đóng nhưng vẫn chiếm chỗ của key"""
+        self._returning[key] = self._returning.get(key, 0) + 1
+
+    def _unmark_returning(self, key):
+        """Gọi trong lock"""
+        self._returning[key] -= 1
+        if not self._returning[key]:
+            del self._returning[key]
+
+    def _quit_returning(self, entry):
+        self._quit(entry)
+        with self._cond:
+            self._unmark_returning(entry.key)
+            self._cond.notify_all()
+
+    def _lend(self, entry, returning=False):
+        with self._cond:
+            if returning:
+                self._unmark_returning(entry.key)
+            entry.uses += 1
+            entry.last_used = time.time()
+            self._busy.add(entry)
+        return BrowserLease(self, entry)
+
+    def _release(self, entry, discard):
+        # Chuyển từ _busy sang _returning trong cùng một lần giữ lock: driver không lúc nào bị bỏ khỏi _count,
+        # nên key có sức chứa 1 (profile thật) không thể bị mở trình duyệt thứ hai trong lúc reset/đóng
+        with self._cond:
+            self._busy.discard(entry)
+            self._mark_returning(entry.key)
+            closed = self._closed
+        retire = discard or closed or entry.uses >= self.max_uses
+        if not retire and not self._reset(entry):
+            retire = True
+
+        if retire:
+            self._quit(entry)
+        with self._cond:
+            self._unmark_returning(entry.key)
+            if not retire:
+                entry.last_used = time.time()
+                self._idle.setdefault(entry.key, []).append(entry)
+            self._cond.notify_all()
+
+    def _detach(self, entry):
+        with self._cond:
+            self._busy.discard(entry)
+            self._cond.notify_all()
+
+    def _reset(self, entry):
+        """Đưa driver về trạng thái sạch trước khi cho task khác mượn"""
+        driver = entry.driver
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            # Không xóa cookie của profile thật (giữ trạng thái đăng nhập).
+            # Xóa trước khi rời trang: delete_all_cookies chỉ thấy cookie của trang hiện tại,
+            # nên ưu tiên CDP để xóa cookie của mọi domain
+            if not entry.key.profile:
+                try:
+                    driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+                except Exception:
+                    driver.delete_all_cookies()
+            driver.get("about:blank")
+            return True
+        except Exception as e:
+            logger.warning(f"Reset trình duyệt thất bại, sẽ đóng driver: {e}")
+            return False
+
+    @staticmethod
+    def _is_healthy(driver):
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    @staticmethod
+    def _quit(entry):
+        try:
+            entry.driver.quit()
+        except Exception:
+            pass
+
+    def _start_janitor(self):
+        with self._cond:
+            if self._janitor is not None:
+                return
+            self._janitor = threading.Thread(target=self._janitor_loop, name="BrowserPoolJanitor", daemon=True)
+        self._janitor.start()
+
+    def _janitor_loop(self):
+        while not self._closed:
+            time.sleep(self.janitor_interval)
+            try:
+                self.evict_idle()
+            except Exception as e:
+                logger.warning(f"Lỗi khi dọn browser pool: {e}")
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool():
+    """Trả về BrowserPool dùng chung cho toàn tiến trình"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+            atexit.register(_pool.close_all)
+        return _pool
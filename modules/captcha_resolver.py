@@ -1,7 +1,6 @@
 import os
 import time
 import base64
-import requests
 import logging
 from PIL import Image
 from io import BytesIO
@@ -10,6 +9,8 @@ from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QLineEdit, QPushButton
 from PyQt5.QtGui import QPixmap, QFont
 import json
 
+from .captcha_service import CaptchaError, CaptchaTimeout, get_captcha_service
+
 class CaptchaResolver(QObject):
     status_signal = pyqtSignal(str)  # Signal để cập nhật trạng thái xử lý CAPTCHA
     
@@ -101,119 +102,56 @@ class CaptchaResolver(QObject):
             self.status_signal.emit(f"Lỗi khi xử lý Image CAPTCHA: {str(e)}")
             return None
     
+    def _wait_for_solution(self, future):
+        """Chờ kết quả từ CaptchaSolverService, trả về đáp án hoặc None (đã báo trạng thái)"""
+        self.status_signal.emit("Đang đợi 2Captcha xử lý...")
+        try:
+            solution = future.result()
+        except CaptchaTimeout:
+            self.status_signal.emit("Hết thời gian chờ 2Captcha.")
+            return None
+        except CaptchaError as e:
+            self.status_signal.emit(f"Lỗi từ 2Captcha: {str(e)}")
+            return None
+        self.status_signal.emit("2Captcha đã giải thành công!")
+        return solution
+
     def _solve_with_2captcha(self, url, sitekey, driver, wait_time):
-        """Giải reCAPTCHA sử dụng 2Captcha API"""
+        """Giải reCAPTCHA qua CaptchaSolverService (các phiên dùng chung kết nối và vòng poll kết quả)"""
         try:
             self.status_signal.emit("Đang gửi CAPTCHA đến 2Captcha...")
             
-            # API endpoint
-            api_url = "https://2captcha.com/in.php"
-            
-            # Request parameters
-            params = {
-                'key': self.api_key,
-                'method': 'userrecaptcha',
-                'googlekey': sitekey,
-                'pageurl': url,
-                'json': 1
-            }
-            
-            # Gửi request đến 2Captcha
-            response = requests.post(api_url, data=params)
-            data = response.json()
-            
-            if data.get('status') == 1:
-                # Lấy request ID
-                request_id = data.get('request')
-                
-                # Chờ kết quả
-                self.status_signal.emit(f"Đang đợi 2Captcha xử lý (ID: {request_id})...")
-                
-                # API endpoint cho kết quả
-                result_url = f"https://2captcha.com/res.php?key={self.api_key}&action=get&id={request_id}&json=1"
-                
-                # Polling cho đến khi có kết quả hoặc hết thời gian
-                for _ in range(wait_time):
-                    time.sleep(5)  # Wait 5 seconds between polls
-                    
-                    result_response = requests.get(result_url)
-                    result_data = result_response.json()
-                    
-                    if result_data.get('status') == 1:
-                        captcha_response = result_data.get('request')
-                        self.status_signal.emit("2Captcha đã giải thành công!")
-                        
-                        # Điền kết quả vào form
-                        script = f"""
-                        document.getElementById("g-recaptcha-response").innerHTML="{captcha_response}";
-                        if (typeof ___grecaptcha_cfg !== 'undefined') {{
-                            // Sử dụng callback của reCAPTCHA nếu có
-                            ___grecaptcha_cfg.clients[0].W.W.callback("{captcha_response}");
-                        }}
-                        """
-                        driver.execute_script(script)
-                        return True
-                
-                self.status_signal.emit("Hết thời gian chờ 2Captcha.")
-                return False
-            else:
-                self.status_signal.emit(f"Lỗi từ 2Captcha: {data.get('error_text', 'Unknown error')}")
+            # Hạn chót giữ như trước: wait_time lần hỏi, mỗi lần 5 giây
+            future = get_captcha_service(self.api_key).submit_recaptcha(sitekey, url, timeout=wait_time * 5)
+            captcha_response = self._wait_for_solution(future)
+            if not captcha_response:
                 return False
+                
+            # Điền kết quả vào form
+            script = f"""
+            document.getElementById("g-recaptcha-response").innerHTML="{captcha_response}";
+            if (typeof ___grecaptcha_cfg !== 'undefined') {{
+                // Sử dụng callback của reCAPTCHA nếu có
+                ___grecaptcha_cfg.clients[0].W.W.callback("{captcha_response}");
+            }}
+            """
+            driver.execute_script(script)
+            return True
         except Exception as e:
             self.status_signal.emit(f"Lỗi khi gọi 2Captcha API: {str(e)}")
             return False
     
     def _solve_image_with_2captcha(self, image_path, wait_time):
-        """Giải Image CAPTCHA sử dụng 2Captcha API"""
+        """Giải Image CAPTCHA qua CaptchaSolverService"""
         try:
             self.status_signal.emit("Đang gửi CAPTCHA đến 2Captcha...")
             
-            # API endpoint
-            api_url = "https://2captcha.com/in.php"
-            
             # Mở file và encode base64
             with open(image_path, 'rb') as img_file:
                 img_data = base64.b64encode(img_file.read()).decode('utf-8')
             
-            # Request parameters
-            params = {
-                'key': self.api_key,
-                'method': 'base64',
-                'body': img_data,
-                'json': 1
-            }
-            
-            # Gửi request đến 2Captcha
-            response = requests.post(api_url, data=params)
-            data = response.json()
-            
-            if data.get('status') == 1:
-                # Lấy request ID
-                request_id = data.get('request')
-                
-                # Chờ kết quả
-                self.status_signal.emit(f"Đang đợi 2Captcha xử lý (ID: {request_id})...")
-                
-                # API endpoint cho kết quả
-                result_url = f"https://2captcha.com/res.php?key={self.api_key}&action=get&id={request_id}&json=1"
-                
-                # Polling cho đến khi có kết quả hoặc hết thời gian
-                for _ in range(wait_time):
-                    time.sleep(5)  # Wait 5 seconds between polls
-                    
-                    result_response = requests.get(result_url)
-                    result_data = result_response.json()
-                    
-                    if result_data.get('status') == 1:
-                        captcha_text = result_data.get('request')
-                        self.status_signal.emit("2Captcha đã giải thành công!")
-                        return captcha_text
-                
-                self.status_signal.emit("Hết thời gian chờ 2Captcha.")
-                return None
-            else:
-                self.status_signal.emit(f"Lỗi từ 2Captcha: {data.get('error_text', 'Unknown error')}")
-                return None
+            future = get_captcha_service(self.api_key).submit_image(img_data, timeout=wait_time * 5)
+            return self._wait_for_solution(future)
         except Exception as e:
             self.status_signal.emit(f"Lỗi khi gọi 2Captcha API: {str(e)}")
             return None
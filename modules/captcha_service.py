@@ -0,0 +1,320 @@
+"""
+Module captcha_service.py
+Dịch vụ giải captcha bất đồng bộ (API kiểu 2Captcha: in.php / res.php) dùng chung cho nhiều phiên trình duyệt:
+  - submit_*() gửi captcha và trả về ngay concurrent.futures.Future (thread gọi tự chờ .result())
+  - Một event loop asyncio ở thread riêng: mọi ID đang chờ được hỏi kết quả chung trong một request
+    res.php?action=get&ids=... (tối đa CAPTCHA_POLL_BATCH ID), giãn dần khoảng hỏi lại (exponential backoff)
+  - Mỗi captcha có hạn chót; quá hạn thì Future nhận CaptchaTimeout
+  - HTTP qua requests.Session dùng chung (giữ kết nối), chạy trong thread pool của loop
+  - start_fake_solver() dựng server giả trên máy để test không cần tài khoản/Internet
+"""
+
+import json
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .config import (
+    CAPTCHA_API_URL, CAPTCHA_HTTP_TIMEOUT, CAPTCHA_HTTP_POOL_SIZE, CAPTCHA_SOLVE_TIMEOUT,
+    CAPTCHA_FIRST_POLL, CAPTCHA_POLL_INTERVAL, CAPTCHA_POLL_BACKOFF, CAPTCHA_POLL_MAX_INTERVAL,
+    CAPTCHA_POLL_BATCH
+)
+
+logger = logging.getLogger(__name__)
+
+NOT_READY = "CAPCHA_NOT_READY"
+NO_SLOT_RETRY_DELAY = 5  # Dịch vụ hết slot: gửi lại sau số giây này (trong hạn chót)
+
+
+class CaptchaError(Exception):
+    """Dịch vụ giải captcha trả về lỗi (mã lỗi của dịch vụ trong code)"""
+
+    def __init__(self, code, message=None):
+        super().__init__(message or code)
+        self.code = code
+
+
+class CaptchaTimeout(CaptchaError):
+    def __init__(self, captcha_id=None):
+        super().__init__("TIMEOUT", f"Hết thời gian chờ giải captcha (ID: {captcha_id})")
+
+
+class _Job:
+    """Một captcha đang chờ kết quả"""
+
+    def __init__(self, future, kind, deadline):
+        self.future = future
+        self.kind = kind
+        self.deadline = deadline
+        self.captcha_id = None
+        self.interval = CAPTCHA_POLL_INTERVAL
+        self.next_poll = None  # Đặt khi dịch vụ nhận captcha (có ID)
+
+
+class CaptchaSolverService:
+    """Gửi captcha và chờ kết quả cho nhiều phiên cùng lúc, dùng chung một vòng poll"""
+
+    def __init__(self, api_key, base_url=CAPTCHA_API_URL, timeout=CAPTCHA_HTTP_TIMEOUT,
+                 pool_size=CAPTCHA_HTTP_POOL_SIZE):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="CaptchaHTTP")
+        self._pending = {}  # captcha_id -> _Job đã có ID (chỉ truy cập trong thread của loop)
+        self._jobs = set()  # Mọi captcha chưa xong, kể cả đang gửi
+        self._jobs_lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._wakeup = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, name="CaptchaSolver", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    # ---------------- API CHO THREAD GỌI ----------------
+    def submit_recaptcha(self, sitekey, page_url, timeout=CAPTCHA_SOLVE_TIMEOUT, **extra):
+        """Gửi reCAPTCHA v2, Future trả về token g-recaptcha-response"""
+        params = {"method": "userrecaptcha", "googlekey": sitekey, "pageurl": page_url}
+        params.update(extra)
+        return self._submit("recaptcha", params, timeout)
+
+    def submit_image(self, image_base64, timeout=CAPTCHA_SOLVE_TIMEOUT, **extra):
+        """Gửi captcha ảnh (base64), Future trả về chuỗi ký tự trong ảnh"""
+        params = {"method": "base64", "body": image_base64}
+        params.update(extra)
+        return self._submit("image", params, timeout)
+
+    def pending_count(self):
+        return len(self._pending)
+
+    def close(self):
+        """Dừng vòng poll; các captcha chưa xong nhận CaptchaError("CLOSED")"""
+        if not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+    def _submit(self, kind, params, timeout):
+        future = Future()
+        job = _Job(future, kind, time.monotonic() + timeout)
+        with self._jobs_lock:
+            self._jobs.add(job)
+        future.add_done_callback(lambda _: self._forget(job))
+        asyncio.run_coroutine_threadsafe(self._send(job, params), self._loop)
+        return future
+
+    def _forget(self, job):
+        with self._jobs_lock:
+            self._jobs.discard(job)
+
+    # ---------------- EVENT LOOP ----------------
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._wakeup = asyncio.Event()
+        self._loop.create_task(self._poll_forever())
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            # Hủy poll và các lần gửi đang chạy; captcha chưa xong nhận lỗi CLOSED
+            tasks = asyncio.all_tasks(self._loop)
+            for task in tasks:
+                task.cancel()
+            self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self._pending.clear()
+            with self._jobs_lock:
+                jobs = list(self._jobs)
+            for job in jobs:
+                self._fail(job, CaptchaError("CLOSED", "Dịch vụ giải captcha đã dừng"))
+            self._loop.close()
+
+    async def _http(self, method, path, **kwargs):
+        """Gọi dịch vụ qua Session dùng chung trong thread pool, trả về nội dung text"""
+        url = f"{self.base_url}/{path}"
+
+        def _call():
+            response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            response.raise_for_status()
+            return response.text
+
+        return await self._loop.run_in_executor(self._executor, _call)
+
+    async def _send(self, job, params):
+        """Gửi captcha (in.php); hết slot thì thử lại tới hạn chót"""
+        data = dict(params, key=self.api_key, json=1)
+        while not job.future.cancelled():
+            try:
+                reply = json.loads(await self._http("POST", "in.php", data=data))
+            except Exception as e:
+                self._fail(job, CaptchaError("HTTP_ERROR", f"Không gửi được captcha: {e}"))
+                return
+            if reply.get("status") == 1:
+                job.captcha_id = str(reply.get("request"))
+                job.next_poll = time.monotonic() + CAPTCHA_FIRST_POLL.get(job.kind, CAPTCHA_POLL_INTERVAL)
+                self._pending[job.captcha_id] = job
+                self._wakeup.set()
+                return
+            code = str(reply.get("request") or "ERROR")
+            if code == "ERROR_NO_SLOT_AVAILABLE" and time.monotonic() + NO_SLOT_RETRY_DELAY < job.deadline:
+                await asyncio.sleep(NO_SLOT_RETRY_DELAY)
+                continue
+            self._fail(job, CaptchaError(code, reply.get("error_text") or code))
+            return
+
+    async def _poll_forever(self):
+        """Vòng poll chung: hỏi kết quả các ID đến hạn, ngủ tới ID đến hạn sớm nhất (hoặc khi có ID mới)"""
+        while True:
+            now = time.monotonic()
+            self._expire(now)
+            due = [job for job in self._pending.values() if job.next_poll <= now]
+            for start in range(0, len(due), CAPTCHA_POLL_BATCH):
+                await self._poll_batch(due[start:start + CAPTCHA_POLL_BATCH])
+
+            wake_at = min((min(job.next_poll, job.deadline) for job in self._pending.values()), default=None)
+            delay = max(0.05, wake_at - time.monotonic()) if wake_at is not None else None
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll_batch(self, jobs):
+        ids = [job.captcha_id for job in jobs]
+        try:
+            text = await self._http("GET", "res.php", params={
+                "key": self.api_key, "action": "get", "ids": ",".join(ids)
+            })
+        except Exception as e:
+            logger.warning(f"Không hỏi được kết quả captcha ({len(ids)} ID): {e}")
+            for job in jobs:
+                self._backoff(job)
+            return
+
+        answers = text.strip().split("|")
+        if len(answers) != len(jobs):
+            # Lỗi chung của cả request (vd sai API key) thay vì kết quả từng ID
+            if text.startswith("ERROR"):
+                for job in jobs:
+                    self._finish(job, error=CaptchaError(text.strip()))
+            else:
+                logger.warning(f"Phản hồi res.php không khớp số ID: {text[:200]}")
+                for job in jobs:
+                    self._backoff(job)
+            return
+
+        for job, answer in zip(jobs, answers):
+            if answer == NOT_READY:
+                self._backoff(job)
+            elif answer.startswith("ERROR"):
+                self._finish(job, error=CaptchaError(answer))
+            else:
+                self._finish(job, result=answer)
+
+    # ---------------- TRẠNG THÁI TỪNG CAPTCHA ----------------
+    @staticmethod
+    def _backoff(job):
+        job.next_poll = time.monotonic() + job.interval
+        job.interval = min(job.interval * CAPTCHA_POLL_BACKOFF, CAPTCHA_POLL_MAX_INTERVAL)
+
+    def _expire(self, now):
+        for job in [job for job in self._pending.values() if job.deadline <= now or job.future.cancelled()]:
+            self._finish(job, error=CaptchaTimeout(job.captcha_id))
+
+    def _finish(self, job, result=None, error=None):
+        self._pending.pop(job.captcha_id, None)
+        if error is not None:
+            self._fail(job, error)
+        elif not job.future.done():
+            job.future.set_result(result)
+
+    @staticmethod
+    def _fail(job, error):
+        if not job.future.done():
+            job.future.set_exception(error)
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_captcha_service(api_key, base_url=CAPTCHA_API_URL):
+    """Trả về CaptchaSolverService dùng chung theo (API key, địa chỉ dịch vụ)"""
+    with _services_lock:
+        service = _services.get((api_key, base_url))
+        if service is None:
+            service = CaptchaSolverService(api_key, base_url)
+            _services[(api_key, base_url)] = service
+        return service
+
+
+# ---------------- DỊCH VỤ GIẢ ĐỂ TEST ----------------
+def start_fake_solver(solve_after=1.0, answer="fake-answer", host="127.0.0.1", port=0):
+    """
+    Khởi động server giả lập in.php/res.php trong thread riêng (test không cần Internet).
+    Mỗi captcha có kết quả sau solve_after giây; answer là chuỗi hoặc hàm(params in.php) -> chuỗi.
+    Trả về (server, url); server.requests đếm số request theo path. Đóng bằng server.shutdown().
+    """
+    captchas = {}
+    lock = threading.Lock()
+
+    class _Handler(BaseHTTPRequestHandler):
+        def _reply(self, body):
+            payload = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _count(self, path):
+            with lock:
+                server.requests[path] = server.requests.get(path, 0) + 1
+
+        def do_POST(self):
+            path = urlsplit(self.path).path
+            self._count(path)
+            length = int(self.headers.get("Content-Length") or 0)
+            params = {k: v[0] for k, v in parse_qs(self.rfile.read(length).decode("utf-8")).items()}
+            if path != "/in.php" or not params.get("key"):
+                self._reply(json.dumps({"status": 0, "request": "ERROR_WRONG_USER_KEY"}))
+                return
+            with lock:
+                captcha_id = str(len(captchas) + 1000)
+                value = answer(params) if callable(answer) else answer
+                captchas[captcha_id] = (time.monotonic() + solve_after, value)
+            self._reply(json.dumps({"status": 1, "request": captcha_id}))
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            self._count(parts.path)
+            query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+            ids = (query.get("ids") or query.get("id") or "").split(",")
+            now = time.monotonic()
+            answers = []
+            with lock:
+                for captcha_id in ids:
+                    if captcha_id not in captchas:
+                        answers.append("ERROR_WRONG_CAPTCHA_ID")
+                        continue
+                    ready_at, value = captchas[captcha_id]
+                    answers.append(value if now >= ready_at else NOT_READY)
+            self._reply("|".join(answers))
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.requests = {}
+    threading.Thread(target=server.serve_forever, name="FakeCaptchaSolver", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
@@ -0,0 +1,263 @@
+"""
+Module chart_render.py
+Lớp vẽ biểu đồ cho màn hình phân tích dữ liệu lớn:
+  - Line: giảm mẫu LTTB theo độ rộng trục (pixel), giữ hình dạng đường với vài nghìn điểm
+  - Scatter: nhiều điểm thì vẽ hexbin (mật độ) thay vì từng điểm
+  - Bar/Pie: gộp theo nhóm, chỉ giữ top N nhóm lớn nhất + "Other"
+  - Histogram: tính sẵn bằng np.histogram
+  - Dữ liệu đã gộp được cache theo (loại biểu đồ, cột, phiên bản dữ liệu/bộ lọc, độ rộng)
+  - Cùng loại biểu đồ và cùng cột: cập nhật dữ liệu của artist hiện có và blit thay vì dựng lại figure
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+TOP_N_GROUPS = 20              # Số nhóm tối đa của bar/pie (phần còn lại gộp vào "Other")
+HEXBIN_MIN_POINTS = 50000      # Scatter từ ngưỡng này chuyển sang hexbin
+HEXBIN_GRID_SIZE = 60
+HISTOGRAM_BINS = 10
+LINE_MARKER_MAX_POINTS = 200   # Chỉ vẽ marker khi đường có ít điểm
+CACHE_SIZE = 32
+
+
+def lttb_indices(x, y, threshold):
+    """Chỉ số các điểm được giữ lại theo Largest-Triangle-Three-Buckets (luôn giữ điểm đầu và cuối)"""
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    every = (n - 2) / (threshold - 2)
+    edges = (np.arange(threshold - 1) * every).astype(np.int64) + 1
+    edges[-1] = n - 1
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        xs = x[start:end]
+        ys = y[start:end]
+        area = np.abs((x[a] - avg_x) * (ys - y[a]) - (x[a] - xs) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        indices[i + 1] = a
+    return indices
+
+
+def _position_values(series):
+    """Giá trị số dùng để tính hình học trên trục x: số, datetime (ns) hoặc vị trí dòng"""
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return series.to_numpy().astype("datetime64[ns]").astype(np.int64).astype(float), True
+    if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        return series.to_numpy(dtype=float), True
+    return np.arange(len(series), dtype=float), False
+
+
+def top_groups(labels, values, limit=TOP_N_GROUPS):
+    """Series tổng theo nhóm; quá limit nhóm thì giữ limit-1 nhóm lớn nhất và gộp phần còn lại vào "Other" """
+    totals = pd.Series(values).groupby(pd.Series(labels), sort=False, observed=True).sum()
+    if len(totals) <= limit:
+        return totals
+    top = totals.nlargest(limit - 1)
+    other = totals.drop(top.index).sum()
+    return pd.concat([top, pd.Series({"Other": other})])
+
+
+class ChartRenderer:
+    """Vẽ dữ liệu đã gộp lên một figure/canvas có sẵn"""
+
+    def __init__(self, figure, canvas):
+        self.figure = figure
+        self.canvas = canvas
+        self.ax = None
+        self.artist = None          # Artist có thể cập nhật tại chỗ (đường của line, điểm của scatter)
+        self.signature = None
+        self._background = None
+        self._cache = OrderedDict()
+        canvas.mpl_connect("draw_event", self._on_draw)
+
+    # ---------------- CHUẨN BỊ DỮ LIỆU ----------------
+    def target_points(self):
+        """Số điểm cần cho line: khoảng 2 điểm mỗi pixel chiều ngang của trục"""
+        width = self.ax.bbox.width if self.ax is not None else self.figure.bbox.width * 0.8
+        return max(200, int(width) * 2)
+
+    def prepare(self, kind, df, x_column, y_column, version):
+        """Dữ liệu đã gộp cho biểu đồ (cache theo phiên bản dữ liệu/bộ lọc của widget)"""
+        points = self.target_points() if kind == "line" else 0
+        key = (kind, x_column, y_column, version, points)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        payload = self._aggregate(kind, df, x_column, y_column, points)
+        self._cache[key] = payload
+        while len(self._cache) > CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return payload
+
+    def _aggregate(self, kind, df, x_column, y_column, points):
+        if kind == "pie":
+            counts = df[x_column].value_counts(sort=True)
+            if len(counts) > TOP_N_GROUPS:
+                top = counts.iloc[:TOP_N_GROUPS - 1]
+                counts = pd.concat([top, pd.Series({"Other": counts.iloc[TOP_N_GROUPS - 1:].sum()})])
+            return {"kind": "pie", "groups": counts, "total": len(df)}
+
+        if kind == "hist":
+            values = pd.to_numeric(df[x_column], errors="coerce").dropna().to_numpy(dtype=float)
+            counts, edges = np.histogram(values, bins=HISTOGRAM_BINS)
+            return {"kind": "hist", "counts": counts, "edges": edges, "total": len(values)}
+
+        x = df[x_column]
+        y = pd.to_numeric(df[y_column], errors="coerce")
+        valid = y.notna().to_numpy()
+        x = x[valid]
+        y_values = y.to_numpy(dtype=float)[valid]
+
+        if kind == "bar":
+            return {"kind": "bar", "groups": top_groups(x.to_numpy(), y_values), "total": len(y_values)}
+
+        positions, numeric_x = _position_values(x)
+        if kind == "scatter":
+            if not numeric_x:
+                raise ValueError(f"Column '{x_column}' is not numeric")
+            if len(y_values) >= HEXBIN_MIN_POINTS:
+                return {"kind": "hexbin", "x": positions, "y": y_values, "total": len(y_values)}
+            return {"kind": "scatter", "x": x.to_numpy(), "y": y_values, "numeric_x": True,
+                    "total": len(y_values)}
+
+        indices = lttb_indices(positions, y_values, points)
+        return {"kind": "line", "x": x.to_numpy()[indices], "y": y_values[indices],
+                "numeric_x": numeric_x, "total": len(y_values)}
+
+    # ---------------- VẼ ----------------
+    def render(self, payload, x_column, y_column, title, legend=True, grid=True):
+        signature = (payload["kind"], x_column, y_column, legend, grid)
+        if (signature == self.signature and self.artist is not None
+                and payload["kind"] in ("line", "scatter") and payload.get("numeric_x")):
+            self._update_in_place(payload, title)
+            return
+        self._rebuild(payload, x_column, y_column, title, legend, grid)
+        self.signature = signature
+
+    def _rebuild(self, payload, x_column, y_column, title, legend, grid):
+        self.figure.clear()
+        self.ax = ax = self.figure.add_subplot(111)
+        self.artist = None
+        self._background = None
+        kind = payload["kind"]
+
+        if kind == "line":
+            marker = "o" if len(payload["y"]) <= LINE_MARKER_MAX_POINTS else None
+            (self.artist,) = ax.plot(payload["x"], payload["y"], marker=marker, label=y_column)
+        elif kind == "scatter":
+            self.artist = ax.scatter(payload["x"], payload["y"], s=12)
+        elif kind == "hexbin":
+            collection = ax.hexbin(payload["x"], payload["y"], gridsize=HEXBIN_GRID_SIZE, mincnt=1, cmap="viridis")
+            self.figure.colorbar(collection, ax=ax, label="count")
+        elif kind == "bar":
+            groups = payload["groups"]
+            labels = [str(label) for label in groups.index]
+            ax.bar(range(len(groups)), groups.to_numpy(), label=y_column)
+            ax.set_xticks(range(len(groups)))
+            ax.set_xticklabels(labels, rotation=45, ha="right")
+        elif kind == "pie":
+            groups = payload["groups"]
+            ax.pie(groups.to_numpy(), labels=[str(label) for label in groups.index],
+                   autopct="%1.1f%%", shadow=True)
+            ax.axis("equal")  # Equal aspect ratio ensures that pie is drawn as a circle
+        elif kind == "hist":
+            edges = payload["edges"]
+            ax.bar(edges[:-1], payload["counts"], width=np.diff(edges), align="edge")
+
+        if kind not in ("pie", "hexbin"):
+            ax.grid(grid)
+        if legend and kind in ("line", "bar"):
+            ax.legend()
+        ax.set_xlabel(x_column)
+        if kind not in ("pie", "hist"):
+            ax.set_ylabel(y_column)
+        ax.set_title(title)
+
+        if self.artist is not None:
+            # Artist được vẽ riêng (blit) nên lần cập nhật sau chỉ cần vẽ lại nó trên nền đã lưu
+            self.artist.set_animated(True)
+        self.figure.tight_layout()
+        self.canvas.draw()
+
+    def _update_in_place(self, payload, title):
+        x, y = payload["x"], payload["y"]
+        if payload["kind"] == "line":
+            self.artist.set_data(x, y)
+        else:
+            self.artist.set_offsets(np.column_stack([x, y]) if len(y) else np.empty((0, 2)))
+
+        if self._fits_axes(payload) and self._background is not None and self.ax.get_title() == title:
+            # Trục giữ nguyên: chỉ khôi phục nền và vẽ lại artist
+            self.canvas.restore_region(self._background)
+            self.ax.draw_artist(self.artist)
+            self.canvas.blit(self.ax.bbox)
+            return
+
+        # Dữ liệu vượt ra ngoài trục: đổi giới hạn trục, vẽ lại canvas (không dựng lại figure)
+        if len(y):
+            x = self._axis_x(x)
+            self.ax.set_xlim(*self._padded(np.min(x), np.max(x)))
+            self.ax.set_ylim(*self._padded(np.nanmin(y), np.nanmax(y)))
+        self.ax.set_title(title)
+        self.canvas.draw_idle()
+
+    def _fits_axes(self, payload):
+        if not len(payload["y"]):
+            return True
+        x_low, x_high = self.ax.get_xlim()
+        y_low, y_high = self.ax.get_ylim()
+        x = self._axis_x(payload["x"])
+        return (x_low <= np.min(x) and np.max(x) <= x_high
+                and y_low <= np.nanmin(payload["y"]) and np.nanmax(payload["y"]) <= y_high)
+
+    def _axis_x(self, x):
+        """Giá trị x theo đơn vị của trục (datetime được đổi sang số ngày của matplotlib)"""
+        if np.issubdtype(np.asarray(x).dtype, np.datetime64):
+            return np.asarray(self.ax.convert_xunits(x), dtype=float)
+        return x
+
+    @staticmethod
+    def _padded(low, high):
+        span = high - low
+        if not span:
+            return low - 1, high + 1
+        return low - span * 0.05, high + span * 0.05
+
+    def _on_draw(self, event):
+        """Sau mỗi lần vẽ đầy đủ: lưu nền (không có artist) rồi vẽ artist lên trên"""
+        if self.artist is None or self.ax is None:
+            return
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.artist)
+
+    # ---------------- TIỆN ÍCH ----------------
+    def clear(self):
+        self.figure.clear()
+        self.ax = None
+        self.artist = None
+        self.signature = None
+        self._background = None
+        self.canvas.draw()
+
+    def invalidate(self):
+        """Bỏ cache (khi dữ liệu thay đổi)"""
+        self._cache.clear()
+
+    def savefig(self, path, **kwargs):
+        """Lưu figure ra file (artist blit được tạm vẽ như artist thường)"""
+        if self.artist is not None:
+            self.artist.set_animated(False)
+        try:
+            self.figure.savefig(path, **kwargs)
+        finally:
+            if self.artist is not None:
+                self.artist.set_animated(True)
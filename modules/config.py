@@ -152,6 +152,14 @@ WINDOW_SIZE = (1200, 800)  # Default window size
 LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
 LOG_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
 LOG_LEVEL = 'INFO'
+LOG_FILE_MAX_BYTES = 10 * 1024 * 1024  # Xoay file log khi vượt kích thước này (ngoài việc xoay lúc nửa đêm)
+LOG_BACKUP_COUNT = 14           # Số file log cũ giữ lại
+LOG_JSON_FILE = False           # Ghi thêm logs/app.jsonl (mỗi dòng một JSON) để phân tích
+LOG_CONSOLE_MAX_LINES = 5000   # Số dòng tối đa giữ lại trong khung log
+LOG_CONSOLE_FLUSH_MS = 100      # Chu kỳ đẩy log từ bộ đệm lên khung log
+LOG_CONSOLE_BUFFER = 2000       # Số dòng chờ tối đa giữa hai lần đẩy (quá thì bỏ dòng cũ nhất)
+TELEMETRY_ENABLED = os.getenv("TELEMETRY_ENABLED", "True").lower() == "true"
+TELEMETRY_FILE = os.path.join(LOGS_DIR, "telemetry.jsonl")  # Thời gian từng giai đoạn của task (JSONL)
 
 # Cấu hình ứng dụng
 APP_TITLE = "Selenium Automation Hub"
@@ -163,6 +171,43 @@ APP_VERSION = "2.0.0"
 DEFAULT_RETRY = 3
 DEFAULT_TIMEOUT = 30
 
+# Chờ theo điều kiện (modules/waits.py)
+WAIT_TIMEOUT = 10               # Giây chờ tối đa mặc định
+WAIT_POLL_INTERVAL = 0.1        # Chu kỳ kiểm tra điều kiện (giây)
+NETWORK_IDLE_MS = 300           # Mạng rảnh khi không có request nào trong khoảng này
+DOM_QUIET_MS = 300              # DOM ổn định khi không thay đổi trong khoảng này
+
+# Chế độ tải nhanh bằng HTTP (modules/http_fetcher.py)
+HTTP_BROWSER_HOST_TTL = 600     # Giây một host bị chặn/cần JS chỉ đi qua trình duyệt, hết hạn thì thử lại HTTP
+HTTP_FETCHER_CACHE_SIZE = 16    # Số HttpFetcher (mỗi proxy một session) giữ lại, proxy dùng lâu nhất bị đóng trước
+
+# Chế độ trang nhẹ (modules/lean_page.py): chặn tài nguyên không cần cho việc đọc text/href
+LEAN_PAGE_ENABLED = os.getenv("LEAN_PAGE_ENABLED", "True").lower() == "true"
+LEAN_PAGE_RESOURCE_PATTERNS = {
+    "image": ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.avif*", "*.svg*", "*.ico*"],
+    "font": ["*.woff*", "*.woff2*", "*.ttf*", "*.otf*", "*.eot*"],
+    "media": ["*.mp4*", "*.webm*", "*.m3u8*", "*.mp3*", "*.ogg*"],
+}
+LEAN_PAGE_AD_HOSTS = [
+    "*doubleclick.net*", "*googlesyndication.com*", "*googleadservices.com*", "*googletagmanager.com*",
+    "*google-analytics.com*", "*adservice.google.*", "*connect.facebook.net*", "*hotjar.com*",
+    "*criteo.com*", "*criteo.net*", "*scorecardresearch.com*", "*clarity.ms*", "*tiktok.com/i18n/pixel*",
+]
+# Theo task: loại tài nguyên bị chặn, có chặn host quảng cáo/analytics không, và URL chặn thêm.
+# Task không có trong danh sách (vd facebook) được tải trang đầy đủ.
+LEAN_PAGE_PROFILES = {
+    "google": {"block": ["image", "font", "media"], "ads": True,
+               "urls": ["*://encrypted-tbn*.gstatic.com/*", "*://*.gstatic.com/images*"]},
+    "google_batch": {"block": ["image", "font", "media"], "ads": True,
+                     "urls": ["*://encrypted-tbn*.gstatic.com/*", "*://*.gstatic.com/images*"]},
+    "shopee": {"block": ["image", "font", "media"], "ads": True,
+               "urls": ["*://cf.shopee.vn/file/*", "*://down-*.img.susercontent.com/*"]},
+}
+
+# Shopee: đọc sản phẩm từ JSON của API tìm kiếm (bắt qua performance log/CDP) thay vì DOM
+SHOPEE_NETWORK_CAPTURE = os.getenv("SHOPEE_NETWORK_CAPTURE", "True").lower() == "true"
+SHOPEE_CAPTURE_TIMEOUT = 15     # Giây chờ response API của mỗi trang
+
 # Định nghĩa màu sắc chung cho giao diện
 COLORS = {
     "primary": "#0d6efd",
@@ -197,6 +242,39 @@ ENABLE_STEALTH_MODE = os.getenv("ENABLE_STEALTH_MODE", "True").lower() == "true"
 ENABLE_PROXY_ROTATION = os.getenv("ENABLE_PROXY_ROTATION", "False").lower() == "true"
 CAPTCHA_SERVICE = os.getenv("CAPTCHA_SERVICE", "manual")  # 'manual', '2captcha', 'anticaptcha', 'auto'
 CAPTCHA_API_KEY = os.getenv("CAPTCHA_API_KEY", "")
+CAPTCHA_API_URL = os.getenv("CAPTCHA_API_URL", "https://2captcha.com")  # Đổi sang server giả khi test
+
+# Dịch vụ giải captcha bất đồng bộ (modules/captcha_service.py)
+CAPTCHA_HTTP_TIMEOUT = 15       # Giây cho mỗi request tới dịch vụ giải
+CAPTCHA_HTTP_POOL_SIZE = 8      # Số kết nối giữ sẵn / số request chạy song song
+CAPTCHA_SOLVE_TIMEOUT = 180     # Hạn chót mặc định cho một captcha (giây, tính từ lúc gửi)
+CAPTCHA_FIRST_POLL = {"recaptcha": 15, "image": 5}  # Chờ trước lần hỏi kết quả đầu tiên (giây)
+CAPTCHA_POLL_INTERVAL = 3       # Khoảng hỏi lại ban đầu, nhân CAPTCHA_POLL_BACKOFF sau mỗi lần chưa xong
+CAPTCHA_POLL_BACKOFF = 1.5
+CAPTCHA_POLL_MAX_INTERVAL = 15
+CAPTCHA_POLL_BATCH = 100        # Số ID tối đa trong một request res.php?ids=...
+
+# Cấu hình browser pool (giữ sẵn trình duyệt đã khởi động giữa các task)
+BROWSER_POOL_MAX_PER_KEY = int(os.getenv("BROWSER_POOL_MAX_PER_KEY", "2"))
+BROWSER_POOL_MAX_TOTAL = int(os.getenv("BROWSER_POOL_MAX_TOTAL", "4"))
+BROWSER_POOL_WARM_SIZE = int(os.getenv("BROWSER_POOL_WARM_SIZE", "1"))
+BROWSER_POOL_IDLE_TIMEOUT = 300  # Giây rảnh tối đa trước khi đóng driver
+BROWSER_POOL_MAX_USES = 50  # Số task tối đa một driver phục vụ trước khi khởi động lại
+BROWSER_POOL_ACQUIRE_TIMEOUT = 120
+
+# Cấu hình kiểm tra proxy (asyncio)
+PROXY_CHECK_TARGET = os.getenv("PROXY_CHECK_TARGET", "https://www.google.com/generate_204")
+PROXY_CHECK_CONCURRENCY = int(os.getenv("PROXY_CHECK_CONCURRENCY", "200"))
+PROXY_CHECK_TIMEOUT = 8  # Giây cho toàn bộ một probe
+PROXY_VERIFY_TIMEOUT = 5  # Giây cho mỗi tầng xác minh proxy
+PROXY_VERIFY_TTL = 300  # Cache kết quả proxy hoạt động (giây)
+PROXY_VERIFY_NEGATIVE_TTL = 60  # Cache kết quả proxy lỗi (giây)
+
+# Cấu hình chọn proxy theo điểm (ProxyPool)
+PROXY_POOL_EWMA_ALPHA = 0.2  # Trọng số của kết quả mới nhất trong tỉ lệ thành công
+PROXY_POOL_FAILURE_THRESHOLD = 3  # Số lỗi liên tiếp trước khi ngắt mạch proxy
+PROXY_POOL_BASE_COOLDOWN = 30  # Cooldown lần đầu (giây), nhân đôi sau mỗi lần ngắt liên tiếp
+PROXY_POOL_MAX_COOLDOWN = 900
 
 # Tạo các thư mục cần thiết
 for directory in [DATA_DIR, SCRIPTS_DIR, LOGS_DIR, DOWNLOADS_DIR]:
@@ -220,3 +298,23 @@ HEADLESS_OPTIONS = {
     "disable_dev_shm_usage": True,
     "window-size": "1920,1080"
 }
+
+# Cấu hình bộ thực thi task của scheduler
+TASK_EXECUTOR_MAX_WORKERS = 3          # Số task chạy đồng thời tối đa
+TASK_EXECUTOR_SITE_LIMITS = {          # Số task đồng thời tối đa theo trang đích
+    "google": 2,
+    "facebook": 1,
+    "shopee": 2
+}
+TASK_EXECUTOR_PROXY_LIMIT = 2          # Số task đồng thời tối đa qua cùng một proxy
+TASK_EXECUTOR_MAX_QUEUE = 500          # Số task chờ tối đa (vượt quá sẽ bị bỏ qua)
+
+# Cấu hình chạy script người dùng trong tiến trình riêng
+SCRIPT_RUNNER_WORKERS = max(1, min(4, (os.cpu_count() or 2) // 2))  # Số tiến trình chạy script khởi động sẵn
+SCRIPT_RUNNER_TIMEOUT = 600            # Thời gian chạy tối đa của một script (giây)
+SCRIPT_RUNNER_MEMORY_MB = 2048         # Bộ nhớ tối đa (tiến trình script + trình duyệt của nó)
+SCRIPT_RUNNER_WARM_DRIVER = False      # Khởi động sẵn trình duyệt trong mỗi tiến trình
+
+# Cấu hình nhập dữ liệu vào màn hình phân tích
+DATA_IMPORT_CHUNK_ROWS = 100000        # Số dòng mỗi lần đọc (CSV) / mỗi batch (Parquet, Feather)
+DATA_IMPORT_CATEGORY_RATIO = 0.5       # Cột chuỗi có tỉ lệ giá trị khác nhau dưới ngưỡng này -> category
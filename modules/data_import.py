@@ -0,0 +1,157 @@
+"""
+Module data_import.py
+Nhập dữ liệu lớn vào màn hình phân tích trong thread nền:
+  - CSV/TSV đọc theo từng khối (chunksize), Parquet/Feather/Arrow đọc theo batch bằng pyarrow (memory-map)
+  - Thu nhỏ kiểu số (int64 -> int8/16/32, float64 -> float32 khi không mất chính xác)
+  - Cột chuỗi ít giá trị khác nhau được chuyển thành category
+  - Gửi dữ liệu đã đọc lên giao diện trong lúc đọc, có tiến độ và hủy giữa chừng
+  - Nguồn khác (vd ResultStore.iter_frames) truyền qua chunk_source
+"""
+
+import os
+import traceback
+
+import numpy as np
+import pandas as pd
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from .config import DATA_IMPORT_CHUNK_ROWS, DATA_IMPORT_CATEGORY_RATIO
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pa_parquet
+except ImportError:
+    pa = None
+
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+ARROW_EXTENSIONS = (".feather", ".arrow", ".ipc")
+FILE_FILTER = ("Data Files (*.csv *.tsv *.txt *.parquet *.pq *.feather *.arrow *.ipc);;"
+               "CSV Files (*.csv *.tsv *.txt);;Parquet Files (*.parquet *.pq);;"
+               "Feather/Arrow Files (*.feather *.arrow *.ipc)")
+
+
+def downcast_numeric(df):
+    """Thu nhỏ kiểu số của từng cột (tại chỗ), float chỉ hạ xuống float32 khi không đổi giá trị"""
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_bool_dtype(series.dtype):
+            continue
+        if pd.api.types.is_integer_dtype(series.dtype):
+            df[column] = pd.to_numeric(series, downcast="integer")
+        elif pd.api.types.is_float_dtype(series.dtype) and series.dtype != np.float32:
+            values = series.to_numpy()
+            narrowed = values.astype(np.float32)
+            if np.array_equal(narrowed.astype(values.dtype), values, equal_nan=True):
+                df[column] = narrowed
+    return df
+
+
+def categorize_strings(df, max_ratio=DATA_IMPORT_CATEGORY_RATIO):
+    """Chuyển các cột chuỗi ít giá trị khác nhau thành category (tại chỗ)"""
+    rows = len(df)
+    if rows == 0:
+        return df
+    for column in df.columns:
+        series = df[column]
+        if series.dtype != object and not pd.api.types.is_string_dtype(series.dtype):
+            continue
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            continue
+        if series.nunique(dropna=True) <= rows * max_ratio:
+            df[column] = series.astype("category")
+    return df
+
+
+class DataImportWorker(QThread):
+    """Đọc file dữ liệu (hoặc chunk_source) theo khối trong thread nền"""
+    progress = pyqtSignal(int)                  # 0-100
+    partial_ready = pyqtSignal(object, int)     # DataFrame đã đọc tới hiện tại, số dòng
+    import_finished = pyqtSignal(object, bool)  # DataFrame cuối cùng, True nếu đọc hết (False nếu bị hủy)
+    import_failed = pyqtSignal(str)
+
+    def __init__(self, file_path, chunk_rows=DATA_IMPORT_CHUNK_ROWS, parent=None, chunk_source=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.chunk_rows = chunk_rows
+        self.chunk_source = chunk_source  # Hàm trả về iterator (DataFrame, tỉ lệ 0-1), thay cho file
+        self._stopped = False
+
+    def stop(self):
+        self._stopped = True
+
+    def run(self):
+        chunks = []
+        rows = 0
+        next_publish = self.chunk_rows
+        try:
+            for chunk, fraction in self.iter_chunks():
+                chunks.append(downcast_numeric(chunk))
+                rows += len(chunk)
+                self.progress.emit(min(99, int(fraction * 100)))
+                # Gửi bản ghép khi số dòng tăng gấp đôi: tổng chi phí ghép vẫn tuyến tính theo số dòng
+                if rows >= next_publish:
+                    chunks = [pd.concat(chunks, ignore_index=True)]
+                    self.partial_ready.emit(chunks[0], rows)
+                    next_publish = rows * 2
+                if self._stopped:
+                    break
+
+            df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+            # Category tính trên toàn bộ dữ liệu (từng khối có tập giá trị khác nhau, ghép lại sẽ thành object)
+            df = categorize_strings(df)
+            self.progress.emit(100)
+            self.import_finished.emit(df, not self._stopped)
+        except Exception as e:
+            traceback.print_exc()
+            self.import_failed.emit(str(e))
+
+    # ---------------- ĐỌC THEO ĐỊNH DẠNG ----------------
+    def iter_chunks(self):
+        """Sinh (DataFrame, tỉ lệ đã đọc 0-1) theo định dạng file"""
+        if self.chunk_source is not None:
+            return self.chunk_source()
+        extension = os.path.splitext(self.file_path)[1].lower()
+        if extension in PARQUET_EXTENSIONS:
+            return self._iter_parquet()
+        if extension in ARROW_EXTENSIONS:
+            return self._iter_arrow()
+        return self._iter_csv(sep="\t" if extension == ".tsv" else ",")
+
+    def _iter_csv(self, sep=","):
+        size = max(1, os.path.getsize(self.file_path))
+        with open(self.file_path, "rb") as handle:
+            reader = pd.read_csv(handle, sep=sep, chunksize=self.chunk_rows, low_memory=False)
+            for chunk in reader:
+                yield chunk, handle.tell() / size
+
+    def _iter_parquet(self):
+        if pa is None:
+            raise ImportError("Cần cài pyarrow để đọc file Parquet (pip install pyarrow)")
+        parquet_file = pa_parquet.ParquetFile(self.file_path, memory_map=True)
+        total = max(1, parquet_file.metadata.num_rows)
+        done = 0
+        for batch in parquet_file.iter_batches(batch_size=self.chunk_rows):
+            done += batch.num_rows
+            yield batch.to_pandas(), done / total
+
+    def _iter_arrow(self):
+        if pa is None:
+            raise ImportError("Cần cài pyarrow để đọc file Feather/Arrow (pip install pyarrow)")
+        # Feather v2 là file Arrow IPC: memory-map nên dữ liệu chỉ được đọc từ đĩa khi chuyển sang pandas
+        with pa.memory_map(self.file_path, "r") as source:
+            try:
+                reader = pa_ipc.open_file(source)
+            except pa.ArrowInvalid:
+                # Feather v1 (định dạng cũ) không đọc theo batch được
+                yield pd.read_feather(self.file_path), 1.0
+                return
+            total = max(1, sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches)))
+            done = 0
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                # File ghi từ pandas thường chỉ có một batch lớn: cắt nhỏ để có tiến độ và hiển thị dần
+                for offset in range(0, batch.num_rows, self.chunk_rows):
+                    part = batch.slice(offset, self.chunk_rows)
+                    done += part.num_rows
+                    yield part.to_pandas(), done / total
@@ -1,10 +1,12 @@
 # modules/data_processing.py
 
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QLineEdit, QTableWidget, QTableWidgetItem, QPushButton, QFileDialog
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QLineEdit, QTableView, QPushButton, QFileDialog
 from PyQt5.QtGui import QFont
 from PyQt5.QtCore import Qt
 import pandas as pd
 
+from .dataframe_model import DataFrameTableModel
+
 class DataProcessingWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -24,7 +26,10 @@ class DataProcessingWidget(QWidget):
         self.filter_edit.textChanged.connect(self.apply_filter)
         layout.addWidget(self.filter_edit)
 
-        self.table = QTableWidget()
+        self.table_model = DataFrameTableModel()
+        self.table = QTableView()
+        self.table.setModel(self.table_model)
+        self.table.setSortingEnabled(True)
         layout.addWidget(self.table)
 
         export_btn = QPushButton("Xuất CSV")
@@ -54,20 +59,7 @@ class DataProcessingWidget(QWidget):
         self.update_table(filtered)
 
     def update_table(self, df: pd.DataFrame):
-        self.table.clear()
-        if df.empty:
-            self.table.setRowCount(0)
-            self.table.setColumnCount(0)
-            return
-
-        self.table.setColumnCount(len(df.columns))
-        self.table.setRowCount(len(df))
-        self.table.setHorizontalHeaderLabels(df.columns)
-
-        for i in range(len(df)):
-            for j, col in enumerate(df.columns):
-                val = str(df.iloc[i][col])
-                self.table.setItem(i, j, QTableWidgetItem(val))
+        self.table_model.set_dataframe(df)
 
     def export_csv(self):
         if self.df.empty:
@@ -1,10 +1,20 @@
 # modules/data_view.py
 import pandas as pd
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QLineEdit, QTableWidget, QPushButton, QFileDialog, QMessageBox, QTableWidgetItem, QHeaderView
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QLineEdit, QTableView, QPushButton, QFileDialog, QMessageBox, QHeaderView
 from PyQt5.QtGui import QFont
 from PyQt5.QtCore import Qt
 import traceback
 from .config import THEMES, DEFAULT_THEME
+from .dataframe_model import DataFrameTableModel
+
+DATA_COLUMNS = [
+    ("timestamp", "Thời gian"),
+    ("source", "Nguồn"),
+    ("type", "Loại"),
+    ("content", "Nội dung"),
+    ("status", "Trạng thái"),
+    ("details", "Chi tiết"),
+]
 
 class DataWidget(QWidget):
     def __init__(self, parent=None):
@@ -22,9 +32,11 @@ class DataWidget(QWidget):
         self.filter_edit.setPlaceholderText("Lọc dữ liệu...")
         self.filter_edit.textChanged.connect(self.filter_data)
         layout.addWidget(self.filter_edit)
-        self.data_table = QTableWidget()
-        self.data_table.setColumnCount(6)
-        self.data_table.setHorizontalHeaderLabels(["Thời gian", "Nguồn", "Loại", "Nội dung", "Trạng thái", "Chi tiết"])
+        self.table_model = DataFrameTableModel(columns=DATA_COLUMNS)
+        self.data_table = QTableView()
+        self.data_table.setModel(self.table_model)
+        self.data_table.setSortingEnabled(True)
+        self.data_table.setEditTriggers(QTableView.NoEditTriggers)
         header = self.data_table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.Stretch)
         layout.addWidget(self.data_table)
@@ -42,15 +54,7 @@ class DataWidget(QWidget):
         self.update_table(filtered)
 
     def update_table(self, df: pd.DataFrame):
-        self.data_table.clearContents()
-        self.data_table.setRowCount(len(df))
-        for i, row in df.iterrows():
-            self.data_table.setItem(i, 0, QTableWidgetItem(str(row.get("timestamp", ""))))
-            self.data_table.setItem(i, 1, QTableWidgetItem(str(row.get("source", ""))))
-            self.data_table.setItem(i, 2, QTableWidgetItem(str(row.get("type", ""))))
-            self.data_table.setItem(i, 3, QTableWidgetItem(str(row.get("content", ""))))
-            self.data_table.setItem(i, 4, QTableWidgetItem(str(row.get("status", ""))))
-            self.data_table.setItem(i, 5, QTableWidgetItem(str(row.get("details", ""))))
+        self.table_model.set_dataframe(df)
 
     def export_csv(self):
         if self.scraped_data.empty:
@@ -96,13 +100,13 @@ class DataWidget(QWidget):
                 QPushButton:hover {{
                     background-color: {theme["accent_hover"]};
                 }}
-                QTableWidget {{
+                QTableView {{
                     background-color: {theme["bg_secondary"]};
                     color: {theme["text_primary"]};
                     border: 1px solid {theme["border"]};
                     gridline-color: {theme["border"]};
                 }}
-                QTableWidget::item {{
+                QTableView::item {{
                     padding: 5px;
                 }}
                 QHeaderView::section {{
@@ -0,0 +1,189 @@
+"""
+Module dataframe_model.py
+Model bảng đọc trực tiếp từ DataFrame cho QTableView:
+  - Không tạo QTableWidgetItem cho từng ô, chỉ định dạng các ô đang hiển thị
+  - Giá trị lấy từ mảng NumPy của từng cột (không dùng iterrows/iloc cho từng ô)
+  - Sắp xếp bằng argsort trên mảng cột, chỉ lưu hoán vị chỉ số dòng
+  - Lọc bằng mask/danh sách vị trí dòng, không sao chép DataFrame
+"""
+
+import math
+import datetime
+
+import numpy as np
+import pandas as pd
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+
+def format_value(value):
+    """Chuỗi hiển thị của một ô (ô trống cho None/NaN/NaT)"""
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        if math.isnan(value):
+            return ""
+        return f"{value:.10g}"
+    if isinstance(value, np.floating):
+        return "" if np.isnan(value) else f"{float(value):.10g}"
+    if isinstance(value, np.datetime64):
+        return "" if np.isnat(value) else str(pd.Timestamp(value))
+    if value is pd.NaT:
+        return ""
+    if isinstance(value, (pd.Timestamp, datetime.datetime)):
+        return str(value)
+    return str(value)
+
+
+class DataFrameTableModel(QAbstractTableModel):
+    """
+    QAbstractTableModel dựa trên pandas DataFrame.
+    columns (tùy chọn): list (tên cột trong DataFrame, tiêu đề hiển thị) để cố định cột và tiêu đề;
+    cột không có trong DataFrame hiển thị ô trống.
+    """
+
+    def __init__(self, df=None, columns=None, parent=None):
+        super().__init__(parent)
+        self._fixed_columns = list(columns) if columns else None
+        self._df = pd.DataFrame()
+        self._keys = []
+        self._headers = []
+        self._arrays = []
+        self._numeric = []
+        self._rows = None   # Vị trí các dòng được lọc trong DataFrame (None = tất cả)
+        self._order = None  # Hoán vị dòng sau khi sắp xếp (None = thứ tự gốc)
+        self._sort = None   # (cột, thứ tự) đang áp dụng
+        self.set_dataframe(df if df is not None else pd.DataFrame())
+
+    # ---------------- DỮ LIỆU ----------------
+    def set_dataframe(self, df, rows=None):
+        """
+        Thay DataFrame hiển thị (giữ nguyên cách sắp xếp hiện tại nếu còn cột đó).
+        rows: mask bool hoặc mảng vị trí dòng cần hiển thị (None = tất cả)
+        """
+        self.beginResetModel()
+        self._df = df
+        self._rows = self._row_positions(rows)
+        if self._fixed_columns:
+            self._keys = [key for key, _ in self._fixed_columns]
+            self._headers = [header for _, header in self._fixed_columns]
+        else:
+            self._keys = list(df.columns)
+            self._headers = [str(c) for c in df.columns]
+
+        self._arrays = []
+        self._numeric = []
+        for key in self._keys:
+            if key in df.columns:
+                column = df[key]
+                self._arrays.append(column.to_numpy())
+                self._numeric.append(pd.api.types.is_numeric_dtype(column.dtype)
+                                     and not pd.api.types.is_bool_dtype(column.dtype))
+            else:
+                self._arrays.append(None)
+                self._numeric.append(False)
+
+        self._order = None
+        if self._sort and self._sort[0] < len(self._keys):
+            self._order = self._sorted_order(*self._sort)
+        self.endResetModel()
+
+    def set_rows(self, rows):
+        """Chỉ đổi tập dòng hiển thị (lọc), giữ DataFrame và cách sắp xếp"""
+        self.beginResetModel()
+        self._rows = self._row_positions(rows)
+        self._order = None
+        if self._sort and self._sort[0] < len(self._keys):
+            self._order = self._sorted_order(*self._sort)
+        self.endResetModel()
+
+    def dataframe(self):
+        """DataFrame theo thứ tự và bộ lọc đang hiển thị"""
+        if self._order is None and self._rows is None:
+            return self._df
+        return self._df.iloc[self._view_positions()]
+
+    def source_row(self, row):
+        """Vị trí dòng trong DataFrame gốc ứng với dòng đang hiển thị"""
+        if self._order is not None:
+            row = self._order[row]
+        if self._rows is not None:
+            row = self._rows[row]
+        return int(row)
+
+    # ---------------- QAbstractTableModel ----------------
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows) if self._rows is not None else len(self._df)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._keys)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self._headers[section] if section < len(self._headers) else None
+        return str(section + 1)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        column = index.column()
+        if role == Qt.TextAlignmentRole:
+            if self._numeric[column]:
+                return int(Qt.AlignRight | Qt.AlignVCenter)
+            return None
+        if role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        array = self._arrays[column]
+        if array is None:
+            return ""
+        return format_value(array[self.source_row(index.row())])
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if column < 0 or column >= len(self._keys):
+            return
+        self.layoutAboutToBeChanged.emit()
+        self._sort = (column, order)
+        self._order = self._sorted_order(column, order)
+        self.layoutChanged.emit()
+
+    # ---------------- NỘI BỘ ----------------
+    @staticmethod
+    def _row_positions(rows):
+        if rows is None:
+            return None
+        rows = np.asarray(rows)
+        if rows.dtype == bool:
+            return np.flatnonzero(rows)
+        return rows
+
+    def _view_positions(self):
+        positions = np.arange(len(self._df)) if self._rows is None else self._rows
+        return positions if self._order is None else positions[self._order]
+
+    def _sorted_order(self, column, order):
+        """Hoán vị dòng theo cột (argsort ổn định, giá trị trống luôn nằm cuối)"""
+        array = self._arrays[column]
+        if array is None or len(array) == 0:
+            return None
+        if self._rows is not None:
+            array = array[self._rows]
+        if self._numeric[column] or np.issubdtype(array.dtype, np.datetime64):
+            keys = array
+            missing = pd.isna(array)
+        else:
+            # Cột object: mã hóa thành số theo thứ tự giá trị rồi argsort trên mã
+            try:
+                codes, _ = pd.factorize(array, sort=True)
+            except TypeError:
+                codes, _ = pd.factorize(array.astype(str), sort=True)
+            keys = codes
+            missing = codes < 0
+
+        present = np.flatnonzero(~missing)
+        ranked = present[np.argsort(keys[present], kind="stable")]
+        if order == Qt.DescendingOrder:
+            ranked = ranked[::-1]
+        return np.concatenate([ranked, np.flatnonzero(missing)])
@@ -0,0 +1,132 @@
+"""
+Module dom_extractor.py
+Trích xuất dữ liệu từ trang bằng một lần gọi execute_script duy nhất:
+mô tả container và các field bằng spec khai báo, JavaScript chạy trong trang
+trả về toàn bộ các dòng dưới dạng JSON (thay vì find_element/get_attribute cho từng kết quả).
+
+Cấu trúc spec:
+    {
+        "containers": ["div.g", "//div[@jscontroller]"],   # CSS hoặc XPath, dùng selector đầu tiên có kết quả
+        "fields": {
+            "title": {"selectors": ["h3"], "required": True},
+            "url": {"selectors": ["a"], "attr": "href", "required": True},
+            "description": {"selectors": ["div.VwiC3b"], "default": ""}
+        },
+        "limit": 10                                          # tùy chọn
+    }
+"""
+
+# Hàm JS chạy trong trang. Field không có "attr" lấy innerText; "attr" ưu tiên property
+# của element (giống WebElement.get_attribute, vd: href tuyệt đối) rồi mới tới attribute.
+_EXTRACT_JS = """
+var spec = arguments[0];
+var limit = arguments[1];
+
+function queryAll(root, selector) {
+    if (selector.charAt(0) === '/' || selector.charAt(0) === '(') {
+        var snapshot = document.evaluate(selector, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        var nodes = [];
+        for (var i = 0; i < snapshot.snapshotLength; i++) nodes.push(snapshot.snapshotItem(i));
+        return nodes;
+    }
+    return Array.prototype.slice.call(root.querySelectorAll(selector));
+}
+
+function queryOne(root, selector) {
+    if (!selector || selector === ':scope') return root;
+    if (selector.charAt(0) === '.' && selector.charAt(1) === '/') {
+        return document.evaluate(selector, root, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    }
+    try {
+        return root.querySelector(selector);
+    } catch (e) {
+        return null;
+    }
+}
+
+function readValue(el, attr) {
+    if (!attr || attr === 'text') {
+        return (el.innerText || el.textContent || '').trim();
+    }
+    var value = (attr in el && typeof el[attr] !== 'object' && typeof el[attr] !== 'function')
+        ? el[attr] : el.getAttribute(attr);
+    return value === null || value === undefined ? null : String(value).trim();
+}
+
+var containers = [];
+for (var c = 0; c < spec.containers.length && !containers.length; c++) {
+    try {
+        containers = queryAll(document, spec.containers[c]);
+    } catch (e) {
+        containers = [];
+    }
+}
+
+var names = Object.keys(spec.fields);
+var rows = [];
+for (var i = 0; i < containers.length; i++) {
+    if (limit && rows.length >= limit) break;
+    var row = {};
+    var valid = true;
+    for (var n = 0; n < names.length && valid; n++) {
+        var field = spec.fields[names[n]];
+        var value = null;
+        var selectors = field.selectors || [''];
+        for (var s = 0; s < selectors.length && !value; s++) {
+            var el = queryOne(containers[i], selectors[s]);
+            if (el) value = readValue(el, field.attr);
+        }
+        if (!value) {
+            if (field.required) valid = false;
+            value = field.hasOwnProperty('default') ? field['default'] : null;
+        }
+        row[names[n]] = value;
+    }
+    if (valid) rows.push(row);
+}
+return rows;
+"""
+
+
+# Kết quả tìm kiếm Google (div.g là layout cũ, các selector sau cho layout mới)
+GOOGLE_RESULT_SPEC = {
+    "containers": [
+        "div.g",
+        "//div[@jscontroller]//a[@jsname]/../../..",
+        "div[jsmodel]"
+    ],
+    "fields": {
+        "title": {"selectors": ["h3"], "required": True},
+        "url": {"selectors": ["a"], "attr": "href", "required": True},
+        "description": {
+            "selectors": ["div[aria-level='3']", "div[data-content-feature]", "div.VwiC3b", "span.st"],
+            "default": ""
+        }
+    }
+}
+
+# Sản phẩm trong trang tìm kiếm Shopee (class CSS bị làm rối, đổi theo từng phiên bản giao diện)
+SHOPEE_PRODUCT_SPEC = {
+    "containers": [".shopee-search-item-result__item", "li[data-sqe='item']"],
+    "fields": {
+        "name": {"selectors": ["._3GAFiR", "div.ie3A\\+n", "div[data-sqe='name'] div", "div.line-clamp-2"], "required": True},
+        "price": {"selectors": ["._1xk7ak", "div.vioxXd", "span.font-medium.text-base\\/5"], "required": True},
+        "url": {"selectors": ["a"], "attr": "href", "required": True}
+    }
+}
+
+
+def extract(driver, spec, limit=None):
+    """
+    Chạy spec trên trang hiện tại của driver, trả về list dict {tên field: giá trị}.
+    limit mặc định lấy từ spec["limit"] (None = không giới hạn).
+    """
+    if limit is None:
+        limit = spec.get("limit")
+    rows = driver.execute_script(_EXTRACT_JS, spec, limit or 0)
+    return rows or []
+
+
+def extract_tuples(driver, spec, fields, limit=None):
+    """Như extract() nhưng trả về list tuple theo thứ tự fields (định dạng cũ của các worker)"""
+    return [tuple(row.get(name) for name in fields) for row in extract(driver, spec, limit)]
@@ -0,0 +1,248 @@
+"""
+Module driver_resolver.py
+Xác định đường dẫn ChromeDriver phù hợp với trình duyệt (Brave/Chrome) mà không cần
+gọi webdriver-manager mỗi lần khởi động: kết quả được cache theo major version của
+trình duyệt trong bộ nhớ và trong file manifest trên đĩa.
+"""
+
+import os
+import re
+import sys
+import json
+import logging
+import threading
+import subprocess
+
+from .config import DATA_DIR, BRAVE_PATH
+
+logger = logging.getLogger(__name__)
+
+DRIVER_MANIFEST_FILE = os.path.join(DATA_DIR, "driver_manifest.json")
+WDM_DRIVERS_DIR = os.path.expanduser(os.path.join("~", ".wdm", "drivers", "chromedriver"))
+# Bản ChromeDriver mới nhất theo major Chromium (Chrome for Testing)
+LATEST_RELEASE_URL = "https://googlechromelabs.github.io/chrome-for-testing/LATEST_RELEASE_{major}"
+
+_VERSION_RE = re.compile(r"(\d+)\.(\d+)\.(\d+)\.(\d+)")
+
+_lock = threading.RLock()
+_drivers = {}      # major version -> đường dẫn driver đã xác thực trong tiến trình này
+_browsers = {}     # (đường dẫn trình duyệt, mtime) -> phiên bản Chromium
+_manifest = None
+
+
+# ---------------- MANIFEST ----------------
+def _load_manifest():
+    global _manifest
+    if _manifest is None:
+        try:
+            with open(DRIVER_MANIFEST_FILE, "r", encoding="utf-8") as f:
+                _manifest = json.load(f)
+        except (OSError, ValueError):
+            _manifest = {}
+        _manifest.setdefault("browsers", {})
+        _manifest.setdefault("drivers", {})
+    return _manifest
+
+
+def _save_manifest():
+    tmp_path = DRIVER_MANIFEST_FILE + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(_manifest, f, indent=2)
+        os.replace(tmp_path, DRIVER_MANIFEST_FILE)
+    except OSError as e:
+        logger.warning(f"Không thể lưu driver manifest: {e}")
+
+
+# ---------------- PHIÊN BẢN ----------------
+def _parse_version(text):
+    """Lấy phiên bản Chromium từ chuỗi kiểu 'Brave Browser 134.1.76.82' hoặc '... Chromium: 134.0.6998.89'"""
+    if not text:
+        return None
+    if "Chromium:" in text:
+        text = text.split("Chromium:", 1)[1]
+    match = _VERSION_RE.search(text)
+    return match.group(0) if match else None
+
+
+def _major(version_string):
+    return version_string.split(".")[0] if version_string else None
+
+
+def _probe_version(binary_path, timeout=10):
+    """Chạy '<binary> --version' (chỉ dùng khi không đọc được phiên bản theo cách khác)"""
+    try:
+        result = subprocess.run([binary_path, "--version"], stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, text=True, timeout=timeout)
+        return _parse_version(result.stdout.strip())
+    except Exception as e:
+        logger.debug(f"Không thể đọc phiên bản của {binary_path}: {e}")
+        return None
+
+
+def _version_from_install_dir(browser_path):
+    """
+    Trên Windows, 'brave.exe --version' mở trình duyệt thay vì in phiên bản;
+    thư mục cài đặt chứa sẵn thư mục con mang tên phiên bản (vd: 134.1.76.82).
+    """
+    try:
+        app_dir = os.path.dirname(browser_path)
+        versions = [name for name in os.listdir(app_dir)
+                    if _VERSION_RE.fullmatch(name) and os.path.isdir(os.path.join(app_dir, name))]
+    except OSError:
+        return None
+    if not versions:
+        return None
+    return max(versions, key=lambda v: tuple(int(p) for p in v.split(".")))
+
+
+def get_browser_version(browser_path=None):
+    """Trả về phiên bản Chromium của trình duyệt, cache theo đường dẫn + mtime"""
+    browser_path = browser_path or BRAVE_PATH
+    try:
+        mtime = os.stat(browser_path).st_mtime
+    except OSError:
+        return None
+
+    cache_key = (browser_path, mtime)
+    with _lock:
+        if cache_key in _browsers:
+            return _browsers[cache_key]
+
+        manifest = _load_manifest()
+        record = manifest["browsers"].get(browser_path)
+        if record and record.get("mtime") == mtime:
+            _browsers[cache_key] = record.get("version")
+            return _browsers[cache_key]
+
+        version_string = None
+        if sys.platform == "win32":
+            version_string = _version_from_install_dir(browser_path)
+        if not version_string:
+            version_string = _probe_version(browser_path)
+
+        _browsers[cache_key] = version_string
+        if version_string:
+            manifest["browsers"][browser_path] = {"version": version_string, "mtime": mtime}
+            _save_manifest()
+        return version_string
+
+
+# ---------------- DRIVER ----------------
+def _is_valid_driver(record, major):
+    """Kiểm tra nhanh driver đã cache: stat, chỉ chạy --version khi file thay đổi"""
+    path = record.get("path")
+    try:
+        st = os.stat(path)
+    except (OSError, TypeError):
+        return False
+    if not os.access(path, os.X_OK):
+        return False
+    if st.st_size == record.get("size") and st.st_mtime == record.get("mtime"):
+        return True
+
+    # File đã bị thay đổi: xác nhận lại phiên bản rồi cập nhật record
+    driver_version = _probe_version(path)
+    if not driver_version or (major and _major(driver_version) != major):
+        return False
+    record.update({"size": st.st_size, "mtime": st.st_mtime, "version": driver_version})
+    return True
+
+
+def _record_for(path, driver_version=None):
+    st = os.stat(path)
+    return {"path": path, "size": st.st_size, "mtime": st.st_mtime, "version": driver_version}
+
+
+def _find_in_wdm_cache(major):
+    """Tìm driver đã được webdriver-manager tải trước đó trong ~/.wdm (không cần mạng)"""
+    if not major or not os.path.isdir(WDM_DRIVERS_DIR):
+        return None
+    candidates = []
+    for root, _dirs, files in os.walk(WDM_DRIVERS_DIR):
+        for name in files:
+            if name.lower() in ("chromedriver", "chromedriver.exe"):
+                match = _VERSION_RE.search(root)
+                if match and match.group(1) == major:
+                    candidates.append((match.group(0), os.path.join(root, name)))
+    if not candidates:
+        return None
+    candidates.sort(key=lambda c: tuple(int(p) for p in c[0].split(".")))
+    return candidates[-1]
+
+
+def _latest_driver_version(major, timeout=10):
+    """Phiên bản ChromeDriver mới nhất cho major Chromium (phiên bản Brave như 134.1.76.82 không phải bản driver)"""
+    import requests
+
+    try:
+        response = requests.get(LATEST_RELEASE_URL.format(major=major), timeout=timeout)
+        response.raise_for_status()
+        version_string = response.text.strip()
+        return version_string if _VERSION_RE.fullmatch(version_string) else None
+    except Exception as e:
+        logger.warning(f"⚠️ Không tra được ChromeDriver cho Chromium {major}: {e}")
+        return None
+
+
+def _install_with_manager(major):
+    """Fallback: tải driver bằng webdriver-manager theo major Chromium (có thể cần mạng)"""
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    driver_version = _latest_driver_version(major) if major else None
+    if driver_version:
+        try:
+            return ChromeDriverManager(driver_version=driver_version).install()
+        except Exception as e:
+            logger.warning(f"⚠️ Không tải được ChromeDriver {driver_version}, thử bản mặc định: {e}")
+    return ChromeDriverManager().install()
+
+
+def resolve_chromedriver(browser_path=None):
+    """
+    Trả về đường dẫn ChromeDriver tương thích với trình duyệt.
+    Thứ tự: cache trong bộ nhớ -> manifest trên đĩa -> ~/.wdm -> webdriver-manager.
+    """
+    browser_version = get_browser_version(browser_path)
+    major = _major(browser_version)
+    cache_key = major or "default"
+
+    with _lock:
+        path = _drivers.get(cache_key)
+        if path and os.path.isfile(path):
+            return path
+
+        manifest = _load_manifest()
+        record = manifest["drivers"].get(cache_key)
+        if record and _is_valid_driver(record, major):
+            _drivers[cache_key] = record["path"]
+            _save_manifest()
+            return record["path"]
+
+        found = _find_in_wdm_cache(major)
+        if found:
+            driver_version, path = found
+            logger.info(f"✅ Dùng ChromeDriver có sẵn cho Chromium {major}: {path}")
+        else:
+            logger.info(f"🔄 Đang tải ChromeDriver cho Chromium {major or 'mặc định'}...")
+            path = _install_with_manager(major)
+            driver_version = _probe_version(path)
+            if major and _major(driver_version) != major:
+                # Bản mặc định không khớp trình duyệt: dùng tạm lần này, không ghi vào cache
+                logger.warning(f"⚠️ ChromeDriver {driver_version or '?'} không khớp Chromium {major}, không lưu cache")
+                return path
+
+        manifest["drivers"][cache_key] = _record_for(path, driver_version)
+        _save_manifest()
+        _drivers[cache_key] = path
+        return path
+
+
+def clear_driver_cache():
+    """Xóa cache trong bộ nhớ và manifest (dùng khi driver đã cache bị lỗi)"""
+    global _manifest
+    with _lock:
+        _drivers.clear()
+        _browsers.clear()
+        _manifest = {"browsers": {}, "drivers": {}}
+        _save_manifest()
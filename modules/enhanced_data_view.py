@@ -1,22 +1,42 @@
 from modules.data_view import DataWidget
+from modules.dataframe_model import DataFrameTableModel
+from modules.search_index import DataFrameSearchIndex
+from modules.data_import import DataImportWorker, FILE_FILTER
+from modules.chart_render import ChartRenderer
+from modules.result_store import TASK_FIELDS, get_result_store
 import pandas as pd
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
                            QComboBox, QTabWidget, QFileDialog, QMessageBox,
-                           QLabel, QLineEdit, QRadioButton, QButtonGroup, QTableWidget, QTableWidgetItem, QHeaderView,
-                           QCheckBox, QGroupBox, QSplitter)
-from PyQt5.QtCore import Qt
+                           QLabel, QLineEdit, QRadioButton, QButtonGroup, QTableView, QHeaderView, QProgressBar,
+                           QCheckBox, QGroupBox, QSplitter, QSpinBox)
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont
 import os
 import json
+import time
 import numpy as np
 
+FILTER_DEBOUNCE_MS = 250  # Chờ ngừng gõ rồi mới lọc
+
+CHART_KINDS = {
+    "Bar Chart": "bar",
+    "Line Chart": "line",
+    "Pie Chart": "pie",
+    "Scatter Plot": "scatter",
+    "Histogram": "hist",
+}
+
 class EnhancedDataWidget(DataWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.data = pd.DataFrame()  # Main data storage
-        self.filtered_data = pd.DataFrame()  # Filtered view
+        self.search_index = None  # Search index built once per loaded DataFrame
+        self.filter_mask = None  # Boolean row mask of the current filter (None = all rows)
+        self._filtered_cache = None
+        self.view_version = 0  # Bumped whenever data or filter changes (chart cache key)
+        self.import_worker = None
         self.init_ui()
         self.load_demo_data()  # Load some demo data initially
         
@@ -41,7 +61,12 @@ class EnhancedDataWidget(DataWidget):
         
         self.filter_input = QLineEdit()
         self.filter_input.setPlaceholderText("Tìm kiếm dữ liệu...")
-        self.filter_input.textChanged.connect(self.apply_filter)
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(FILTER_DEBOUNCE_MS)
+        self.filter_timer.timeout.connect(self.apply_filter)
+        self.filter_input.textChanged.connect(self.filter_timer.start)
+        self.filter_input.returnPressed.connect(self.apply_filter)
         filter_layout.addWidget(self.filter_input)
         
         self.column_combo = QComboBox()
@@ -51,18 +76,32 @@ class EnhancedDataWidget(DataWidget):
         
         data_layout.addLayout(filter_layout)
         
-        # Data table
-        self.data_table = QTableWidget()
+        # Data table (model ảo: chỉ định dạng các ô đang hiển thị)
+        self.table_model = DataFrameTableModel()
+        self.data_table = QTableView()
+        self.data_table.setModel(self.table_model)
+        self.data_table.setSortingEnabled(True)
+        self.data_table.setEditTriggers(QTableView.NoEditTriggers)
         self.data_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         data_layout.addWidget(self.data_table)
         
         # Import/Export controls
         io_layout = QHBoxLayout()
         
-        self.import_btn = QPushButton("Import CSV")
+        self.import_btn = QPushButton("Import Data")
         self.import_btn.clicked.connect(self.import_csv)
         io_layout.addWidget(self.import_btn)
         
+        self.import_progress = QProgressBar()
+        self.import_progress.setRange(0, 100)
+        self.import_progress.setVisible(False)
+        io_layout.addWidget(self.import_progress)
+        
+        self.cancel_import_btn = QPushButton("Cancel Import")
+        self.cancel_import_btn.clicked.connect(self.cancel_import)
+        self.cancel_import_btn.setVisible(False)
+        io_layout.addWidget(self.cancel_import_btn)
+        
         self.export_btn = QPushButton("Export CSV")
         self.export_btn.clicked.connect(self.export_csv)
         io_layout.addWidget(self.export_btn)
@@ -73,6 +112,32 @@ class EnhancedDataWidget(DataWidget):
         
         data_layout.addLayout(io_layout)
         
+        # Stored scrape results (read from the result store in chunks)
+        store_layout = QHBoxLayout()
+        store_layout.addWidget(QLabel("Stored results:"))
+        
+        self.store_task_combo = QComboBox()
+        self.store_task_combo.addItem("All tasks")
+        self.store_task_combo.addItems(list(TASK_FIELDS))
+        store_layout.addWidget(self.store_task_combo)
+        
+        self.store_keyword_input = QLineEdit()
+        self.store_keyword_input.setPlaceholderText("Keyword (optional)")
+        store_layout.addWidget(self.store_keyword_input)
+        
+        self.store_days_spin = QSpinBox()
+        self.store_days_spin.setRange(0, 3650)
+        self.store_days_spin.setValue(30)
+        self.store_days_spin.setSuffix(" days")
+        self.store_days_spin.setSpecialValueText("All time")
+        store_layout.addWidget(self.store_days_spin)
+        
+        self.load_results_btn = QPushButton("Load Results")
+        self.load_results_btn.clicked.connect(self.load_stored_results)
+        store_layout.addWidget(self.load_results_btn)
+        
+        data_layout.addLayout(store_layout)
+        
         # Data Visualization Tab
         self.viz_tab = QWidget()
         viz_layout = QVBoxLayout(self.viz_tab)
@@ -134,6 +199,7 @@ class EnhancedDataWidget(DataWidget):
         # Matplotlib figure
         self.figure = plt.figure(figsize=(8, 6))
         self.canvas = FigureCanvas(self.figure)
+        self.chart_renderer = ChartRenderer(self.figure, self.canvas)
         viz_layout.addWidget(self.canvas)
         
         # Export chart button
@@ -218,11 +284,9 @@ class EnhancedDataWidget(DataWidget):
             'Sales': [6000, 8000, 3500, 900, 1500, 1000, 960, 960, 750, 375],
             'Rating': [4.5, 4.2, 4.0, 4.3, 3.8, 3.9, 4.1, 4.0, 3.5, 3.7]
         }
-        self.data = pd.DataFrame(data)
-        self.filtered_data = self.data.copy()
         
         # Update UI
-        self.update_table(self.data)
+        self.set_data(pd.DataFrame(data))
         self.update_column_combo()
         self.refresh_column_combos()
 
@@ -235,90 +299,150 @@ class EnhancedDataWidget(DataWidget):
             for column in self.data.columns:
                 self.column_combo.addItem(column)
 
+    @property
+    def filtered_data(self):
+        """Rows matching the current filter (materialized only when needed)"""
+        if self.filter_mask is None:
+            return self.data
+        if self._filtered_cache is None:
+            self._filtered_cache = self.data[self.filter_mask]
+        return self._filtered_cache
+
+    def set_data(self, df):
+        """Replace the data, rebuild the search index and re-apply the current filter"""
+        self.data = df
+        self.search_index = DataFrameSearchIndex(df)
+        self.filter_mask = None
+        self._filtered_cache = None
+        self.view_version += 1
+        self.update_table(df)
+        self.apply_filter()
+
     def apply_filter(self):
         """Apply search filter to data"""
+        self.filter_timer.stop()
         search_text = self.filter_input.text().strip().lower()
         selected_column = self.column_combo.currentText()
         
-        if self.data.empty:
+        if self.search_index is None or self.data.empty:
             return
             
+        self._filtered_cache = None
+        self.view_version += 1
         if not search_text:
-            self.filtered_data = self.data.copy()
-            self.update_table(self.filtered_data)
+            self.filter_mask = None
+            self.table_model.set_rows(None)
             return
             
-        if selected_column == "All Columns":
-            # Search in all columns
-            mask = False
-            for column in self.data.columns:
-                mask = mask | self.data[column].astype(str).str.lower().str.contains(search_text, na=False)
-        else:
-            # Search in selected column
-            mask = self.data[selected_column].astype(str).str.lower().str.contains(search_text, na=False)
-            
-        self.filtered_data = self.data[mask]
-        self.update_table(self.filtered_data)
+        # "All Columns" (or a column that no longer exists) searches every column
+        column = selected_column if selected_column in self.search_index.columns else None
+        self.filter_mask = self.search_index.mask(search_text, column)
+        self.table_model.set_rows(self.filter_mask)
 
     def update_table(self, df):
         """Update the table with the provided DataFrame"""
-        self.data_table.clear()
-        
-        if df.empty:
-            self.data_table.setRowCount(0)
-            self.data_table.setColumnCount(0)
-            return
-            
-        # Set row and column count
-        self.data_table.setRowCount(len(df))
-        self.data_table.setColumnCount(len(df.columns))
-        
-        # Set header labels
-        self.data_table.setHorizontalHeaderLabels(df.columns)
-        
-        # Populate table
-        for i, (_, row) in enumerate(df.iterrows()):
-            for j, value in enumerate(row):
-                item = QTableWidgetItem(str(value))
-                self.data_table.setItem(i, j, item)
-                
-        # Make table read-only
-        self.data_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table_model.set_dataframe(df)
 
     def import_csv(self):
-        """Import data from CSV file"""
+        """Import data from CSV/Parquet/Feather file in a background thread"""
+        if self.import_worker is not None and self.import_worker.isRunning():
+            return
+            
         file_path, _ = QFileDialog.getOpenFileName(
-            self, "Import CSV File", "", "CSV Files (*.csv)"
+            self, "Import Data File", "", FILE_FILTER
         )
         
         if not file_path:
             return
             
-        try:
-            # Read CSV file
-            df = pd.read_csv(file_path)
+        self.start_import(DataImportWorker(file_path, parent=self), os.path.basename(file_path))
+
+    def load_stored_results(self):
+        """Load scrape results from the result store (filtered by task, keyword and age)"""
+        if self.import_worker is not None and self.import_worker.isRunning():
+            return
             
-            # Check if data is valid
-            if df.empty:
-                QMessageBox.warning(self, "Empty Data", "The selected CSV file is empty.")
-                return
-                
-            # Update data
-            self.data = df
-            self.filtered_data = df.copy()
+        filters = {}
+        if self.store_task_combo.currentIndex() > 0:
+            filters["task"] = self.store_task_combo.currentText()
+        keyword = self.store_keyword_input.text().strip()
+        if keyword:
+            filters["keyword"] = keyword
+        if self.store_days_spin.value() > 0:
+            filters["since"] = time.time() - self.store_days_spin.value() * 86400
             
-            # Update UI
-            self.update_table(self.data)
-            self.update_column_combo()
-            self.refresh_column_combos()
+        store = get_result_store()
+        worker = DataImportWorker(None, parent=self, chunk_source=lambda: store.iter_frames(**filters))
+        self.start_import(worker, "the result store")
+
+    def start_import(self, worker, source_name):
+        """Run an import worker, showing rows as they arrive"""
+        self.import_worker = worker
+        worker.progress.connect(self.import_progress.setValue)
+        worker.partial_ready.connect(self.on_import_partial)
+        worker.import_finished.connect(
+            lambda df, completed: self.on_import_finished(df, completed, source_name))
+        worker.import_failed.connect(self.on_import_failed)
+        
+        self.import_btn.setEnabled(False)
+        self.load_results_btn.setEnabled(False)
+        self.clear_btn.setEnabled(False)
+        self.import_progress.setValue(0)
+        self.import_progress.setVisible(True)
+        self.cancel_import_btn.setVisible(True)
+        worker.start()
+
+    def cancel_import(self):
+        """Stop the running import (rows read so far are kept)"""
+        if self.import_worker is not None:
+            self.import_worker.stop()
+
+    def on_import_partial(self, df, rows):
+        """Show rows as they arrive; search index is built once the import is done"""
+        self.data = df
+        self.search_index = None
+        self.filter_mask = None
+        self._filtered_cache = None
+        self.view_version += 1
+        self.update_table(df)
+
+    def on_import_finished(self, df, completed, source_name):
+        self.finish_import()
+        
+        if df.empty:
+            QMessageBox.warning(self, "Empty Data", f"No rows found in {source_name}.")
+            return
             
+        # Update data and UI
+        self.set_data(df)
+        self.update_column_combo()
+        self.refresh_column_combos()
+        
+        if completed:
             QMessageBox.information(
                 self, "Import Successful", 
-                f"Successfully imported {len(df)} rows from {os.path.basename(file_path)}"
+                f"Successfully imported {len(df)} rows from {source_name}"
+            )
+        else:
+            QMessageBox.information(
+                self, "Import Cancelled", 
+                f"Import stopped after {len(df)} rows from {source_name}"
             )
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Import Error", f"Error importing CSV: {str(e)}")
+
+    def on_import_failed(self, message):
+        self.finish_import()
+        if self.search_index is None:
+            # Keep the rows shown before the error and make them searchable
+            self.set_data(self.data)
+        QMessageBox.critical(self, "Import Error", f"Error importing data: {message}")
+
+    def finish_import(self):
+        self.import_worker = None
+        self.import_btn.setEnabled(True)
+        self.load_results_btn.setEnabled(True)
+        self.clear_btn.setEnabled(True)
+        self.import_progress.setVisible(False)
+        self.cancel_import_btn.setVisible(False)
 
     def export_csv(self):
         """Export data to CSV file"""
@@ -361,12 +485,10 @@ class EnhancedDataWidget(DataWidget):
         )
         
         if reply == QMessageBox.Yes:
-            self.data = pd.DataFrame()
-            self.filtered_data = pd.DataFrame()
-            self.update_table(self.data)
+            self.set_data(pd.DataFrame())
             self.update_column_combo()
-            self.figure.clear()
-            self.canvas.draw()
+            self.chart_renderer.invalidate()
+            self.chart_renderer.clear()
 
     def generate_chart(self):
         """Generate a chart based on the selected options"""
@@ -388,76 +510,25 @@ class EnhancedDataWidget(DataWidget):
             QMessageBox.warning(self, "Invalid Column", f"Column '{y_column}' not found.")
             return
         
-        # Clear previous figure
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
-        
         try:
-            # Create chart based on type
-            if chart_type == "Bar Chart":
-                self.filtered_data.plot(
-                    kind='bar', 
-                    x=x_column, 
-                    y=y_column, 
-                    legend=self.show_legend.isChecked(),
-                    grid=self.show_grid.isChecked(),
-                    ax=ax
-                )
-                plt.xticks(rotation=45, ha='right')
-                
-            elif chart_type == "Line Chart":
-                self.filtered_data.plot(
-                    kind='line', 
-                    x=x_column, 
-                    y=y_column, 
-                    legend=self.show_legend.isChecked(),
-                    grid=self.show_grid.isChecked(),
-                    marker='o',
-                    ax=ax
-                )
-                
-            elif chart_type == "Pie Chart":
-                # For pie chart, use value counts of the selected column
-                self.filtered_data[x_column].value_counts().plot(
-                    kind='pie',
-                    autopct='%1.1f%%',
-                    shadow=True,
-                    ax=ax
-                )
-                ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle
-                
-            elif chart_type == "Scatter Plot":
-                self.filtered_data.plot(
-                    kind='scatter',
-                    x=x_column,
-                    y=y_column,
-                    grid=self.show_grid.isChecked(),
-                    ax=ax
-                )
-                
-            elif chart_type == "Histogram":
-                self.filtered_data[x_column].plot(
-                    kind='hist',
-                    bins=10,
-                    grid=self.show_grid.isChecked(),
-                    ax=ax
-                )
-                
-            # Set labels and title
-            ax.set_xlabel(x_column)
-            if chart_type not in ["Pie Chart", "Histogram"]:
-                ax.set_ylabel(y_column)
+            # Aggregate/downsample (cached per column and filter), then draw
+            kind = CHART_KINDS[chart_type]
+            payload = self.chart_renderer.prepare(kind, self.filtered_data, x_column, y_column, self.view_version)
             
-            ax.set_title(f"{chart_type}: {x_column}" + (f" vs {y_column}" if chart_type not in ["Pie Chart", "Histogram"] else ""))
+            title = f"{chart_type}: {x_column}" + (f" vs {y_column}" if chart_type not in ["Pie Chart", "Histogram"] else "")
+            shown = len(payload["y"]) if payload["kind"] == "line" else payload["total"]
+            if shown < payload["total"]:
+                title += f" ({shown:,} of {payload['total']:,} points)"
             
-            # Adjust layout and draw
-            plt.tight_layout()
-            self.canvas.draw()
+            self.chart_renderer.render(
+                payload, x_column, y_column, title,
+                legend=self.show_legend.isChecked(),
+                grid=self.show_grid.isChecked()
+            )
             
         except Exception as e:
             QMessageBox.critical(self, "Chart Error", f"Error generating chart: {str(e)}")
-            self.figure.clear()
-            self.canvas.draw()
+            self.chart_renderer.clear()
 
     def export_chart(self):
         """Export the current chart as an image"""
@@ -473,7 +544,7 @@ class EnhancedDataWidget(DataWidget):
                         file_path += '.png'
                         
                     # Save the figure
-                    self.figure.savefig(file_path, dpi=300, bbox_inches='tight')
+                    self.chart_renderer.savefig(file_path, dpi=300, bbox_inches='tight')
                     
                     QMessageBox.information(
                         self, "Export Successful", 
@@ -0,0 +1,238 @@
+"""
+Module http_fetcher.py
+Đường tải nhanh bằng HTTP thuần (requests.Session dùng chung, keep-alive, retry, proxy)
+và phân tích HTML bằng BeautifulSoup với cùng selector spec của dom_extractor.
+Chỉ khi trang cần JavaScript hoặc bị chặn bởi captcha mới phải chuyển sang Selenium.
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from urllib.parse import urljoin, urlparse, parse_qs
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup
+
+from .config import HTTP_BROWSER_HOST_TTL, HTTP_FETCHER_CACHE_SIZE
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "vi-VN,vi;q=0.9,en-US;q=0.8,en;q=0.7"
+}
+
+# Dấu hiệu trang bị chặn bởi captcha / kiểm tra bot
+CAPTCHA_MARKERS = (
+    "g-recaptcha", "/sorry/index", "unusual traffic", "hcaptcha", "cf-challenge",
+    "cf-chl-", "just a moment..."
+)
+
+# Dấu hiệu trang chỉ hiển thị nội dung sau khi chạy JavaScript
+JS_GATE_MARKERS = (
+    "enable javascript", "please turn on javascript", "bật javascript",
+    "you need to enable javascript", "id=\"main\"></div>", "id=\"root\"></div>", "id=\"app\"></div>"
+)
+
+
+def proxy_to_requests(proxy):
+    """Chuyển proxy dạng 'host:port' / 'user:pass@host:port' / 'socks5://...' sang dict cho requests"""
+    if not proxy:
+        return None
+    url = proxy if "://" in proxy else f"http://{proxy}"
+    return {"http": url, "https": url}
+
+
+class HttpFetcher:
+    """Tải trang bằng requests.Session dùng chung, nhận biết khi nào cần trình duyệt"""
+
+    def __init__(self, proxy=None, timeout=15, retries=2, pool_size=10, browser_host_ttl=HTTP_BROWSER_HOST_TTL):
+        self.proxy = proxy
+        self.timeout = timeout
+        self.browser_host_ttl = browser_host_ttl
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        proxies = proxy_to_requests(proxy)
+        if proxies:
+            self.session.proxies.update(proxies)
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.5,
+            status_forcelist=(500, 502, 504),
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Host vừa bị chặn/cần JS -> thời điểm ghi nhận; bỏ qua HTTP cho host đó tới khi hết browser_host_ttl
+        self._browser_hosts = {}
+        self._lock = threading.Lock()
+
+    def fetch(self, url, params=None):
+        """GET url, trả về response hoặc None nếu lỗi mạng"""
+        try:
+            return self.session.get(url, params=params, timeout=self.timeout)
+        except requests.RequestException as e:
+            logger.debug(f"HTTP fetch thất bại {url}: {e}")
+            return None
+
+    @staticmethod
+    def needs_browser(response):
+        """True nếu response không dùng được (lỗi, bị chặn captcha hoặc cần JavaScript)"""
+        if response is None:
+            return True
+        if response.status_code >= 400:
+            return True
+        if "html" not in response.headers.get("Content-Type", "text/html"):
+            return False
+        text = response.text[:200000].lower()
+        if any(marker in text for marker in CAPTCHA_MARKERS):
+            return True
+        if any(marker in text for marker in JS_GATE_MARKERS):
+            return True
+        return False
+
+    def fetch_rows(self, url, spec, params=None, limit=None):
+        """
+        Tải url và áp dụng spec. Trả về list dict, hoặc None nếu cần chuyển sang trình duyệt
+        (bị chặn, cần JavaScript hoặc HTML không chứa container nào).
+        """
+        host = urlparse(url).netloc
+        with self._lock:
+            marked_at = self._browser_hosts.get(host)
+            if marked_at is not None:
+                if time.monotonic() - marked_at < self.browser_host_ttl:
+                    return None
+                del self._browser_hosts[host]
+
+        response = self.fetch(url, params=params)
+        if self.needs_browser(response):
+            with self._lock:
+                self._browser_hosts[host] = time.monotonic()
+            return None
+
+        rows = extract_from_html(response.text, spec, limit=limit, base_url=response.url)
+        return rows or None
+
+    def close(self):
+        self.session.close()
+
+
+def _is_xpath(selector):
+    return selector.startswith("/") or selector.startswith("(") or selector.startswith("./")
+
+
+def _select_one(container, selector):
+    if not selector or selector == ":scope":
+        return container
+    if _is_xpath(selector):
+        return None
+    try:
+        return container.select_one(selector)
+    except Exception:
+        return None
+
+
+def _read_value(el, attr, base_url):
+    if not attr or attr == "text":
+        return el.get_text(" ", strip=True)
+    value = el.get(attr)
+    if isinstance(value, list):
+        value = " ".join(value)
+    if value and attr in ("href", "src") and base_url:
+        value = _unwrap_redirect(urljoin(base_url, value))
+    return value.strip() if value else None
+
+
+def _unwrap_redirect(url):
+    """Link trong HTML tĩnh của Google có dạng /url?q=<url thật>"""
+    parsed = urlparse(url)
+    if parsed.path == "/url":
+        query = parse_qs(parsed.query)
+        target = (query.get("q") or query.get("url") or [None])[0]
+        if target and target.startswith("http"):
+            return target
+    return url
+
+
+def extract_from_html(html, spec, limit=None, base_url=None):
+    """
+    Áp dụng selector spec của dom_extractor lên HTML tĩnh (BeautifulSoup).
+    Selector XPath chỉ dùng được trong trình duyệt nên bị bỏ qua ở đây.
+    """
+    soup = BeautifulSoup(html, HTML_PARSER)
+    if limit is None:
+        limit = spec.get("limit")
+
+    containers = []
+    for selector in spec["containers"]:
+        if _is_xpath(selector):
+            continue
+        try:
+            containers = soup.select(selector)
+        except Exception:
+            containers = []
+        if containers:
+            break
+
+    rows = []
+    for container in containers:
+        if limit and len(rows) >= limit:
+            break
+        row = {}
+        valid = True
+        for name, field in spec["fields"].items():
+            value = None
+            for selector in field.get("selectors") or [""]:
+                el = _select_one(container, selector)
+                if el is not None:
+                    value = _read_value(el, field.get("attr"), base_url)
+                if value:
+                    break
+            if not value:
+                if field.get("required"):
+                    valid = False
+                    break
+                value = field.get("default")
+            row[name] = value
+        if valid:
+            rows.append(row)
+    return rows
+
+
+_fetchers = OrderedDict()  # proxy -> HttpFetcher, thứ tự dùng gần nhất ở cuối
+_fetchers_lock = threading.Lock()
+
+
+def get_http_fetcher(proxy=None):
+    """
+    Trả về HttpFetcher dùng chung theo proxy (giữ kết nối keep-alive giữa các task).
+    Giữ tối đa HTTP_FETCHER_CACHE_SIZE fetcher: proxy xoay vòng liên tục không làm phình session/socket.
+    """
+    evicted = []
+    with _fetchers_lock:
+        fetcher = _fetchers.get(proxy)
+        if fetcher is None:
+            fetcher = HttpFetcher(proxy=proxy)
+            _fetchers[proxy] = fetcher
+            while len(_fetchers) > max(1, HTTP_FETCHER_CACHE_SIZE):
+                evicted.append(_fetchers.popitem(last=False)[1])
+        else:
+            _fetchers.move_to_end(proxy)
+    for old in evicted:
+        # Request đang chạy trên session cũ vẫn hoàn tất, chỉ các kết nối rảnh bị đóng
+        old.close()
+    return fetcher
@@ -0,0 +1,48 @@
+"""
+Module lean_page.py
+Chế độ trang nhẹ cho các phiên thu thập dữ liệu: chặn ảnh, font, video và host quảng cáo/analytics
+ở tầng mạng bằng CDP Network.setBlockedURLs (request bị chặn không rời khỏi trình duyệt, qua proxy chậm
+trang tải nhanh hơn hẳn). Danh sách chặn cấu hình theo task trong LEAN_PAGE_PROFILES (config.py).
+
+Driver trong browser pool được dùng lại giữa các task nên mỗi lần mượn driver đều gọi apply_lean_page:
+task không có profile (hoặc tắt chế độ trang nhẹ) sẽ gỡ danh sách chặn của task trước.
+"""
+
+import logging
+
+from .config import LEAN_PAGE_RESOURCE_PATTERNS, LEAN_PAGE_AD_HOSTS, LEAN_PAGE_PROFILES
+
+logger = logging.getLogger(__name__)
+
+
+def blocked_patterns(task, profiles=None):
+    """Danh sách mẫu URL bị chặn cho task (rỗng nếu task tải trang đầy đủ)"""
+    profile = (profiles if profiles is not None else LEAN_PAGE_PROFILES).get(task)
+    if not profile:
+        return []
+    patterns = []
+    for resource_type in profile.get("block", ()):
+        patterns.extend(LEAN_PAGE_RESOURCE_PATTERNS.get(resource_type, ()))
+    if profile.get("ads"):
+        patterns.extend(LEAN_PAGE_AD_HOSTS)
+    patterns.extend(profile.get("urls", ()))
+    # Bỏ trùng, giữ thứ tự
+    return list(dict.fromkeys(patterns))
+
+
+def apply_lean_page(driver, task, enabled=True):
+    """
+    Áp dụng danh sách chặn của task cho driver, trả về số mẫu đang chặn.
+    Chỉ gọi CDP khi danh sách khác lần trước; trình duyệt không hỗ trợ CDP thì bỏ qua.
+    """
+    patterns = blocked_patterns(task) if enabled else []
+    if getattr(driver, "_lean_patterns", []) == patterns:
+        return len(patterns)
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        driver._lean_patterns = patterns
+    except Exception as e:
+        logger.warning(f"Không thể áp dụng chế độ trang nhẹ: {e}")
+        return 0
+    return len(patterns)
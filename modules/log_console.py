@@ -0,0 +1,81 @@
+"""
+Module log_console.py
+Khung log dạng văn bản thuần chịu được lượng log lớn từ các worker:
+  - write() chỉ đưa dòng log vào bộ đệm vòng (deque có giới hạn), không đụng tới widget
+  - QTimer đẩy cả lô lên QPlainTextEdit mỗi LOG_CONSOLE_FLUSH_MS (một lần chèn cho cả lô)
+  - Các dòng lặp lại liên tiếp được gộp thành một dòng "(xN)"; bộ đệm đầy thì bỏ dòng cũ nhất và ghi lại số dòng bị bỏ
+  - setMaximumBlockCount giới hạn số dòng giữ lại, tài liệu không phình ra theo thời gian
+"""
+
+import threading
+from collections import deque
+
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QPlainTextEdit
+
+from .config import LOG_CONSOLE_MAX_LINES, LOG_CONSOLE_FLUSH_MS, LOG_CONSOLE_BUFFER
+
+
+class LogConsole(QPlainTextEdit):
+    """QPlainTextEdit chỉ đọc, nhận log qua write() và hiển thị theo lô"""
+
+    def __init__(self, parent=None, max_lines=LOG_CONSOLE_MAX_LINES,
+                 flush_ms=LOG_CONSOLE_FLUSH_MS, buffer_size=LOG_CONSOLE_BUFFER):
+        super().__init__(parent)
+        self.setReadOnly(True)
+        self.setMaximumBlockCount(max_lines)
+        self.setUndoRedoEnabled(False)
+        self._pending = deque(maxlen=buffer_size)  # (thời gian, nội dung)
+        self._dropped = 0
+        self._lock = threading.Lock()
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setInterval(flush_ms)
+        self._flush_timer.timeout.connect(self.flush)
+        self._flush_timer.start()
+
+    def write(self, text, timestamp=None):
+        """Đưa một dòng log vào bộ đệm (gọi được từ mọi thread)"""
+        with self._lock:
+            if len(self._pending) == self._pending.maxlen:
+                self._dropped += 1
+            self._pending.append((timestamp, str(text)))
+
+    def flush(self):
+        """Đẩy các dòng đang chờ lên widget trong một lần chèn"""
+        with self._lock:
+            if not self._pending and not self._dropped:
+                return
+            pending = list(self._pending)
+            self._pending.clear()
+            dropped = self._dropped
+            self._dropped = 0
+
+        lines = []
+        if dropped:
+            lines.append(f"… bỏ qua {dropped} dòng log do quá tải")
+        previous = None
+        repeat = 0
+        for timestamp, text in pending:
+            if text == previous:
+                repeat += 1
+                continue
+            if repeat:
+                lines[-1] += f" (x{repeat + 1})"
+            previous = text
+            repeat = 0
+            lines.append(f"[{timestamp}] {text}" if timestamp else text)
+        if repeat:
+            lines[-1] += f" (x{repeat + 1})"
+
+        # Chỉ tự cuộn khi người dùng đang ở cuối (không kéo người đang đọc log cũ xuống)
+        scrollbar = self.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum() - 4
+        self.appendPlainText("\n".join(lines))
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
+
+    def clear(self):
+        with self._lock:
+            self._pending.clear()
+            self._dropped = 0
+        super().clear()
@@ -1,8 +1,17 @@
-from PyQt5.QtWidgets import QWidget, QLabel, QVBoxLayout, QTextEdit, QPushButton, QHBoxLayout, QComboBox
+from PyQt5.QtWidgets import QWidget, QLabel, QVBoxLayout, QPushButton, QHBoxLayout, QComboBox
 from PyQt5.QtCore import Qt, QDateTime, QPropertyAnimation, QTimer
 from PyQt5.QtGui import QFont, QPalette, QColor
 import traceback
 from .config import THEMES, DEFAULT_THEME
+from .log_console import LogConsole
+
+# Icon đầu dòng theo loại log
+LOG_ICONS = {
+    "error": "❌",
+    "warning": "⚠️",
+    "success": "✅",
+    "info": "ℹ️"
+}
 
 class LogsWidget(QWidget):
     def __init__(self, parent=None):
@@ -15,7 +24,7 @@ class LogsWidget(QWidget):
         self.setStyleSheet("""
             QWidget { background-color: #2b2b2b; }
             QLabel { color: #ffffff; font-size: 16px; font-weight: bold; }
-            QTextEdit { background-color: #363636; color: #e0e0e0; border: 1px solid #454545; padding: 10px; font-family: 'Segoe UI'; font-size: 13px; }
+            QPlainTextEdit { background-color: #363636; color: #e0e0e0; border: 1px solid #454545; padding: 10px; font-family: 'Segoe UI'; font-size: 13px; }
             QPushButton { background-color: #0d6efd; color: white; border: none; padding: 8px 16px; border-radius: 4px; }
             QPushButton:hover { background-color: #0b5ed7; }
             QPushButton:pressed { background-color: #0a58ca; }
@@ -32,9 +41,8 @@ class LogsWidget(QWidget):
         header.setFont(QFont("Segoe UI", 18, QFont.Bold))
         main_layout.addWidget(header)
 
-        # Log Console (QTextEdit)
-        self.log_console = QTextEdit()
-        self.log_console.setReadOnly(True)
+        # Log Console (văn bản thuần, đẩy theo lô)
+        self.log_console = LogConsole()
         main_layout.addWidget(self.log_console)
 
         # Control Buttons (Clear Logs)
@@ -56,35 +64,24 @@ class LogsWidget(QWidget):
         self.fade_anim.setEndValue(1.0)
 
     def append_log(self, message, log_type="info"):
-        """Thêm log với màu sắc phân biệt dựa trên loại log"""
+        """Thêm log, icon phân biệt theo loại log"""
         timestamp = QDateTime.currentDateTime().toString("yyyy-MM-dd HH:mm:ss")
+        icon = LOG_ICONS.get(log_type, "")
         
-        # Xác định màu dựa trên loại log
-        color_map = {
-            "error": "#ff6b6b",  # Đỏ sáng
-            "warning": "#feca57",  # Vàng sáng
-            "success": "#1dd1a1",  # Xanh lá sáng
-            "info": "#ffffff"  # Trắng
-        }
-        
-        # Định dạng icon dựa vào loại log
-        icon_map = {
-            "error": "❌",
-            "warning": "⚠️",
-            "success": "✅",
-            "info": "ℹ️"
-        }
-        
-        # Tạo CSS inline cho màu chữ
-        color = color_map.get(log_type, "#ffffff")
-        icon = icon_map.get(log_type, "")
-        
-        # Tạo HTML với định dạng màu
-        log_entry = f'<span style="color:{color};">[{timestamp}] {icon} {message}</span>'
-        
-        # Thêm log vào console
-        self.log_console.append(log_entry)
-        self.log_console.ensureCursorVisible()  # Đảm bảo cuộn xuống dòng mới nhất
+        # Đưa vào bộ đệm của console (hiển thị theo lô)
+        self.log_console.write(f"{icon} {message}" if icon else message, timestamp)
+
+    def log_info(self, message):
+        self.append_log(message, "info")
+
+    def log_warning(self, message):
+        self.append_log(message, "warning")
+
+    def log_error(self, message):
+        self.append_log(message, "error")
+
+    def log_debug(self, message):
+        self.append_log(message, "debug")
 
     def clear_logs(self):
         self.log_console.clear()
@@ -122,7 +119,7 @@ class LogsWidget(QWidget):
                 QPushButton:hover {{
                     background-color: {theme["accent_hover"]};
                 }}
-                QTextEdit {{
+                QPlainTextEdit {{
                     background-color: {theme["bg_secondary"]};
                     color: {theme["text_primary"]};
                     border: 1px solid {theme["border"]};
@@ -27,6 +27,11 @@ from .logs_view import LogsWidget
 from .script_manager import ScriptManagerWidget
 from .proxy_manager import ProxyManagerWidget
 from .task_scheduler import TaskSchedulerWidget
+from .automation_worker import EnhancedAutomationWorker
+from .task_executor import TaskJob, get_task_executor, detect_site
+from .browser_pool import PoolKey
+from .script_runner import get_script_runner_pool
+from .driver_resolver import resolve_chromedriver
 
 # Constants
 APP_NAME = "Selenium Automation Hub"
@@ -80,6 +85,9 @@ class MainWindow(QMainWindow):
             if not self.init_automation_worker():
                 raise Exception("Không thể khởi tạo automation worker")
             
+            # Initialize task executor for scheduled tasks
+            self.init_task_executor()
+            
             # Show splash screen
             self.init_splash_screen()
             
@@ -485,6 +493,8 @@ class MainWindow(QMainWindow):
                 self.settings.setValue('current_page', current_index)
                 
                 # Clean up resources
+                if hasattr(self, 'task_executor'):
+                    self.task_executor.shutdown()
                 if hasattr(self, 'automation_page'):
                     self.automation_page.cleanup()
                 
@@ -571,30 +581,87 @@ class MainWindow(QMainWindow):
         except Exception as e:
             self.log(f"❌ Error updating proxies: {str(e)}")
 
-    def on_scheduled_task_ready(self, task_info):
-        """Handle scheduled task execution"""
+    def init_task_executor(self):
+        """Khởi tạo bộ thực thi task song song cho scheduler"""
         try:
-            if task_info and isinstance(task_info, dict):
-                task_type = task_info.get('type', '')
-                params = task_info.get('params', {})
-                
-                self.log_info(f"🕒 Executing scheduled {task_type} task")
-                
-                # Switch to automation page
-                self.switch_page('automation')
+            self.task_executor = get_task_executor()
+            self.task_executor.log_signal.connect(self.log_info)
+            if hasattr(self, 'task_scheduler_page'):
+                self.task_scheduler_page.task_ready.connect(self.on_scheduled_task_ready)
+                self.task_scheduler_page.task_log.connect(self.log_info)
+                self.task_scheduler_page.task_cancelled.connect(self.task_executor.cancel)
+                self.task_executor.task_started.connect(self.task_scheduler_page.on_task_started)
+                self.task_executor.task_finished.connect(self.task_scheduler_page.on_task_finished)
+        except Exception as e:
+            self.log_error(f"❌ Lỗi khởi tạo bộ thực thi task: {str(e)}")
+            traceback.print_exc()
+
+    def on_scheduled_task_ready(self, task_id, script_path):
+        """Đưa task đến hạn vào hàng đợi của bộ thực thi (chạy song song, không chặn giao diện)"""
+        try:
+            try:
+                with open(script_path, 'r', encoding='utf-8') as f:
+                    site = detect_site(f.read())
+            except OSError:
+                site = None
                 
-                # Execute task based on type
-                if hasattr(self, 'automation_page'):
-                    self.automation_page.start_task(task_type, params)
-                else:
-                    self.log_warning("⚠️ Automation page not available")
-                    
-            else:
-                self.log_warning("⚠️ Invalid task info format")
+            job = TaskJob(
+                task_id,
+                lambda job: self.execute_script_job(script_path),
+                site=site,
+                proxy=self.automation_worker.proxy,
+                browser_key=self.script_browser_key(),
+                name=os.path.basename(script_path)
+            )
+            if self.task_executor.submit(job):
+                self.log_info(f"🕒 Đã đưa task {job.name} vào hàng đợi (trang: {site or 'khác'})")
+            elif not self.task_executor.is_active(task_id):
+                # Hàng đợi đầy hoặc đã đóng: báo lại để task không kẹt ở trạng thái "Queued"
+                self.reject_scheduled_task(task_id, "Hàng đợi thực thi từ chối task (đầy hoặc đã đóng)")
                 
         except Exception as e:
             self.log_error(f"Error handling scheduled task: {str(e)}")
             traceback.print_exc()
+            self.reject_scheduled_task(task_id, str(e))
+
+    def reject_scheduled_task(self, task_id, reason):
+        """Task đến hạn không vào được bộ thực thi: đánh dấu thất bại trên scheduler"""
+        if hasattr(self, 'task_scheduler_page'):
+            self.task_scheduler_page.on_task_finished(task_id, False, reason)
+
+    def script_browser_key(self):
+        """
+        Khóa trình duyệt của script chạy theo lịch (cùng cấu hình với script_driver_config):
+        bộ thực thi tính mỗi tiến trình script là một trình duyệt, không giao quá số trình duyệt của pool
+        """
+        chrome_config = self.automation_worker.chrome_config
+        return PoolKey(bool(self.automation_worker.headless), self.automation_worker.proxy or None,
+                       chrome_config.get("profile_path") or None, chrome_config.get("chrome_path") or None)
+
+    def script_driver_config(self):
+        """Cấu hình driver gửi cho các tiến trình chạy script"""
+        chrome_config = self.automation_worker.chrome_config
+        return {
+            "chrome_path": chrome_config.get("chrome_path"),
+            "profile_path": chrome_config.get("profile_path"),
+            "headless": bool(self.automation_worker.headless),
+            "proxy": self.automation_worker.proxy or None,
+            "driver_path": resolve_chromedriver(chrome_config.get("chrome_path") or None)
+        }
+
+    def execute_script_job(self, script_path):
+        """Chạy script trong tiến trình riêng của script runner (gọi từ thread của executor)"""
+        driver_config = self.script_driver_config()
+        runner = get_script_runner_pool(driver_config)
+        name = os.path.basename(script_path)
+        run = runner.run(
+            script_path,
+            driver_config=driver_config,
+            on_event=lambda event: event.get("type") == "log" and logging.info(f"[{name}] {event.get('message')}")
+        )
+        if not run.ok:
+            raise Exception(run.error or f"Script {name} thất bại")
+        return run.result
 
     def connect_signals(self):
         """Connect all UI signals and worker signals"""
@@ -625,9 +692,7 @@ class MainWindow(QMainWindow):
                 self.script_manager_page.script_selected.connect(self.on_script_selected)
                 self.script_manager_page.run_script.connect(self.run_script)
             
-            # Connect task scheduler signals
-            if hasattr(self, 'task_scheduler_page'):
-                self.task_scheduler_page.task_ready.connect(self.on_scheduled_task_ready)
+            # Task scheduler signals are connected in init_task_executor
             
             # Connect menu actions
             for action in self.menu_actions.values():
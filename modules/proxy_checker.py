@@ -0,0 +1,313 @@
+"""
+Module proxy_checker.py
+Kiểm tra proxy hàng loạt bằng asyncio (không cần thư viện ngoài):
+  - Hàng trăm probe chạy đồng thời, giới hạn bằng semaphore
+  - Đo riêng thời gian kết nối tới proxy, bắt tay TLS và time-to-first-byte
+  - Hỗ trợ proxy HTTP (CONNECT), SOCKS4/4a và SOCKS5 (có xác thực)
+  - Đích kiểm tra cấu hình được (kể cả server HTTP nội bộ dùng khi test)
+"""
+
+import ssl
+import time
+import base64
+import socket
+import asyncio
+import ipaddress
+from urllib.parse import urlparse, unquote
+
+from .config import PROXY_CHECK_TARGET, PROXY_CHECK_CONCURRENCY, PROXY_CHECK_TIMEOUT
+
+DEFAULT_PORTS = {"http": 8080, "https": 8080, "socks4": 1080, "socks5": 1080}
+
+
+class ProxyCheckError(Exception):
+    """Lỗi trong quá trình probe (kèm giai đoạn bị lỗi)"""
+
+    def __init__(self, stage, message):
+        super().__init__(f"{stage}: {message}")
+        self.stage = stage
+
+
+def parse_proxy_address(proxy):
+    """
+    Phân tích chuỗi proxy thành dict {scheme, host, port, username, password}.
+    Hỗ trợ: ip:port, ip:port:user:pass, user:pass@ip:port, scheme://[user:pass@]ip:port
+    """
+    proxy = proxy.strip()
+    if "://" not in proxy:
+        parts = proxy.split(":")
+        if len(parts) == 4 and "@" not in proxy:
+            host, port, username, password = parts
+            return {"scheme": "http", "host": host, "port": int(port),
+                    "username": username, "password": password}
+        proxy = "http://" + proxy
+
+    parsed = urlparse(proxy)
+    scheme = parsed.scheme.lower()
+    if scheme == "socks5h":
+        scheme = "socks5"
+    if scheme not in DEFAULT_PORTS:
+        raise ValueError(f"Loại proxy không hỗ trợ: {scheme}")
+    if not parsed.hostname:
+        raise ValueError(f"Proxy không hợp lệ: {proxy}")
+    return {
+        "scheme": scheme,
+        "host": parsed.hostname,
+        "port": parsed.port or DEFAULT_PORTS[scheme],
+        "username": unquote(parsed.username) if parsed.username else None,
+        "password": unquote(parsed.password) if parsed.password else None
+    }
+
+
+def parse_target(target):
+    """Phân tích URL đích kiểm tra thành (tls, host, port, path)"""
+    parsed = urlparse(target)
+    tls = parsed.scheme == "https"
+    port = parsed.port or (443 if tls else 80)
+    path = parsed.path or "/"
+    if parsed.query:
+        path += "?" + parsed.query
+    return tls, parsed.hostname, port, path
+
+
+# ---------------- SOCKET HELPERS ----------------
+async def _recv_exact(loop, sock, size):
+    data = b""
+    while len(data) < size:
+        chunk = await loop.sock_recv(sock, size - len(data))
+        if not chunk:
+            raise ConnectionError("Kết nối bị đóng")
+        data += chunk
+    return data
+
+
+async def _recv_until(loop, sock, marker, limit=65536):
+    data = b""
+    while marker not in data:
+        chunk = await loop.sock_recv(sock, 4096)
+        if not chunk:
+            raise ConnectionError("Kết nối bị đóng")
+        data += chunk
+        if len(data) > limit:
+            raise ConnectionError("Phản hồi quá dài")
+    return data
+
+
+async def _open_socket(loop, host, port):
+    infos = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    last_error = None
+    for family, socktype, proto, _name, address in infos:
+        sock = socket.socket(family, socktype, proto)
+        sock.setblocking(False)
+        try:
+            await loop.sock_connect(sock, address)
+            return sock
+        except OSError as e:
+            last_error = e
+            sock.close()
+    raise last_error or ConnectionError(f"Không kết nối được {host}:{port}")
+
+
+# ---------------- HANDSHAKE ----------------
+async def _http_connect(loop, sock, proxy, host, port):
+    lines = [f"CONNECT {host}:{port} HTTP/1.1", f"Host: {host}:{port}"]
+    if proxy["username"]:
+        token = base64.b64encode(f"{proxy['username']}:{proxy['password'] or ''}".encode()).decode()
+        lines.append(f"Proxy-Authorization: Basic {token}")
+    await loop.sock_sendall(sock, ("\r\n".join(lines) + "\r\n\r\n").encode())
+    response = await _recv_until(loop, sock, b"\r\n\r\n")
+    status_line = response.split(b"\r\n", 1)[0].decode("latin-1")
+    parts = status_line.split()
+    if len(parts) < 2 or parts[1] != "200":
+        raise ConnectionError(f"CONNECT bị từ chối: {status_line}")
+
+
+async def _socks5_connect(loop, sock, proxy, host, port):
+    methods = b"\x00\x02" if proxy["username"] else b"\x00"
+    await loop.sock_sendall(sock, b"\x05" + bytes([len(methods)]) + methods)
+    version, method = await _recv_exact(loop, sock, 2)
+    if version != 5 or method == 0xFF:
+        raise ConnectionError("SOCKS5 không chấp nhận phương thức xác thực")
+    if method == 0x02:
+        user = (proxy["username"] or "").encode()
+        password = (proxy["password"] or "").encode()
+        await loop.sock_sendall(sock, b"\x01" + bytes([len(user)]) + user + bytes([len(password)]) + password)
+        _ver, status = await _recv_exact(loop, sock, 2)
+        if status != 0:
+            raise ConnectionError("SOCKS5 xác thực thất bại")
+
+    host_bytes = host.encode("idna")
+    request = b"\x05\x01\x00\x03" + bytes([len(host_bytes)]) + host_bytes + port.to_bytes(2, "big")
+    await loop.sock_sendall(sock, request)
+    header = await _recv_exact(loop, sock, 4)
+    if header[1] != 0:
+        raise ConnectionError(f"SOCKS5 lỗi kết nối (mã {header[1]})")
+    address_type = header[3]
+    if address_type == 1:
+        await _recv_exact(loop, sock, 4 + 2)
+    elif address_type == 4:
+        await _recv_exact(loop, sock, 16 + 2)
+    else:
+        length = (await _recv_exact(loop, sock, 1))[0]
+        await _recv_exact(loop, sock, length + 2)
+
+
+async def _socks4_connect(loop, sock, proxy, host, port):
+    user = (proxy["username"] or "").encode()
+    try:
+        address = ipaddress.IPv4Address(host).packed
+        suffix = b""
+    except ValueError:
+        # SOCKS4a: để proxy tự phân giải tên miền
+        address = b"\x00\x00\x00\x01"
+        suffix = host.encode("idna") + b"\x00"
+    await loop.sock_sendall(sock, b"\x04\x01" + port.to_bytes(2, "big") + address + user + b"\x00" + suffix)
+    response = await _recv_exact(loop, sock, 8)
+    if response[1] != 0x5A:
+        raise ConnectionError(f"SOCKS4 từ chối kết nối (mã {response[1]})")
+
+
+# ---------------- PROBE ----------------
+async def probe_proxy(proxy, target=PROXY_CHECK_TARGET, timeout=PROXY_CHECK_TIMEOUT):
+    """
+    Probe một proxy tới target. Trả về dict:
+      {proxy, ok, status_code, connect_ms, tls_ms, ttfb_ms, total_ms, error, stage}
+    Thời gian là mili-giây (None nếu chưa tới giai đoạn đó).
+    """
+    result = {
+        "proxy": proxy, "ok": False, "status_code": None,
+        "connect_ms": None, "tls_ms": None, "ttfb_ms": None, "total_ms": None,
+        "error": None, "stage": None
+    }
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    sock = None
+    writer = None
+    stage = "parse"
+
+    async def _run():
+        nonlocal sock, writer, stage
+        info = parse_proxy_address(proxy)
+        tls, host, port, path = parse_target(target)
+
+        stage = "connect"
+        t0 = time.perf_counter()
+        sock = await _open_socket(loop, info["host"], info["port"])
+        result["connect_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+
+        # Proxy HTTP với đích http:// nhận request dạng absolute-URI, không cần tunnel
+        absolute = info["scheme"] in ("http", "https") and not tls
+        stage = "handshake"
+        if info["scheme"] in ("http", "https") and tls:
+            await _http_connect(loop, sock, info, host, port)
+        elif info["scheme"] == "socks5":
+            await _socks5_connect(loop, sock, info, host, port)
+        elif info["scheme"] == "socks4":
+            await _socks4_connect(loop, sock, info, host, port)
+
+        ssl_context = None
+        if tls:
+            ssl_context = ssl.create_default_context()
+        stage = "tls" if tls else "handshake"
+        t0 = time.perf_counter()
+        reader, writer = await asyncio.open_connection(
+            sock=sock, ssl=ssl_context, server_hostname=host if tls else None
+        )
+        sock = None  # transport đã sở hữu socket
+        if tls:
+            result["tls_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+
+        stage = "request"
+        request_target = target if absolute else path
+        headers = [f"GET {request_target} HTTP/1.1", f"Host: {host}", "User-Agent: Mozilla/5.0",
+                   "Accept: */*", "Connection: close"]
+        if absolute and info["username"]:
+            token = base64.b64encode(f"{info['username']}:{info['password'] or ''}".encode()).decode()
+            headers.append(f"Proxy-Authorization: Basic {token}")
+        t0 = time.perf_counter()
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode())
+        await writer.drain()
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("Không nhận được phản hồi")
+        result["ttfb_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+
+        parts = status_line.decode("latin-1").split()
+        result["status_code"] = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else None
+        result["ok"] = result["status_code"] is not None and result["status_code"] < 400
+        if not result["ok"]:
+            result["error"] = f"Mã trạng thái {result['status_code']}"
+
+    try:
+        await asyncio.wait_for(_run(), timeout)
+    except asyncio.TimeoutError:
+        result["error"] = f"Hết thời gian chờ ({timeout}s)"
+        result["stage"] = stage
+    except Exception as e:
+        result["error"] = str(e) or e.__class__.__name__
+        result["stage"] = stage
+    finally:
+        if writer is not None:
+            writer.close()
+        if sock is not None:
+            sock.close()
+        result["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+async def check_proxies(proxies, target=PROXY_CHECK_TARGET, concurrency=PROXY_CHECK_CONCURRENCY,
+                        timeout=PROXY_CHECK_TIMEOUT, on_result=None, should_stop=None):
+    """
+    Probe danh sách proxy đồng thời (tối đa `concurrency` probe cùng lúc).
+    on_result(result) được gọi ngay khi từng proxy có kết quả; should_stop() cho phép hủy giữa chừng.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _guarded(proxy):
+        async with semaphore:
+            if should_stop and should_stop():
+                return None
+            return await probe_proxy(proxy, target, timeout)
+
+    results = []
+    tasks = [asyncio.ensure_future(_guarded(p)) for p in proxies]
+    try:
+        for future in asyncio.as_completed(tasks):
+            result = await future
+            if result is None:
+                continue
+            results.append(result)
+            if on_result:
+                on_result(result)
+            if should_stop and should_stop():
+                break
+    finally:
+        for task in tasks:
+            task.cancel()
+    return results
+
+
+def run_checks(proxies, **kwargs):
+    """Phiên bản đồng bộ của check_proxies (tạo event loop riêng)"""
+    return asyncio.run(check_proxies(proxies, **kwargs))
+
+
+# ---------------- ĐÍCH KIỂM TRA NỘI BỘ ----------------
+async def serve_probe_target(host="127.0.0.1", port=0):
+    """
+    Khởi động server HTTP tối giản trả về 204 (dùng làm đích kiểm tra khi test, không cần Internet).
+    Trả về (server, url); đóng bằng server.close().
+    """
+    async def _handle(reader, writer):
+        try:
+            await reader.readuntil(b"\r\n\r\n")
+            writer.write(b"HTTP/1.1 204 No Content\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            await writer.drain()
+        except Exception:
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(_handle, host, port)
+    bound_port = server.sockets[0].getsockname()[1]
+    return server, f"http://{host}:{bound_port}/"
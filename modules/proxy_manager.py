@@ -3,27 +3,162 @@
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
     QLineEdit, QFileDialog, QMessageBox, QCheckBox,
-    QTableWidget, QTableWidgetItem, QHeaderView, QLabel, QSpinBox
+    QTableView, QHeaderView, QLabel, QSpinBox, QAbstractItemView
 )
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtCore import Qt, pyqtSignal, QThread, QAbstractTableModel, QModelIndex, QDateTime
 from PyQt5.QtGui import QFont
 
-import os
-import json
-import requests
-import threading
 import time
-from queue import Queue
+import asyncio
 import traceback
-from .config import THEMES, DEFAULT_THEME
+from .config import THEMES, DEFAULT_THEME, PROXY_CHECK_TARGET, PROXY_CHECK_CONCURRENCY, PROXY_CHECK_TIMEOUT
+from .proxy_checker import check_proxies, run_checks
+from .proxy_pool import get_proxy_pool
+from .proxy_store import get_proxy_store, STATUS_LABELS, STATUS_OK, STATUS_FAILED
+
+RESULT_FLUSH_SIZE = 200  # Số kết quả kiểm tra gom lại trước khi ghi vào database
+
+
+class ProxyCheckThread(QThread):
+    """Chạy kiểm tra proxy asyncio trong thread riêng, gửi kết quả từng proxy ngay khi có"""
+    result_ready = pyqtSignal(dict)
+    checks_finished = pyqtSignal(int, int)  # (số proxy hoạt động, tổng số đã kiểm tra)
+
+    def __init__(self, proxies, target=PROXY_CHECK_TARGET, concurrency=PROXY_CHECK_CONCURRENCY,
+                 timeout=PROXY_CHECK_TIMEOUT, parent=None):
+        super().__init__(parent)
+        self.proxies = list(proxies)
+        self.target = target
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self._stopped = False
+
+    def stop(self):
+        self._stopped = True
+
+    def run(self):
+        results = []
+        try:
+            results = asyncio.run(check_proxies(
+                self.proxies, target=self.target, concurrency=self.concurrency, timeout=self.timeout,
+                on_result=self.result_ready.emit, should_stop=lambda: self._stopped
+            ))
+        except Exception as e:
+            print(f"Lỗi khi kiểm tra proxy: {e}")
+            traceback.print_exc()
+        finally:
+            self.checks_finished.emit(sum(1 for r in results if r["ok"]), len(results))
+
+
+class ProxyTableModel(QAbstractTableModel):
+    """Model bảng proxy đọc lười từ ProxyStore (mỗi lần một trang khi người dùng cuộn tới)"""
+    HEADERS = ["Proxy", "Tình trạng", "Tốc độ (ms)", "Kết nối (ms)", "TLS (ms)", "TTFB (ms)", "Kiểm tra lúc"]
+    PAGE_SIZE = 500
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self._rows = []
+        self._row_index = {}
+        self._total = 0
+        self._checking = set()
+
+    # ---------------- QAbstractTableModel ----------------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and len(self._rows) < self._total
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        rows = self.store.page(offset=len(self._rows), limit=self.PAGE_SIZE)
+        if not rows:
+            self._total = len(self._rows)
+            return
+        start = len(self._rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+        for offset, row in enumerate(rows):
+            self._row_index[row["proxy"]] = start + offset
+        self._rows.extend(rows)
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        column = index.column()
+        if role == Qt.ToolTipRole and row.get("error"):
+            return row["error"]
+        if role != Qt.DisplayRole:
+            return None
+
+        if column == 0:
+            return row["proxy"]
+        if column == 1:
+            if row["proxy"] in self._checking:
+                return "Đang kiểm tra"
+            return STATUS_LABELS.get(row["status"], row["status"])
+        if column == 6:
+            if not row.get("last_checked"):
+                return "-"
+            return QDateTime.fromSecsSinceEpoch(int(row["last_checked"])).toString("dd/MM HH:mm:ss")
+        field = ("latency_ms", "connect_ms", "tls_ms", "ttfb_ms")[column - 2]
+        value = row.get(field)
+        return "-" if value is None else str(value)
+
+    # ---------------- CẬP NHẬT ----------------
+    def reload(self):
+        """Đọc lại từ đầu (chỉ trang đầu tiên được nạp ngay)"""
+        self.beginResetModel()
+        self._rows = []
+        self._row_index = {}
+        self._total = self.store.count()
+        self.endResetModel()
+
+    def set_checking(self, proxies):
+        """Đánh dấu các proxy đang được kiểm tra (set rỗng để bỏ đánh dấu)"""
+        self._checking = set(proxies)
+        if self._rows:
+            self.dataChanged.emit(self.index(0, 1), self.index(len(self._rows) - 1, 1))
+
+    def apply_result(self, result):
+        """Cập nhật dòng của proxy vừa kiểm tra (nếu dòng đã được nạp)"""
+        self._checking.discard(result["proxy"])
+        row_number = self._row_index.get(result["proxy"])
+        if row_number is None:
+            return
+        self._rows[row_number].update({
+            "status": STATUS_OK if result["ok"] else STATUS_FAILED,
+            "latency_ms": result["total_ms"],
+            "connect_ms": result["connect_ms"],
+            "tls_ms": result["tls_ms"],
+            "ttfb_ms": result["ttfb_ms"],
+            "error": result["error"],
+            "last_checked": result.get("checked_at") or time.time()
+        })
+        self.dataChanged.emit(self.index(row_number, 0), self.index(row_number, len(self.HEADERS) - 1))
+
+    def proxy_at(self, row):
+        return self._rows[row]["proxy"]
+
 
 class ProxyManagerWidget(QWidget):
     """
     Widget quản lý và kiểm tra Proxy:
       - Thêm/sửa/xóa proxy
-      - Test proxy đa luồng
-      - Hỗ trợ HTTP/HTTPS/SOCKS4/SOCKS5 (cần 'requests[socks]' nếu dùng SOCKS)
-      - Lưu/đọc proxy từ file JSON
+      - Test proxy đồng thời bằng asyncio (đo thời gian kết nối, TLS, TTFB)
+      - Hỗ trợ HTTP/HTTPS/SOCKS4/SOCKS5
+      - Lưu proxy và lịch sử kiểm tra trong SQLite (data/proxies.db), nhập hàng loạt từ file .txt
       - Xuất danh sách proxy hoạt động ra file .txt
     """
     proxies_updated = pyqtSignal(list)  # Signal khi danh sách proxy được cập nhật
@@ -31,13 +166,10 @@ class ProxyManagerWidget(QWidget):
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.proxies = []
-        # Đường dẫn lưu file JSON proxy
-        self.proxy_file = os.path.join(
-            os.path.dirname(os.path.dirname(__file__)),
-            "data",
-            "proxies.json"
-        )
+        self.store = get_proxy_store()
+        self.check_thread = None
+        self.check_results = []
+        self.pending_results = []  # Kết quả chưa ghi vào database
         self.init_ui()
         self.load_proxies()
 
@@ -77,18 +209,25 @@ class ProxyManagerWidget(QWidget):
 
         layout.addLayout(input_layout)
 
-        # Bảng hiển thị proxy
-        self.proxy_table = QTableWidget(0, 3)
-        self.proxy_table.setHorizontalHeaderLabels(["Proxy", "Tình trạng", "Tốc độ (ms)"])
+        import_btn = QPushButton("Nhập từ file")
+        import_btn.clicked.connect(self.import_proxies)
+        input_layout.addWidget(import_btn)
+
+        # Bảng hiển thị proxy (model đọc lười từ database)
+        self.proxy_model = ProxyTableModel(self.store, self)
+        self.proxy_table = QTableView()
+        self.proxy_table.setModel(self.proxy_model)
+        self.proxy_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.proxy_table.verticalHeader().setDefaultSectionSize(24)
         self.proxy_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         layout.addWidget(self.proxy_table)
 
         # Nút điều khiển
         control_layout = QHBoxLayout()
 
-        test_btn = QPushButton("Kiểm tra tất cả")
-        test_btn.clicked.connect(self.test_all_proxies)
-        control_layout.addWidget(test_btn)
+        self.test_btn = QPushButton("Kiểm tra tất cả")
+        self.test_btn.clicked.connect(self.test_all_proxies)
+        control_layout.addWidget(self.test_btn)
 
         delete_btn = QPushButton("Xóa đã chọn")
         delete_btn.clicked.connect(self.delete_selected)
@@ -115,40 +254,19 @@ class ProxyManagerWidget(QWidget):
 
     def load_proxies(self):
         """
-        Đọc danh sách proxy từ file JSON (nếu có).
+        Đọc danh sách proxy từ database (proxies.json cũ được chuyển sang tự động).
         """
         try:
-            if os.path.exists(self.proxy_file):
-                with open(self.proxy_file, 'r', encoding='utf-8') as f:
-                    self.proxies = json.load(f)
-                self.update_table()
-                # Phát signal thông báo danh sách proxy hoạt động
-                self.proxies_updated.emit(self.get_active_proxies())
+            self.proxy_model.reload()
+            self.publish_proxies()
         except Exception as e:
             QMessageBox.warning(self, "Lỗi", f"Không thể tải danh sách proxy: {str(e)}")
 
-    def save_proxies(self):
-        """
-        Lưu danh sách proxy vào file JSON.
-        """
-        try:
-            os.makedirs(os.path.dirname(self.proxy_file), exist_ok=True)
-            with open(self.proxy_file, 'w', encoding='utf-8') as f:
-                json.dump(self.proxies, f, indent=2, ensure_ascii=False)
-            # Phát signal thông báo danh sách proxy hoạt động
-            self.proxies_updated.emit(self.get_active_proxies())
-        except Exception as e:
-            QMessageBox.warning(self, "Lỗi", f"Không thể lưu danh sách proxy: {str(e)}")
-
-    def update_table(self):
-        """
-        Cập nhật nội dung bảng QTableWidget dựa vào self.proxies.
-        """
-        self.proxy_table.setRowCount(len(self.proxies))
-        for row, proxy_data in enumerate(self.proxies):
-            self.proxy_table.setItem(row, 0, QTableWidgetItem(proxy_data["proxy"]))
-            self.proxy_table.setItem(row, 1, QTableWidgetItem(proxy_data.get("status", "Chưa kiểm tra")))
-            self.proxy_table.setItem(row, 2, QTableWidgetItem(str(proxy_data.get("speed", "-"))))
+    def publish_proxies(self):
+        """Cập nhật ProxyPool dùng chung và phát signal danh sách proxy hoạt động"""
+        active = self.get_active_proxies()
+        get_proxy_pool().update(active)
+        self.proxies_updated.emit(active)
 
     def add_proxy(self):
         """
@@ -164,21 +282,28 @@ class ProxyManagerWidget(QWidget):
         if not proxy_str:
             return
 
-        # Kiểm tra trùng lặp
-        if any(p["proxy"] == proxy_str for p in self.proxies):
+        # Kiểm tra trùng lặp (proxy là khóa UNIQUE trong database)
+        if not self.store.add(proxy_str):
             QMessageBox.information(self, "Thông báo", "Proxy này đã tồn tại trong danh sách.")
             return
 
-        # Bổ sung vào danh sách
-        new_proxy = {
-            "proxy": proxy_str,
-            "status": "Chưa kiểm tra",
-            "speed": "-"
-        }
-        self.proxies.append(new_proxy)
-        self.update_table()
+        self.proxy_model.reload()
         self.proxy_input.clear()
-        self.save_proxies()
+
+    def import_proxies(self):
+        """Nhập proxy từ file .txt (mỗi dòng một proxy) trong một transaction"""
+        path, _ = QFileDialog.getOpenFileName(self, "Nhập proxy", "", "Text files (*.txt);;All files (*)")
+        if not path:
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                lines = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+            added = self.store.import_many(lines)
+        except Exception as e:
+            QMessageBox.warning(self, "Lỗi", f"Không thể nhập proxy: {str(e)}")
+            return
+        self.proxy_model.reload()
+        self.log_signal.emit(f"✅ Đã nhập {added} proxy mới ({len(lines) - added} proxy trùng)")
 
     def parse_proxy(self, proxy_str):
         """
@@ -206,106 +331,80 @@ class ProxyManagerWidget(QWidget):
     def test_proxy(self, proxy):
         """Kiểm tra proxy có hoạt động không"""
         try:
-            import requests
-            from requests.exceptions import ProxyError, ConnectTimeout, ReadTimeout
-            
-            # Thiết lập timeout ngắn để kiểm tra nhanh
-            timeout = 8
-            
-            # Thiết lập proxy
-            proxies = {
-                "http": f"http://{proxy}",
-                "https": f"http://{proxy}"
-            }
-            
-            # Thử kết nối đến một trang web đơn giản
-            try:
-                # Sử dụng User-Agent để tránh bị chặn
-                headers = {
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-                    "Accept-Language": "en-US,en;q=0.9",
-                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8"
-                }
-                
-                # Thử kết nối đến Google
-                response = requests.get(
-                    "https://www.google.com", 
-                    proxies=proxies, 
-                    timeout=timeout,
-                    headers=headers
-                )
-                
-                if response.status_code == 200:
-                    # Kiểm tra tốc độ phản hồi
-                    speed = response.elapsed.total_seconds()
-                    if speed < 5:  # Nếu phản hồi dưới 5 giây
-                        return True, f"Hoạt động tốt (phản hồi: {speed:.2f}s)"
-                    else:
-                        return True, f"Hoạt động chậm (phản hồi: {speed:.2f}s)"
-                else:
-                    return False, f"Lỗi: Mã trạng thái {response.status_code}"
-                    
-            except (ProxyError, ConnectTimeout, ReadTimeout) as e:
-                return False, f"Lỗi kết nối: {str(e)}"
-                
+            result = run_checks([proxy])[0]
         except Exception as e:
             return False, f"Lỗi: {str(e)}"
+        self.store.record_results([result])
+
+        if not result["ok"]:
+            return False, f"Lỗi kết nối: {result['error']}"
+        speed = result["total_ms"] / 1000
+        if speed < 5:  # Nếu phản hồi dưới 5 giây
+            return True, f"Hoạt động tốt (phản hồi: {speed:.2f}s)"
+        return True, f"Hoạt động chậm (phản hồi: {speed:.2f}s)"
 
     def test_all_proxies(self):
-        """Kiểm tra tất cả proxy trong danh sách"""
-        self.log_signal.emit("🔄 Đang kiểm tra tất cả proxy...")
-        
-        # Tạo một hàng đợi để lưu kết quả
-        result_queue = Queue()
-        
-        # Hàm kiểm tra proxy và đưa kết quả vào hàng đợi
-        def test_proxy_worker(index, proxy_str):
-            success, message = self.test_proxy(proxy_str)
-            result_queue.put((index, success, message))
-        
-        # Tạo và khởi động các thread
-        threads = []
-        for i, proxy_data in enumerate(self.proxies):
-            proxy_str = proxy_data["proxy"]
-            t = threading.Thread(target=test_proxy_worker, args=(i, proxy_str))
-            t.daemon = True
-            threads.append(t)
-            t.start()
-            # Giới hạn số lượng thread đồng thời để tránh quá tải
-            if len(threads) >= 10:
-                for thread in threads:
-                    thread.join()
-                threads = []
-        
-        # Đợi các thread còn lại hoàn thành
-        for thread in threads:
-            thread.join()
-        
-        # Xử lý kết quả
-        working_count = 0
-        while not result_queue.empty():
-            index, success, message = result_queue.get()
-            if success:
-                self.proxies[index]["status"] = "Hoạt động"
-                self.proxies[index]["speed"] = message
-                working_count += 1
-            else:
-                self.proxies[index]["status"] = "Không hoạt động"
-                self.proxies[index]["speed"] = message
-        
-        # Cập nhật UI
-        self.update_table()
-        self.log_signal.emit(f"✅ Đã kiểm tra xong: {working_count}/{len(self.proxies)} proxy hoạt động")
-        
-        # Phát tín hiệu cập nhật proxy
-        working_proxies = [p["proxy"] for p in self.proxies if p["status"] == "Hoạt động"]
-        self.proxies_updated.emit(working_proxies)
+        """Kiểm tra tất cả proxy trong danh sách (bất đồng bộ, bảng cập nhật theo từng kết quả)"""
+        if self.check_thread and self.check_thread.isRunning():
+            self.log_signal.emit("⚠️ Đang kiểm tra proxy, vui lòng chờ...")
+            return
+        proxies = self.store.proxies()
+        if not proxies:
+            return
+
+        self.log_signal.emit(f"🔄 Đang kiểm tra {len(proxies)} proxy...")
+        self.proxy_model.set_checking(proxies)
+
+        self.test_btn.setEnabled(False)
+        self.check_results = []
+        self.pending_results = []
+        self.check_thread = ProxyCheckThread(proxies, parent=self)
+        self.check_thread.result_ready.connect(self.on_proxy_checked)
+        self.check_thread.checks_finished.connect(self.on_checks_finished)
+        self.check_thread.start()
+
+    def on_proxy_checked(self, result):
+        """Cập nhật ngay dòng của proxy vừa kiểm tra xong, ghi database theo lô"""
+        self.check_results.append(result)
+        self.pending_results.append(result)
+        self.proxy_model.apply_result(result)
+        if len(self.pending_results) >= RESULT_FLUSH_SIZE:
+            self.flush_results()
+
+    def flush_results(self):
+        """Ghi các kết quả kiểm tra đang chờ vào database (một transaction)"""
+        if not self.pending_results:
+            return
+        try:
+            self.store.record_results(self.pending_results)
+        except Exception as e:
+            self.log_signal.emit(f"❌ Không thể lưu kết quả kiểm tra proxy: {str(e)}")
+        self.pending_results = []
+
+    def on_checks_finished(self, working_count, checked_count):
+        """Lưu kết quả và phát danh sách proxy hoạt động khi kiểm tra xong"""
+        self.test_btn.setEnabled(True)
+        self.flush_results()
+        self.proxy_model.set_checking(())
+        self.log_signal.emit(f"✅ Đã kiểm tra xong: {working_count}/{checked_count} proxy hoạt động")
+
+        # Cập nhật ProxyPool trước, rồi mới đưa kết quả kiểm tra vào điểm số
+        # (proxy vừa chuyển sang hoạt động phải có trong pool thì điểm mới được ghi nhận)
+        active = self.get_active_proxies()
+        pool = get_proxy_pool()
+        pool.update(active)
+        for result in self.check_results:
+            pool.report(result["proxy"], result["ok"], result["ttfb_ms"] or result["total_ms"])
+        self.check_results = []
+
+        # Phát danh sách proxy hoạt động mới cho AutomationView ngay tại đây, không phụ thuộc publish_proxies()
+        self.proxies_updated.emit(active)
 
     def delete_selected(self):
         """
         Xóa các proxy được chọn trong bảng.
         """
-        selected_rows = set(item.row() for item in self.proxy_table.selectedItems())
+        selected_rows = set(index.row() for index in self.proxy_table.selectionModel().selectedRows())
         if not selected_rows:
             return
 
@@ -318,25 +417,21 @@ class ProxyManagerWidget(QWidget):
         if confirm == QMessageBox.No:
             return
 
-        for row in sorted(selected_rows, reverse=True):
-            if 0 <= row < len(self.proxies):
-                self.proxies.pop(row)
-
-        self.update_table()
-        self.save_proxies()
+        self.store.delete([self.proxy_model.proxy_at(row) for row in selected_rows])
+        self.proxy_model.reload()
+        self.publish_proxies()
 
     def export_proxies(self):
         """
         Xuất danh sách proxy ra file text (tất cả & proxy hoạt động).
         """
-        if not self.proxies:
+        proxies = self.store.proxies()
+        if not proxies:
             QMessageBox.warning(self, "Không có dữ liệu", "Danh sách proxy trống.")
             return
 
-        all_proxies = "\n".join([p["proxy"] for p in self.proxies])
-        working_proxies = "\n".join(
-            [p["proxy"] for p in self.proxies if p["status"] == "Hoạt động"]
-        )
+        all_proxies = "\n".join(proxies)
+        working_proxies = "\n".join(self.store.active_proxies())
 
         export_text = (
             "=== TẤT CẢ PROXY ===\n"
@@ -364,11 +459,11 @@ class ProxyManagerWidget(QWidget):
         """
         Trả về list các proxy đang ở trạng thái 'Hoạt động'.
         """
-        return [p["proxy"] for p in self.proxies if p["status"] == "Hoạt động"]
+        return self.store.active_proxies()
         
     def refresh_proxies(self):
         """
-        Làm mới danh sách proxy từ file và cập nhật giao diện.
+        Làm mới danh sách proxy từ database và cập nhật giao diện.
         """
         self.log_signal.emit("🔄 Đang làm mới danh sách proxy...")
         self.load_proxies()
@@ -406,13 +501,13 @@ class ProxyManagerWidget(QWidget):
                 QPushButton:hover {{
                     background-color: {theme["accent_hover"]};
                 }}
-                QTableWidget {{
+                QTableView {{
                     background-color: {theme["bg_secondary"]};
                     color: {theme["text_primary"]};
                     border: 1px solid {theme["border"]};
                     gridline-color: {theme["border"]};
                 }}
-                QTableWidget::item {{
+                QTableView::item {{
                     padding: 5px;
                 }}
                 QHeaderView::section {{
@@ -0,0 +1,192 @@
+"""
+Module proxy_pool.py
+Chọn proxy theo điểm số thay vì random/round-robin:
+  - Tỉ lệ thành công tính bằng trung bình trượt mũ (EWMA), latency p50/p95 từ các mẫu gần nhất
+  - Proxy lỗi liên tiếp bị ngắt mạch (circuit breaker) trong thời gian cooldown tăng dần,
+    hết cooldown được thử lại một lần (half-open) trước khi dùng bình thường
+  - Kết quả task của worker và kết quả kiểm tra proxy được báo lại qua report()
+"""
+
+import time
+import random
+import threading
+from collections import deque
+
+from .config import (
+    PROXY_POOL_EWMA_ALPHA, PROXY_POOL_FAILURE_THRESHOLD,
+    PROXY_POOL_BASE_COOLDOWN, PROXY_POOL_MAX_COOLDOWN
+)
+
+CLOSED = "closed"        # Hoạt động bình thường
+OPEN = "open"            # Đang bị ngắt, không được chọn
+HALF_OPEN = "half_open"  # Hết cooldown, cho phép một lần thử
+
+DEFAULT_LATENCY_MS = 1500  # Latency giả định khi chưa có mẫu đo
+
+
+class ProxyStats:
+    """Thống kê của một proxy"""
+
+    def __init__(self, proxy, success_rate=0.8):
+        self.proxy = proxy
+        self.success_rate = success_rate
+        self.latencies = deque(maxlen=50)
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.open_until = 0.0
+        self.trips = 0  # Số lần liên tiếp bị ngắt mạch (quyết định độ dài cooldown)
+        self.in_trial = False
+        self.total = 0
+        self.failures = 0
+        self.last_used = 0.0
+
+    def percentile(self, pct):
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+    @property
+    def p50(self):
+        return self.percentile(50)
+
+    @property
+    def p95(self):
+        return self.percentile(95)
+
+    def score(self):
+        """Điểm chọn proxy: ưu tiên tỉ lệ thành công cao và latency thấp"""
+        latency = self.p50 if self.p50 is not None else DEFAULT_LATENCY_MS
+        return (self.success_rate ** 2) * 1000.0 / (latency + 200.0)
+
+    def as_dict(self):
+        return {
+            "proxy": self.proxy,
+            "state": self.state,
+            "success_rate": round(self.success_rate, 3),
+            "p50_ms": self.p50,
+            "p95_ms": self.p95,
+            "consecutive_failures": self.consecutive_failures,
+            "total": self.total,
+            "failures": self.failures,
+            "cooldown_left": max(0, round(self.open_until - time.time())) if self.state == OPEN else 0
+        }
+
+
+class ProxyPool:
+    """Tập proxy dùng chung, chọn theo điểm có trọng số và ngắt mạch proxy lỗi"""
+
+    def __init__(self, alpha=PROXY_POOL_EWMA_ALPHA, failure_threshold=PROXY_POOL_FAILURE_THRESHOLD,
+                 base_cooldown=PROXY_POOL_BASE_COOLDOWN, max_cooldown=PROXY_POOL_MAX_COOLDOWN):
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    # ---------------- DANH SÁCH ----------------
+    def update(self, proxies):
+        """Đồng bộ danh sách proxy (giữ lại thống kê của proxy đã có)"""
+        with self._lock:
+            wanted = list(dict.fromkeys(p for p in proxies if p))
+            self._stats = {p: self._stats.get(p) or ProxyStats(p) for p in wanted}
+
+    def add(self, proxies):
+        """Thêm proxy chưa có vào pool (không xóa proxy hiện có)"""
+        with self._lock:
+            for proxy in proxies:
+                if proxy and proxy not in self._stats:
+                    self._stats[proxy] = ProxyStats(proxy)
+
+    def proxies(self):
+        with self._lock:
+            return list(self._stats)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._stats)
+
+    # ---------------- CHỌN PROXY ----------------
+    def choose(self, candidates=None, exclude=()):
+        """
+        Chọn một proxy theo điểm có trọng số (None nếu không còn proxy khả dụng).
+        candidates giới hạn tập được chọn, exclude loại trừ các proxy cho trước.
+        """
+        now = time.time()
+        with self._lock:
+            pool = [self._stats[p] for p in (candidates or self._stats) if p in self._stats and p not in exclude]
+            available = []
+            for stats in pool:
+                if stats.state == OPEN and now >= stats.open_until:
+                    stats.state = HALF_OPEN
+                    stats.in_trial = False
+                # Lần thử half-open không được báo kết quả thì cho thử lại sau base_cooldown
+                trial_free = not stats.in_trial or now - stats.last_used > self.base_cooldown
+                if stats.state == CLOSED or (stats.state == HALF_OPEN and trial_free):
+                    available.append(stats)
+            if not available:
+                return None
+
+            # Proxy vừa hết cooldown được thử ngay để sớm biết đã hồi phục hay chưa
+            trial = [s for s in available if s.state == HALF_OPEN]
+            if trial:
+                chosen = trial[0]
+                chosen.in_trial = True
+            else:
+                weights = [s.score() for s in available]
+                chosen = random.choices(available, weights=weights, k=1)[0]
+            chosen.last_used = now
+            return chosen.proxy
+
+    # ---------------- PHẢN HỒI ----------------
+    def report(self, proxy, success, latency_ms=None):
+        """Ghi nhận kết quả sử dụng proxy (từ worker hoặc từ kiểm tra proxy)"""
+        if not proxy:
+            return
+        with self._lock:
+            stats = self._stats.get(proxy)
+            if stats is None:
+                return
+            stats.total += 1
+            stats.success_rate = (1 - self.alpha) * stats.success_rate + self.alpha * (1.0 if success else 0.0)
+            if latency_ms is not None and success:
+                stats.latencies.append(float(latency_ms))
+
+            if success:
+                stats.consecutive_failures = 0
+                if stats.state == HALF_OPEN:
+                    stats.state = CLOSED
+                    stats.trips = 0
+                stats.in_trial = False
+                return
+
+            stats.failures += 1
+            stats.consecutive_failures += 1
+            if stats.state == HALF_OPEN or stats.consecutive_failures >= self.failure_threshold:
+                stats.trips += 1
+                cooldown = min(self.max_cooldown, self.base_cooldown * (2 ** (stats.trips - 1)))
+                stats.state = OPEN
+                stats.open_until = time.time() + cooldown
+                stats.in_trial = False
+                stats.consecutive_failures = 0
+
+    def snapshot(self):
+        """Thống kê của toàn bộ proxy, sắp xếp theo điểm giảm dần"""
+        with self._lock:
+            ordered = sorted(self._stats.values(), key=lambda s: s.score(), reverse=True)
+            return [s.as_dict() for s in ordered]
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_proxy_pool():
+    """Trả về ProxyPool dùng chung cho toàn tiến trình"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProxyPool()
+        return _pool
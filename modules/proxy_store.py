@@ -0,0 +1,243 @@
+"""
+Module proxy_store.py
+Lưu trữ proxy bằng SQLite (thay cho việc ghi đè toàn bộ data/proxies.json):
+  - Bảng proxies: trạng thái và số đo dạng số (ms), có index theo trạng thái và thời điểm kiểm tra
+  - Bảng probes: lịch sử từng lần kiểm tra của mỗi proxy
+  - Nhập hàng chục nghìn proxy trong một transaction, đọc theo trang để giao diện mở ngay
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+
+from .config import DATA_DIR
+
+PROXY_DB_PATH = os.path.join(DATA_DIR, "proxies.db")
+LEGACY_JSON_PATH = os.path.join(DATA_DIR, "proxies.json")
+
+STATUS_UNCHECKED = "unchecked"
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+
+# Nhãn hiển thị trên giao diện (và trạng thái tương ứng trong proxies.json cũ)
+STATUS_LABELS = {
+    STATUS_UNCHECKED: "Chưa kiểm tra",
+    STATUS_OK: "Hoạt động",
+    STATUS_FAILED: "Không hoạt động"
+}
+
+PROXY_COLUMNS = ("proxy", "status", "latency_ms", "connect_ms", "tls_ms", "ttfb_ms",
+                 "error", "last_checked", "check_count", "fail_count", "added_at")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS proxies (
+    id INTEGER PRIMARY KEY,
+    proxy TEXT NOT NULL UNIQUE,
+    status TEXT NOT NULL DEFAULT 'unchecked',
+    latency_ms REAL,
+    connect_ms REAL,
+    tls_ms REAL,
+    ttfb_ms REAL,
+    error TEXT,
+    last_checked REAL,
+    check_count INTEGER NOT NULL DEFAULT 0,
+    fail_count INTEGER NOT NULL DEFAULT 0,
+    added_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_proxies_status ON proxies(status);
+CREATE INDEX IF NOT EXISTS idx_proxies_last_checked ON proxies(last_checked);
+
+CREATE TABLE IF NOT EXISTS probes (
+    id INTEGER PRIMARY KEY,
+    proxy_id INTEGER NOT NULL REFERENCES proxies(id) ON DELETE CASCADE,
+    checked_at REAL NOT NULL,
+    ok INTEGER NOT NULL,
+    status_code INTEGER,
+    connect_ms REAL,
+    tls_ms REAL,
+    ttfb_ms REAL,
+    total_ms REAL,
+    error TEXT,
+    stage TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_probes_proxy ON probes(proxy_id, checked_at);
+"""
+
+
+class ProxyStore:
+    """Kho proxy SQLite dùng chung giữa các thread (một kết nối, khóa bằng lock)"""
+
+    def __init__(self, path=PROXY_DB_PATH, legacy_json=LEGACY_JSON_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(_SCHEMA)
+        if legacy_json:
+            self._migrate_json(legacy_json)
+
+    # ---------------- GHI ----------------
+    def add(self, proxy):
+        """Thêm một proxy, trả về False nếu đã tồn tại"""
+        return self.import_many([proxy]) == 1
+
+    def import_many(self, proxies):
+        """Nhập nhiều proxy trong một transaction (bỏ qua proxy trùng), trả về số proxy mới"""
+        now = time.time()
+        rows = [(p.strip(), now) for p in proxies if p and p.strip()]
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO proxies (proxy, added_at) VALUES (?, ?)", rows
+            )
+            return self._conn.total_changes - before
+
+    def delete(self, proxies):
+        """Xóa proxy (kèm lịch sử kiểm tra)"""
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM proxies WHERE proxy = ?", [(p,) for p in proxies])
+
+    def record_results(self, results):
+        """
+        Ghi kết quả kiểm tra của proxy_checker (list dict từ probe_proxy) trong một transaction:
+        cập nhật trạng thái hiện tại và thêm một dòng lịch sử cho mỗi kết quả.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            for r in results:
+                row = self._conn.execute("SELECT id FROM proxies WHERE proxy = ?", (r["proxy"],)).fetchone()
+                if row is None:
+                    continue
+                checked_at = r.get("checked_at") or now
+                self._conn.execute(
+                    """UPDATE proxies SET status = ?, latency_ms = ?, connect_ms = ?, tls_ms = ?, ttfb_ms = ?,
+                       error = ?, last_checked = ?, check_count = check_count + 1,
+                       fail_count = fail_count + ? WHERE id = ?""",
+                    (STATUS_OK if r["ok"] else STATUS_FAILED, r.get("total_ms"), r.get("connect_ms"),
+                     r.get("tls_ms"), r.get("ttfb_ms"), r.get("error"), checked_at,
+                     0 if r["ok"] else 1, row["id"])
+                )
+                self._conn.execute(
+                    """INSERT INTO probes (proxy_id, checked_at, ok, status_code, connect_ms, tls_ms,
+                       ttfb_ms, total_ms, error, stage) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (row["id"], checked_at, 1 if r["ok"] else 0, r.get("status_code"), r.get("connect_ms"),
+                     r.get("tls_ms"), r.get("ttfb_ms"), r.get("total_ms"), r.get("error"), r.get("stage"))
+                )
+
+    def prune_history(self, keep_per_proxy=100):
+        """Giữ lại keep_per_proxy lần kiểm tra gần nhất của mỗi proxy"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                """DELETE FROM probes WHERE id IN (
+                       SELECT id FROM (
+                           SELECT id, ROW_NUMBER() OVER (PARTITION BY proxy_id ORDER BY checked_at DESC) AS rn
+                           FROM probes
+                       ) WHERE rn > ?
+                   )""",
+                (keep_per_proxy,)
+            )
+
+    # ---------------- ĐỌC ----------------
+    def count(self, status=None):
+        where, params = self._where(status)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM proxies{where}", params).fetchone()[0]
+
+    def page(self, offset=0, limit=500, status=None):
+        """Đọc một trang proxy (theo thứ tự thêm vào), trả về list dict"""
+        where, params = self._where(status)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(PROXY_COLUMNS)} FROM proxies{where} ORDER BY id LIMIT ? OFFSET ?",
+                params + (limit, offset)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def proxies(self, status=None):
+        """Danh sách chuỗi proxy (lọc theo trạng thái nếu có)"""
+        where, params = self._where(status)
+        with self._lock:
+            rows = self._conn.execute(f"SELECT proxy FROM proxies{where} ORDER BY id", params).fetchall()
+        return [row[0] for row in rows]
+
+    def active_proxies(self):
+        return self.proxies(STATUS_OK)
+
+    def stale_proxies(self, older_than):
+        """Proxy chưa kiểm tra hoặc kiểm tra lần cuối trước older_than giây"""
+        cutoff = time.time() - older_than
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT proxy FROM proxies WHERE last_checked IS NULL OR last_checked < ? ORDER BY last_checked",
+                (cutoff,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def history(self, proxy, limit=50):
+        """Lịch sử kiểm tra gần nhất của một proxy"""
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT p.checked_at, p.ok, p.status_code, p.connect_ms, p.tls_ms, p.ttfb_ms,
+                          p.total_ms, p.error, p.stage
+                   FROM probes p JOIN proxies x ON x.id = p.proxy_id
+                   WHERE x.proxy = ? ORDER BY p.checked_at DESC LIMIT ?""",
+                (proxy, limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ---------------- NỘI BỘ ----------------
+    @staticmethod
+    def _where(status):
+        if status is None:
+            return "", ()
+        return " WHERE status = ?", (status,)
+
+    def _migrate_json(self, json_path):
+        """Chuyển dữ liệu từ proxies.json cũ sang SQLite (chỉ khi database còn trống)"""
+        if not os.path.exists(json_path) or self.count() > 0:
+            return
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+        except Exception as e:
+            print(f"Không thể đọc {json_path}: {e}")
+            return
+
+        labels = {label: status for status, label in STATUS_LABELS.items()}
+        now = time.time()
+        rows = []
+        for item in legacy:
+            proxy = item.get("proxy") if isinstance(item, dict) else item
+            if not proxy:
+                continue
+            status = labels.get(item.get("status"), STATUS_UNCHECKED) if isinstance(item, dict) else STATUS_UNCHECKED
+            speed = item.get("speed") if isinstance(item, dict) else None
+            latency = float(speed) if isinstance(speed, (int, float)) else None
+            rows.append((proxy.strip(), status, latency, now))
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO proxies (proxy, status, latency_ms, added_at) VALUES (?, ?, ?, ?)", rows
+            )
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_proxy_store():
+    """Trả về ProxyStore dùng chung cho toàn tiến trình"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ProxyStore()
+        return _store
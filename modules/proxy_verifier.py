@@ -0,0 +1,146 @@
+"""
+Module proxy_verifier.py
+Xác minh proxy theo từng tầng, tầng sau chỉ chạy khi tầng rẻ hơn đã qua:
+  1. "tcp"     - kết nối TCP tới proxy
+  2. "connect" - tunnel HTTP CONNECT/SOCKS tới đích kiểm tra và nhận phản hồi
+  3. "browser" - (tùy chọn) tải trang thật bằng trình duyệt qua proxy
+Kết quả được cache theo TTL để việc xoay proxy trong task chỉ tốn vài mili-giây.
+"""
+
+import time
+import asyncio
+import threading
+
+from .config import PROXY_CHECK_TARGET, PROXY_VERIFY_TTL, PROXY_VERIFY_NEGATIVE_TTL, PROXY_VERIFY_TIMEOUT
+from .proxy_checker import parse_proxy_address, probe_proxy
+
+TIERS = ("tcp", "connect", "browser")
+
+
+class ProxyVerifier:
+    """Xác minh proxy nhiều tầng, cache kết quả theo TTL"""
+
+    def __init__(self, target=PROXY_CHECK_TARGET, timeout=PROXY_VERIFY_TIMEOUT,
+                 ttl=PROXY_VERIFY_TTL, negative_ttl=PROXY_VERIFY_NEGATIVE_TTL):
+        self.target = target
+        self.timeout = timeout
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._cache = {}  # (proxy, tầng yêu cầu) -> (hết hạn lúc, kết quả)
+        self._lock = threading.Lock()
+
+    # ---------------- API ----------------
+    def verify(self, proxy, browser_check=None, use_cache=True):
+        """
+        Xác minh một proxy. browser_check(proxy) -> bool là tầng trình duyệt tùy chọn.
+        Trả về dict {proxy, ok, tier, latency_ms, error, checked_at}; tier là tầng cuối đã chạy.
+        """
+        return self.verify_many([proxy], browser_check, use_cache)[0]
+
+    def verify_many(self, proxies, browser_check=None, use_cache=True):
+        """Xác minh nhiều proxy; tầng TCP/CONNECT chạy đồng thời, tầng trình duyệt chạy tuần tự"""
+        depth = "browser" if browser_check else "connect"
+        results = {}
+        pending = []
+        for proxy in proxies:
+            cached = self._get_cached(proxy, depth) if use_cache else None
+            if cached:
+                results[proxy] = cached
+            elif proxy not in pending:
+                pending.append(proxy)
+
+        if pending:
+            for result in asyncio.run(self._verify_network(pending)):
+                if result["ok"] and browser_check:
+                    result = self._browser_tier(result, browser_check)
+                self._store(result, depth)
+                results[result["proxy"]] = result
+        return [results[p] for p in proxies]
+
+    def is_cached_ok(self, proxy):
+        """True nếu proxy đã được xác minh hoạt động và cache còn hạn (không tốn I/O)"""
+        cached = self._get_cached(proxy, "connect") or self._get_cached(proxy, "browser")
+        return bool(cached and cached["ok"])
+
+    def invalidate(self, proxy=None):
+        """Xóa cache của một proxy (hoặc toàn bộ nếu proxy=None)"""
+        with self._lock:
+            if proxy is None:
+                self._cache.clear()
+            else:
+                for key in [k for k in self._cache if k[0] == proxy]:
+                    del self._cache[key]
+
+    # ---------------- NỘI BỘ ----------------
+    def _get_cached(self, proxy, depth):
+        with self._lock:
+            entry = self._cache.get((proxy, depth))
+            if entry and entry[0] > time.time():
+                return entry[1]
+        return None
+
+    def _store(self, result, depth):
+        ttl = self.ttl if result["ok"] else self.negative_ttl
+        with self._lock:
+            self._cache[(result["proxy"], depth)] = (time.time() + ttl, result)
+            if result["ok"] and depth == "browser":
+                # Đã qua tầng trình duyệt thì chắc chắn qua tầng CONNECT
+                self._cache[(result["proxy"], "connect")] = (time.time() + ttl, result)
+
+    async def _verify_network(self, proxies):
+        return await asyncio.gather(*(self._verify_one(p) for p in proxies))
+
+    async def _verify_one(self, proxy):
+        result = {"proxy": proxy, "ok": False, "tier": "tcp", "latency_ms": None,
+                  "error": None, "checked_at": time.time()}
+
+        # Tầng 1: TCP
+        try:
+            info = parse_proxy_address(proxy)
+            started = time.perf_counter()
+            _reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(info["host"], info["port"]), self.timeout
+            )
+            result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            writer.close()
+        except asyncio.TimeoutError:
+            result["error"] = f"TCP: hết thời gian chờ ({self.timeout}s)"
+            return result
+        except Exception as e:
+            result["error"] = f"TCP: {e}"
+            return result
+
+        # Tầng 2: CONNECT/SOCKS tới đích kiểm tra
+        result["tier"] = "connect"
+        probe = await probe_proxy(proxy, self.target, self.timeout)
+        if not probe["ok"]:
+            result["error"] = f"CONNECT: {probe['error']}"
+            return result
+        result["ok"] = True
+        result["latency_ms"] = probe["total_ms"]
+        return result
+
+    @staticmethod
+    def _browser_tier(result, browser_check):
+        result = dict(result, tier="browser")
+        try:
+            result["ok"] = bool(browser_check(result["proxy"]))
+            if not result["ok"]:
+                result["error"] = "Trình duyệt: không tải được trang qua proxy"
+        except Exception as e:
+            result["ok"] = False
+            result["error"] = f"Trình duyệt: {e}"
+        return result
+
+
+_verifier = None
+_verifier_lock = threading.Lock()
+
+
+def get_proxy_verifier():
+    """Trả về ProxyVerifier dùng chung (cache dùng chung giữa các worker)"""
+    global _verifier
+    with _verifier_lock:
+        if _verifier is None:
+            _verifier = ProxyVerifier()
+        return _verifier
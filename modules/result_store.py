@@ -0,0 +1,212 @@
+"""
+Module result_store.py
+Kho lưu kết quả thu thập (Google/Shopee) bằng SQLite WAL, chỉ ghi thêm:
+  - Mỗi lần chạy task là một dòng trong bảng runs, kết quả được ghi thêm theo từng lô trong một transaction
+  - Bảng results có index theo (task, từ khóa, thời điểm) để truy vấn nhiều tháng dữ liệu mà không nạp hết vào RAM
+  - Đọc theo từng khối (keyset theo id) thành DataFrame cho màn hình phân tích
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+
+import pandas as pd
+
+from .config import DATA_DIR
+
+RESULT_DB_PATH = os.path.join(DATA_DIR, "results.db")
+READ_CHUNK_ROWS = 50000
+
+# Thứ tự các trường trong tuple kết quả mà worker gửi qua result_signal
+TASK_FIELDS = {
+    "google": ("title", "url", "source"),
+    "google_batch": ("title", "url", "source"),
+    "shopee": ("title", "price", "url", "source"),
+}
+
+RESULT_COLUMNS = ("id", "run_id", "task", "keyword", "scraped_at", "position", "title", "url", "price", "source")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    task TEXT NOT NULL,
+    params TEXT,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    row_count INTEGER NOT NULL DEFAULT 0,
+    success INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_runs_task ON runs(task, started_at);
+
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER REFERENCES runs(id),
+    task TEXT NOT NULL,
+    keyword TEXT,
+    scraped_at REAL NOT NULL,
+    position INTEGER,
+    title TEXT,
+    url TEXT,
+    price TEXT,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_results_task_keyword ON results(task, keyword, scraped_at);
+CREATE INDEX IF NOT EXISTS idx_results_scraped_at ON results(scraped_at);
+CREATE INDEX IF NOT EXISTS idx_results_run ON results(run_id);
+"""
+
+
+def _row_values(task, item):
+    """tuple/dict kết quả -> dict theo tên cột (các trường không có để None)"""
+    if isinstance(item, dict):
+        values = dict(item)
+        values.setdefault("title", item.get("name"))
+    else:
+        values = dict(zip(TASK_FIELDS.get(task, ("title", "url", "source")), item))
+    return {name: values.get(name) for name in ("title", "url", "price", "source")}
+
+
+class ResultStore:
+    """Kho kết quả SQLite dùng chung giữa các thread (một kết nối, khóa bằng lock)"""
+
+    def __init__(self, path=RESULT_DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    # ---------------- GHI ----------------
+    def start_run(self, task, params=None):
+        """Tạo một lần chạy mới, trả về run_id"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (task, params, started_at) VALUES (?, ?, ?)",
+                (task, json.dumps(params or {}, ensure_ascii=False, default=str), time.time())
+            )
+            return cursor.lastrowid
+
+    def append(self, run_id, task, keyword, items):
+        """Ghi thêm một lô kết quả (list tuple/dict) trong một transaction, trả về số dòng đã ghi"""
+        now = time.time()
+        rows = []
+        for position, item in enumerate(items, 1):
+            values = _row_values(task, item)
+            rows.append((run_id, task, keyword, now, position,
+                         values["title"], values["url"], values["price"], values["source"]))
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """INSERT INTO results (run_id, task, keyword, scraped_at, position, title, url, price, source)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""", rows
+            )
+            if run_id is not None:
+                self._conn.execute("UPDATE runs SET row_count = row_count + ? WHERE id = ?", (len(rows), run_id))
+        return len(rows)
+
+    def finish_run(self, run_id, success=True):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE runs SET finished_at = ?, success = ? WHERE id = ?",
+                               (time.time(), int(bool(success)), run_id))
+
+    # ---------------- ĐỌC ----------------
+    @staticmethod
+    def _where(task=None, keyword=None, since=None, until=None, run_id=None):
+        clauses = []
+        params = []
+        if task:
+            clauses.append("task = ?")
+            params.append(task)
+        if keyword:
+            clauses.append("keyword = ?")
+            params.append(keyword)
+        if since is not None:
+            clauses.append("scraped_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("scraped_at < ?")
+            params.append(until)
+        if run_id is not None:
+            clauses.append("run_id = ?")
+            params.append(run_id)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def count(self, **filters):
+        where, params = self._where(**filters)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM results{where}", params).fetchone()[0]
+
+    def query(self, limit=1000, offset=0, **filters):
+        """Danh sách dict kết quả mới nhất trước (task, keyword, since, until, run_id)"""
+        where, params = self._where(**filters)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(RESULT_COLUMNS)} FROM results{where} ORDER BY id DESC LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def keywords(self, task=None, limit=500):
+        """Các từ khóa đã lưu (mới nhất trước)"""
+        where, params = self._where(task=task)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT keyword, MAX(scraped_at) AS last FROM results{where} "
+                f"GROUP BY keyword ORDER BY last DESC LIMIT ?", params + [limit]
+            ).fetchall()
+        return [row["keyword"] for row in rows if row["keyword"]]
+
+    def runs(self, task=None, limit=100):
+        where, params = self._where(task=task)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM runs{where} ORDER BY started_at DESC LIMIT ?", params + [limit]
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def iter_frames(self, chunk_rows=READ_CHUNK_ROWS, **filters):
+        """
+        Sinh (DataFrame, tỉ lệ đã đọc 0-1) theo từng khối, đọc bằng keyset theo id
+        (không dùng OFFSET nên khối sau không chậm dần). Dùng được làm nguồn cho DataImportWorker.
+        """
+        total = max(1, self.count(**filters))
+        where, params = self._where(**filters)
+        where = f"{where} AND id > ?" if where else " WHERE id > ?"
+        last_id = 0
+        done = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT {', '.join(RESULT_COLUMNS)} FROM results{where} ORDER BY id LIMIT ?",
+                    params + [last_id, chunk_rows]
+                ).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1]["id"]
+            done += len(rows)
+            df = pd.DataFrame.from_records([tuple(row) for row in rows], columns=RESULT_COLUMNS)
+            df["scraped_at"] = pd.to_datetime(df["scraped_at"], unit="s")
+            yield df.drop(columns=["id"]), min(1.0, done / total)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_result_store():
+    """Trả về ResultStore dùng chung"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ResultStore()
+        return _store
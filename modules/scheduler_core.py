@@ -0,0 +1,113 @@
+"""
+Module scheduler_core.py
+Lõi lập lịch dùng min-heap theo thời điểm chạy kế tiếp (đã parse sẵn thành datetime):
+  - Chỉ cần một timer cho deadline sớm nhất, không phải quét toàn bộ task mỗi phút
+  - Lấy task đến hạn là O(log n) mỗi task, hủy/đổi lịch dùng đánh dấu lười (lazy invalidation)
+"""
+
+import heapq
+import itertools
+import datetime
+
+# Các định dạng run_time đã từng được lưu trong scheduled_tasks.json
+RUN_TIME_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M")
+
+# Ngủ tối đa trước khi kiểm tra lại (phòng khi đồng hồ hệ thống bị chỉnh hoặc máy ngủ)
+MAX_SLEEP_SECONDS = 3600
+
+
+def parse_run_time(value):
+    """Chuyển run_time dạng chuỗi sang datetime (None nếu không hợp lệ)"""
+    if isinstance(value, datetime.datetime):
+        return value
+    if not value:
+        return None
+    value = str(value).strip()
+    for fmt in RUN_TIME_FORMATS:
+        try:
+            return datetime.datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def format_run_time(dt):
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def add_months(dt, months=1):
+    """Cộng tháng, giữ nguyên ngày nếu được (ngày 31 -> ngày cuối tháng sau)"""
+    month_index = dt.month - 1 + months
+    year = dt.year + month_index // 12
+    month = month_index % 12 + 1
+    if month == 12:
+        last_day = 31
+    else:
+        last_day = (datetime.date(year, month + 1, 1) - datetime.timedelta(days=1)).day
+    return dt.replace(year=year, month=month, day=min(dt.day, last_day))
+
+
+class TaskHeap:
+    """Min-heap (thời điểm chạy, thứ tự, task_id); mỗi task chỉ có một mục còn hiệu lực"""
+
+    def __init__(self):
+        self._heap = []
+        self._entries = {}  # task_id -> mục hiện hành [when, seq, task_id, valid]
+        self._counter = itertools.count()
+
+    def schedule(self, task_id, when):
+        """Đặt (hoặc đổi) thời điểm chạy của task"""
+        self.cancel(task_id)
+        entry = [when, next(self._counter), task_id, True]
+        self._entries[task_id] = entry
+        heapq.heappush(self._heap, entry)
+
+    def cancel(self, task_id):
+        entry = self._entries.pop(task_id, None)
+        if entry is not None:
+            entry[3] = False
+
+    def clear(self):
+        self._heap = []
+        self._entries = {}
+
+    def when(self, task_id):
+        entry = self._entries.get(task_id)
+        return entry[0] if entry else None
+
+    def peek(self):
+        """(thời điểm, task_id) của task sớm nhất, None nếu heap rỗng"""
+        while self._heap and not self._heap[0][3]:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return None
+        return self._heap[0][0], self._heap[0][2]
+
+    def pop_due(self, now):
+        """Lấy ra các task đã đến hạn (theo thứ tự thời điểm chạy)"""
+        due = []
+        while True:
+            head = self.peek()
+            if head is None or head[0] > now:
+                break
+            entry = heapq.heappop(self._heap)
+            del self._entries[entry[2]]
+            due.append((entry[0], entry[2]))
+        # Dọn mục đã hủy khi heap phình to (tránh rò rỉ khi đổi lịch nhiều lần)
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [e for e in self._heap if e[3]]
+            heapq.heapify(self._heap)
+        return due
+
+    def seconds_until_next(self, now):
+        """Số giây tới deadline sớm nhất (giới hạn MAX_SLEEP_SECONDS), None nếu không có task"""
+        head = self.peek()
+        if head is None:
+            return None
+        return min(MAX_SLEEP_SECONDS, max(0.0, (head[0] - now).total_seconds()))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, task_id):
+        return task_id in self._entries
@@ -0,0 +1,256 @@
+"""
+Module schedules.py
+Mô hình lịch chạy của task, biên dịch một lần và tính sẵn thời điểm chạy kế tiếp:
+  - "once"     : chạy một lần tại run_time
+  - "interval" : mỗi N giây, neo theo run_time (bỏ qua các lần đã lỡ bằng phép chia, không lặp)
+  - "cron"     : biểu thức cron 5 trường (phút giờ ngày tháng thứ), hỗ trợ */n, a-b, danh sách, tên tháng/thứ
+  - Lịch cũ: repeat_interval "Hàng ngày"/"Hàng tuần"/"Hàng tháng" và recurring "daily"/"weekly"/...
+Tùy chọn chung: "timezone" (tên IANA, vd Asia/Ho_Chi_Minh) và "jitter" (giây, dời ngẫu nhiên lần chạy).
+
+Cấu trúc trong task:
+    "schedule": {"type": "cron", "cron": "*/15 8-18 * * mon-fri", "timezone": "Asia/Ho_Chi_Minh", "jitter": 30}
+    "schedule": {"type": "interval", "every": 300}
+"""
+
+import random
+import datetime
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+
+from .scheduler_core import add_months
+
+
+class ScheduleError(ValueError):
+    """Lịch chạy không hợp lệ (biểu thức cron sai, khoảng thời gian <= 0, múi giờ không tồn tại)"""
+
+
+CRON_ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+}
+
+MONTH_NAMES = {name: i + 1 for i, name in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"])}
+DAY_NAMES = {name: i for i, name in enumerate(["sun", "mon", "tue", "wed", "thu", "fri", "sat"])}
+
+# Lịch lặp cũ -> (loại, số giây) ; "monthly" tính theo tháng dương lịch
+LEGACY_REPEAT = {
+    "Hàng giờ": "hourly",
+    "Hàng ngày": "daily",
+    "Hàng tuần": "weekly",
+    "Hàng tháng": "monthly",
+}
+RECURRING_SECONDS = {"hourly": 3600, "daily": 86400, "weekly": 7 * 86400}
+
+
+def _get_zone(name):
+    if not name:
+        return None
+    if ZoneInfo is None:
+        raise ScheduleError("Cần Python 3.9+ (zoneinfo) để dùng múi giờ")
+    try:
+        return ZoneInfo(name)
+    except Exception:
+        raise ScheduleError(f"Múi giờ không hợp lệ: {name}")
+
+
+def _to_zone(local_dt, zone):
+    """datetime giờ máy (naive) -> giờ tường tại zone (naive)"""
+    return local_dt.astimezone(zone).replace(tzinfo=None) if zone else local_dt
+
+
+def _from_zone(zone_dt, zone):
+    """Giờ tường tại zone (naive) -> datetime giờ máy (naive)"""
+    if not zone:
+        return zone_dt
+    return zone_dt.replace(tzinfo=zone).astimezone().replace(tzinfo=None)
+
+
+class CronExpression:
+    """Biểu thức cron 5 trường, các trường được biên dịch thành tập giá trị hợp lệ"""
+
+    def __init__(self, expr):
+        self.expr = expr.strip()
+        fields = CRON_ALIASES.get(self.expr.lower(), self.expr).split()
+        if len(fields) != 5:
+            raise ScheduleError(f"Biểu thức cron cần 5 trường: {expr}")
+        self.minutes = self._parse(fields[0], 0, 59)
+        self.hours = self._parse(fields[1], 0, 23)
+        self.days = self._parse(fields[2], 1, 31)
+        self.months = self._parse(fields[3], 1, 12, MONTH_NAMES)
+        weekdays = self._parse(fields[4], 0, 7, DAY_NAMES)
+        self.weekdays = {d % 7 for d in weekdays}  # 7 cũng là Chủ nhật
+        # Theo chuẩn cron: khi cả ngày-trong-tháng và thứ đều bị giới hạn thì khớp một trong hai
+        self.day_any = fields[2] == "*"
+        self.weekday_any = fields[4] == "*"
+        self._sorted_minutes = sorted(self.minutes)
+        self._sorted_hours = sorted(self.hours)
+
+    @staticmethod
+    def _parse(field, low, high, names=None):
+        values = set()
+        for part in field.lower().split(","):
+            step = 1
+            if "/" in part:
+                part, step_text = part.split("/", 1)
+                if not step_text.isdigit() or int(step_text) <= 0:
+                    raise ScheduleError(f"Bước cron không hợp lệ: {field}")
+                step = int(step_text)
+            if part in ("*", ""):
+                start, end = low, high
+            elif "-" in part:
+                start_text, end_text = part.split("-", 1)
+                start = CronExpression._value(start_text, names)
+                end = CronExpression._value(end_text, names)
+            else:
+                start = CronExpression._value(part, names)
+                end = high if step > 1 else start
+            if not (low <= start <= high and low <= end <= high) or start > end:
+                raise ScheduleError(f"Giá trị cron ngoài khoảng {low}-{high}: {field}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    @staticmethod
+    def _value(text, names):
+        if names and text in names:
+            return names[text]
+        if not text.isdigit():
+            raise ScheduleError(f"Giá trị cron không hợp lệ: {text}")
+        return int(text)
+
+    def _day_matches(self, dt):
+        weekday = (dt.weekday() + 1) % 7  # cron: 0 = Chủ nhật
+        day_ok = dt.day in self.days
+        weekday_ok = weekday in self.weekdays
+        if self.day_any or self.weekday_any:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, dt):
+        """Thời điểm khớp đầu tiên sau dt (cùng hệ giờ với dt), nhảy theo tháng/ngày/giờ thay vì từng phút"""
+        t = dt.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        limit = dt.year + 5
+        while t.year <= limit:
+            if t.month not in self.months:
+                t = add_months(t.replace(day=1, hour=0, minute=0), 1)
+                continue
+            if not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + datetime.timedelta(days=1)
+                continue
+            if t.hour not in self.hours:
+                next_hour = next((h for h in self._sorted_hours if h > t.hour), None)
+                if next_hour is None:
+                    t = t.replace(hour=0, minute=0) + datetime.timedelta(days=1)
+                else:
+                    t = t.replace(hour=next_hour, minute=0)
+                continue
+            next_minute = next((m for m in self._sorted_minutes if m >= t.minute), None)
+            if next_minute is None:
+                t = t.replace(minute=0) + datetime.timedelta(hours=1)
+                continue
+            return t.replace(minute=next_minute)
+        raise ScheduleError(f"Biểu thức cron không có thời điểm chạy: {self.expr}")
+
+
+class Schedule:
+    """Lịch chạy đã biên dịch của một task"""
+
+    def __init__(self, kind="once", every=None, cron=None, timezone=None, jitter=0):
+        self.kind = kind
+        self.every = every
+        self.cron = CronExpression(cron) if cron else None
+        self.zone = _get_zone(timezone)
+        self.timezone = timezone
+        self.jitter = max(0, int(jitter or 0))
+        if kind == "interval" and (not every or every <= 0):
+            raise ScheduleError("Khoảng lặp phải lớn hơn 0 giây")
+        if kind == "cron" and self.cron is None:
+            raise ScheduleError("Thiếu biểu thức cron")
+
+    @property
+    def repeating(self):
+        return self.kind != "once"
+
+    def first_run(self, now):
+        """Thời điểm chạy đầu tiên khi task chưa có run_time hợp lệ"""
+        if self.kind == "cron":
+            return self.next_after(now, now)
+        return now
+
+    def next_after(self, base, now):
+        """
+        Thời điểm chạy (giờ máy) kế tiếp, luôn > now (các lần đã lỡ được bỏ qua, không chạy dồn).
+        base là mốc neo của lịch (run_time ban đầu của task, xem anchor_time), không phải lần chạy vừa rồi.
+        None nếu lịch không lặp.
+        """
+        if self.kind == "once":
+            return None
+        if self.kind == "interval":
+            step = datetime.timedelta(seconds=self.every)
+            missed = max(0, int((now - base) // step))
+            candidate = base + step * (missed + 1)
+            return candidate if candidate > now else candidate + step
+        if self.kind == "monthly":
+            # Cộng tháng từ mốc neo (không phải từ lần chạy trước) để ngày 31 không bị trôi thành ngày 28 sau tháng 2
+            months = max(1, (now.year - base.year) * 12 + now.month - base.month)
+            candidate = add_months(base, months)
+            while candidate <= now:
+                months += 1
+                candidate = add_months(base, months)
+            return candidate
+        # cron: tính theo giờ tường của múi giờ đã chọn
+        start = _to_zone(max(base, now), self.zone)
+        return _from_zone(self.cron.next_after(start), self.zone)
+
+    def fire_time(self, base):
+        """Thời điểm thực sự kích hoạt: base cộng độ trễ ngẫu nhiên trong cửa sổ jitter"""
+        if not self.jitter:
+            return base
+        return base + datetime.timedelta(seconds=random.uniform(0, self.jitter))
+
+    def describe(self):
+        """Mô tả ngắn để hiển thị trên danh sách task"""
+        if self.kind == "interval":
+            text = f"mỗi {self.every}s"
+        elif self.kind == "cron":
+            text = f"cron {self.cron.expr}"
+        elif self.kind == "monthly":
+            text = "hàng tháng"
+        else:
+            return "một lần"
+        if self.timezone:
+            text += f" ({self.timezone})"
+        if self.jitter:
+            text += f" ±{self.jitter}s"
+        return text
+
+    # ---------------- TẠO TỪ TASK ----------------
+    @classmethod
+    def from_task(cls, task):
+        """Tạo Schedule từ dict task (hỗ trợ cả các trường lịch cũ)"""
+        spec = task.get("schedule") or {}
+        options = {"timezone": spec.get("timezone"), "jitter": spec.get("jitter", 0)}
+        kind = spec.get("type")
+        if kind == "cron":
+            return cls("cron", cron=spec.get("cron"), **options)
+        if kind == "interval":
+            return cls("interval", every=float(spec.get("every") or 0), **options)
+
+        recurring = None
+        if task.get("repeat"):
+            recurring = LEGACY_REPEAT.get(task.get("repeat_interval"))
+        elif task.get("recurring"):
+            recurring = task.get("recurring")
+        if recurring == "monthly":
+            return cls("monthly", **options)
+        if recurring in RECURRING_SECONDS:
+            return cls("interval", every=RECURRING_SECONDS[recurring], **options)
+        return cls("once", **options)
@@ -0,0 +1,225 @@
+"""
+Module script_host.py
+Tiến trình con chạy script người dùng (ScriptRunnerPool khởi động sẵn nhiều tiến trình này):
+  - Import Selenium một lần khi khởi động, có thể giữ sẵn một driver dùng lại giữa các script
+  - Nhận lệnh qua stdin và gửi log/tiến độ/kết quả qua stdout, mỗi dòng một JSON
+File này chạy độc lập bằng đường dẫn (không import package modules để tránh nạp giao diện PyQt).
+
+Lệnh nhận:
+    {"type": "init", "driver": {...cấu hình driver...}, "warm": true}
+    {"type": "run", "job_id": "...", "script": "scripts/aaa.py", "params": {...}, "driver": {...}}
+    {"type": "shutdown"}
+Thông điệp gửi:
+    {"type": "ready", "pid": ..., "selenium": "4.18.1"}
+    {"type": "log", "job_id": "...", "message": "..."}
+    {"type": "progress", "job_id": "...", "value": 50}
+    {"type": "result", "job_id": "...", "ok": true, "result": ..., "error": null, "duration": 1.2}
+"""
+
+import os
+import sys
+import json
+import time
+import inspect
+import threading
+import traceback
+import importlib.util
+
+_protocol_out = sys.stdout
+_write_lock = threading.Lock()
+_current_job = None
+_driver = None
+_driver_config = {}
+
+
+def send(message):
+    """Gửi một thông điệp JSON về tiến trình cha"""
+    line = json.dumps(message, ensure_ascii=False, default=str)
+    with _write_lock:
+        _protocol_out.write(line + "\n")
+        _protocol_out.flush()
+
+
+def log(message):
+    send({"type": "log", "job_id": _current_job, "message": str(message)})
+
+
+def report_progress(value):
+    send({"type": "progress", "job_id": _current_job, "value": int(value)})
+
+
+class _LogStream:
+    """Thay cho sys.stdout: mỗi dòng print() của script thành một thông điệp log"""
+
+    def __init__(self):
+        self._buffer = ""
+
+    def write(self, text):
+        self._buffer += text
+        while "\n" in self._buffer:
+            line, self._buffer = self._buffer.split("\n", 1)
+            if line.strip():
+                log(line)
+        return len(text)
+
+    def flush(self):
+        if self._buffer.strip():
+            log(self._buffer)
+        self._buffer = ""
+
+
+# ---------------- DRIVER ----------------
+def build_driver(config):
+    """Khởi động driver Brave/Chrome theo cấu hình nhận từ tiến trình cha"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+
+    options = Options()
+    chrome_path = config.get("chrome_path")
+    if chrome_path and os.path.exists(chrome_path):
+        options.binary_location = chrome_path
+    profile_path = config.get("profile_path")
+    if profile_path:
+        options.add_argument(f'--user-data-dir={os.path.dirname(profile_path)}')
+        options.add_argument(f'--profile-directory={os.path.basename(profile_path)}')
+    if config.get("headless"):
+        options.add_argument('--headless=new')
+        options.add_argument('--window-size=1920,1080')
+    if config.get("proxy"):
+        options.add_argument(f'--proxy-server={config["proxy"]}')
+    for argument in ('--disable-gpu', '--no-sandbox', '--disable-dev-shm-usage',
+                     '--disable-notifications', '--disable-infobars'):
+        options.add_argument(argument)
+
+    driver_path = config.get("driver_path")
+    service = Service(executable_path=driver_path) if driver_path else Service()
+    driver = webdriver.Chrome(service=service, options=options)
+    driver.set_page_load_timeout(config.get("page_load_timeout", 60))
+    return driver
+
+
+def get_driver():
+    """Driver dùng chung của tiến trình (tạo lại nếu driver cũ đã chết)"""
+    global _driver
+    if _driver is not None:
+        try:
+            _driver.current_url
+            return _driver
+        except Exception:
+            quit_driver()
+    _driver = build_driver(_driver_config)
+    return _driver
+
+
+def quit_driver():
+    global _driver
+    if _driver is not None:
+        try:
+            _driver.quit()
+        except Exception:
+            pass
+        _driver = None
+
+
+# ---------------- CHẠY SCRIPT ----------------
+def _json_safe(value):
+    try:
+        json.dumps(value, default=str)
+        return value
+    except Exception:
+        return repr(value)
+
+
+def use_driver_config(config):
+    """Đổi cấu hình driver; driver đang mở theo cấu hình cũ (proxy, profile khác) bị đóng"""
+    global _driver_config
+    config = config or {}
+    if config != _driver_config:
+        quit_driver()
+        _driver_config = config
+
+
+def run_job(message):
+    global _current_job
+    _current_job = message.get("job_id")
+    if message.get("driver") is not None:
+        use_driver_config(message["driver"])
+    started = time.time()
+    ok = False
+    result = None
+    error = None
+    try:
+        script = message["script"]
+        spec = importlib.util.spec_from_file_location(f"user_script_{_current_job}", script)
+        module = importlib.util.module_from_spec(spec)
+        # Script có thể gọi log()/report_progress() để gửi thông tin về giao diện
+        module.log = log
+        module.report_progress = report_progress
+        spec.loader.exec_module(module)
+        if not hasattr(module, "run"):
+            raise RuntimeError(f"Script {script} không có hàm run()")
+
+        params = dict(message.get("params") or {})
+        signature = inspect.signature(module.run)
+        names = list(signature.parameters)
+        if names and names[0] == "main_window" and signature.parameters["main_window"].default is inspect.Parameter.empty:
+            # main_window có giá trị mặc định (vd run(main_window=None)) thì script vẫn chạy được không cần giao diện
+            raise RuntimeError("Script cần main_window (giao diện), không chạy được trong tiến trình riêng")
+        kwargs = {k: v for k, v in params.items() if k in signature.parameters and k != "main_window"}
+        if names and names[0] == "driver" and "driver" not in kwargs:
+            result = module.run(get_driver(), **kwargs)
+        else:
+            result = module.run(**kwargs)
+        ok = result is not False
+    except Exception as e:
+        error = f"{e.__class__.__name__}: {e}"
+        log(traceback.format_exc())
+    finally:
+        sys.stdout.flush()
+        if _driver is not None:
+            try:
+                _driver.get("about:blank")
+            except Exception:
+                quit_driver()
+    send({"type": "result", "job_id": _current_job, "ok": ok, "result": _json_safe(result),
+          "error": error, "duration": round(time.time() - started, 2)})
+    _current_job = None
+
+
+def main():
+    sys.stdout = _LogStream()
+    try:
+        import selenium
+        version = selenium.__version__
+    except ImportError:
+        version = None
+    send({"type": "ready", "pid": os.getpid(), "selenium": version})
+
+    try:
+        for line in sys.stdin:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            kind = message.get("type")
+            if kind == "init":
+                use_driver_config(message.get("driver"))
+                if message.get("warm"):
+                    try:
+                        get_driver()
+                    except Exception as e:
+                        log(f"Không thể khởi động driver sẵn: {e}")
+            elif kind == "run":
+                run_job(message)
+            elif kind == "shutdown":
+                break
+    finally:
+        quit_driver()
+
+
+if __name__ == "__main__":
+    main()
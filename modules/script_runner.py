@@ -0,0 +1,339 @@
+"""
+Module script_runner.py
+Chạy script người dùng trong các tiến trình con khởi động sẵn (script_host.py):
+  - Script treo hoặc lỗi không làm treo giao diện, nhiều script chạy song song trên nhiều nhân CPU
+  - Log, tiến độ và kết quả được gửi về theo từng dòng JSON qua pipe
+  - Giới hạn thời gian chạy và bộ nhớ cho từng script; vượt giới hạn (hoặc bị hủy) thì tiến trình bị hủy và khởi động lại
+  - Cấu hình driver (proxy, profile...) đi kèm từng lần chạy, không dùng chung cho cả pool
+"""
+
+import os
+import sys
+import json
+import uuid
+import time
+import queue
+import atexit
+import threading
+import subprocess
+
+import psutil
+
+from .config import (
+    BASE_DIR, SCRIPT_RUNNER_WORKERS, SCRIPT_RUNNER_TIMEOUT,
+    SCRIPT_RUNNER_MEMORY_MB, SCRIPT_RUNNER_WARM_DRIVER
+)
+
+HOST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "script_host.py")
+READY_TIMEOUT = 60  # Thời gian chờ tiến trình con import Selenium xong
+
+
+class ScriptRun:
+    """Một lần chạy script; wait() chờ kết quả, on_event(dict) nhận log/tiến độ theo thời gian thực"""
+
+    def __init__(self, script_path, params=None, timeout=SCRIPT_RUNNER_TIMEOUT,
+                 memory_mb=SCRIPT_RUNNER_MEMORY_MB, on_event=None, driver_config=None):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.script_path = os.path.abspath(script_path)
+        self.params = params or {}
+        self.driver_config = driver_config or {}
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self.on_event = on_event
+        self.ok = False
+        self.result = None
+        self.error = None
+        self.duration = None
+        self.logs = []
+        self.worker_pid = None
+        self._done = threading.Event()
+        self._cancelled = threading.Event()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Hủy script: chưa chạy thì bỏ qua, đang chạy thì tiến trình con bị hủy"""
+        self._cancelled.set()
+
+    def wait(self, timeout=None):
+        """Chờ script chạy xong, trả về True nếu thành công"""
+        self._done.wait(timeout)
+        return self.ok
+
+    def _emit(self, event):
+        if event.get("type") == "log":
+            self.logs.append(event.get("message", ""))
+        if self.on_event:
+            try:
+                self.on_event(event)
+            except Exception as e:
+                print(f"Lỗi trong on_event của script runner: {e}")
+
+    def _finish(self, ok, result=None, error=None, duration=None):
+        self.ok = ok
+        self.result = result
+        self.error = error
+        self.duration = duration
+        self._emit({"type": "result", "job_id": self.job_id, "ok": ok, "result": result,
+                    "error": error, "duration": duration})
+        self._done.set()
+
+
+class _HostProcess:
+    """Một tiến trình script_host và thread giám sát của nó"""
+
+    def __init__(self, pool, index):
+        self.pool = pool
+        self.index = index
+        self.proc = None
+        self.events = None
+        self.config_version = None
+        self.thread = threading.Thread(target=self._supervise, name=f"script-host-{index}", daemon=True)
+
+    # ---------------- TIẾN TRÌNH ----------------
+    def start(self):
+        self.events = queue.Queue()
+        self.config_version = None
+        self.proc = subprocess.Popen(
+            [sys.executable, "-u", HOST_PATH],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=None,
+            cwd=BASE_DIR, text=True, encoding="utf-8", bufsize=1
+        )
+        threading.Thread(target=self._read_stdout, args=(self.proc, self.events), daemon=True).start()
+
+    def _read_stdout(self, proc, events):
+        for line in proc.stdout:
+            try:
+                events.put(json.loads(line))
+            except ValueError:
+                events.put({"type": "log", "message": line.rstrip()})
+        events.put({"type": "exit", "code": proc.wait()})
+
+    def alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def send(self, message):
+        self.proc.stdin.write(json.dumps(message, ensure_ascii=False) + "\n")
+        self.proc.stdin.flush()
+
+    def memory_mb(self):
+        """RSS của tiến trình con và các tiến trình cháu (chromedriver, trình duyệt)"""
+        try:
+            process = psutil.Process(self.proc.pid)
+            total = process.memory_info().rss
+            for child in process.children(recursive=True):
+                try:
+                    total += child.memory_info().rss
+                except psutil.Error:
+                    pass
+            return total / (1024 * 1024)
+        except psutil.Error:
+            return 0.0
+
+    def kill(self):
+        """Hủy tiến trình con cùng toàn bộ tiến trình cháu (trình duyệt bị treo)"""
+        if self.proc is None:
+            return
+        try:
+            process = psutil.Process(self.proc.pid)
+            for child in process.children(recursive=True):
+                try:
+                    child.kill()
+                except psutil.Error:
+                    pass
+        except psutil.Error:
+            pass
+        try:
+            self.proc.kill()
+            self.proc.wait(5)
+        except Exception:
+            pass
+
+    def stop(self):
+        if self.alive():
+            try:
+                self.send({"type": "shutdown"})
+                self.proc.wait(10)
+            except Exception:
+                self.kill()
+
+    def _ensure_ready(self):
+        """Khởi động (lại) tiến trình nếu cần và gửi cấu hình driver mới nhất"""
+        if not self.alive():
+            self.start()
+            deadline = time.time() + READY_TIMEOUT
+            while True:
+                try:
+                    event = self.events.get(timeout=max(0.1, deadline - time.time()))
+                except queue.Empty:
+                    raise RuntimeError("Tiến trình script không phản hồi khi khởi động")
+                if event.get("type") == "ready":
+                    break
+                if event.get("type") == "exit":
+                    raise RuntimeError(f"Tiến trình script thoát khi khởi động (mã {event.get('code')})")
+        version, config, warm = self.pool.driver_settings()
+        if self.config_version != version:
+            self.send({"type": "init", "driver": config, "warm": warm})
+            self.config_version = version
+
+    # ---------------- GIÁM SÁT ----------------
+    def _supervise(self):
+        try:
+            self._ensure_ready()
+        except Exception as e:
+            print(f"Không thể khởi động script host {self.index}: {e}")
+        while True:
+            run = self.pool._jobs.get()
+            if run is None:
+                break
+            self._execute(run)
+        self.stop()
+
+    def _execute(self, run):
+        if run.cancelled:
+            run._finish(False, error="Script đã bị hủy trước khi chạy")
+            return
+        try:
+            self._ensure_ready()
+            run.worker_pid = self.proc.pid
+            self.send({"type": "run", "job_id": run.job_id, "script": run.script_path, "params": run.params,
+                       "driver": run.driver_config})
+        except Exception as e:
+            self.kill()
+            run._finish(False, error=f"Không gửi được script tới tiến trình con: {e}")
+            return
+
+        started = time.time()
+        next_memory_check = started
+        while True:
+            try:
+                event = self.events.get(timeout=0.5)
+            except queue.Empty:
+                event = None
+
+            if event is not None:
+                kind = event.get("type")
+                if kind == "result" and event.get("job_id") == run.job_id:
+                    run._finish(event.get("ok", False), event.get("result"), event.get("error"), event.get("duration"))
+                    return
+                if kind == "exit":
+                    run._finish(False, error=f"Tiến trình script thoát bất thường (mã {event.get('code')})",
+                                duration=round(time.time() - started, 2))
+                    return
+                if kind in ("log", "progress"):
+                    run._emit(event)
+
+            now = time.time()
+            if run.cancelled:
+                self.kill()
+                run._finish(False, error="Script đã bị hủy", duration=round(now - started, 2))
+                return
+            if run.timeout and now - started > run.timeout:
+                self.kill()
+                run._finish(False, error=f"Vượt quá thời gian chạy cho phép ({run.timeout}s)",
+                            duration=round(now - started, 2))
+                return
+            if run.memory_mb and now >= next_memory_check:
+                next_memory_check = now + 2
+                used = self.memory_mb()
+                if used > run.memory_mb:
+                    self.kill()
+                    run._finish(False, error=f"Vượt quá giới hạn bộ nhớ ({used:.0f}MB > {run.memory_mb}MB)",
+                                duration=round(now - started, 2))
+                    return
+
+
+class ScriptRunnerPool:
+    """Pool tiến trình chạy script; submit() trả về ScriptRun ngay, run() chờ kết quả"""
+
+    def __init__(self, size=SCRIPT_RUNNER_WORKERS, driver_config=None, warm_driver=SCRIPT_RUNNER_WARM_DRIVER):
+        self.size = max(1, size)
+        self._jobs = queue.Queue()
+        self._lock = threading.Lock()
+        self._config_version = 0
+        self._driver_config = {}
+        self._warm_driver = warm_driver
+        self._closed = False
+        self.configure(driver_config or {})
+        self._hosts = [_HostProcess(self, i) for i in range(self.size)]
+        for host in self._hosts:
+            host.thread.start()
+
+    def _host_config(self, driver_config):
+        config = dict(driver_config or {})
+        if self.size > 1:
+            # Một user-data-dir chỉ mở được bởi một trình duyệt: các tiến trình song song dùng profile tạm
+            config.pop("profile_path", None)
+        return config
+
+    def configure(self, driver_config, warm_driver=None):
+        """
+        Cập nhật cấu hình driver mặc định (driver khởi động sẵn và các lần chạy không kèm cấu hình).
+        Lần chạy có cấu hình riêng thì dùng cấu hình đó, không phụ thuộc giá trị ở đây.
+        """
+        config = self._host_config(driver_config)
+        with self._lock:
+            if warm_driver is not None:
+                self._warm_driver = warm_driver
+            if config != self._driver_config:
+                self._driver_config = config
+                self._config_version += 1
+
+    def driver_settings(self):
+        with self._lock:
+            return self._config_version, dict(self._driver_config), self._warm_driver
+
+    def submit(self, script_path, params=None, timeout=SCRIPT_RUNNER_TIMEOUT,
+               memory_mb=SCRIPT_RUNNER_MEMORY_MB, on_event=None, driver_config=None):
+        if self._closed:
+            raise RuntimeError("Script runner đã đóng")
+        if not os.path.exists(script_path):
+            raise FileNotFoundError(f"Không tìm thấy script: {script_path}")
+        if driver_config is None:
+            driver_config = self.driver_settings()[1]
+        run = ScriptRun(script_path, params, timeout, memory_mb, on_event, self._host_config(driver_config))
+        self._jobs.put(run)
+        return run
+
+    def run(self, script_path, params=None, **kwargs):
+        """Chạy script và chờ kết quả (gọi từ thread nền, không gọi từ thread giao diện)"""
+        run = self.submit(script_path, params, **kwargs)
+        run.wait()
+        return run
+
+    def pending(self):
+        return self._jobs.qsize()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._hosts:
+            self._jobs.put(None)
+        for host in self._hosts:
+            host.thread.join(timeout=15)
+            if host.alive():
+                host.kill()
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_script_runner_pool(driver_config=None):
+    """
+    Trả về ScriptRunnerPool dùng chung. driver_config chỉ là cấu hình mặc định khi tạo pool;
+    cấu hình của từng lần chạy truyền qua submit()/run(driver_config=...).
+    """
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = ScriptRunnerPool(driver_config=driver_config)
+            atexit.register(_runner.close)
+        return _runner
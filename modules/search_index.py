@@ -0,0 +1,78 @@
+"""
+Module search_index.py
+Chỉ mục tìm kiếm cho DataFrame, dựng một lần khi nạp dữ liệu:
+  - Mỗi cột được mã hóa (factorize) thành mã số + danh sách giá trị khác nhau đã chuyển chữ thường
+  - Tìm kiếm chỉ quét các giá trị khác nhau rồi ánh xạ ngược ra mask theo mã (không astype(str) lại cả cột)
+  - Gõ thêm ký tự: chỉ quét lại các giá trị đã khớp với từ khóa trước (kết quả luôn là tập con)
+"""
+
+import numpy as np
+import pandas as pd
+
+# Giới hạn bộ nhớ cho mảng chuỗi độ dài cố định (np.char quét bằng C, nhanh hơn vòng lặp Python nhiều lần)
+MAX_FIXED_WIDTH_BYTES = 256 * 1024 * 1024
+
+
+class _ColumnIndex:
+    """Chỉ mục của một cột: codes (mã của từng dòng, -1 = trống) và values (giá trị khác nhau, chữ thường)"""
+
+    def __init__(self, series):
+        codes, uniques = pd.factorize(series, sort=False)
+        self.codes = codes
+        lowered = [str(v).lower() for v in uniques]
+        width = max(max(map(len, lowered), default=0), 1)
+        if width * len(lowered) * 4 <= MAX_FIXED_WIDTH_BYTES:
+            self.values = np.array(lowered, dtype=f"<U{width}")
+        else:
+            # Cột văn bản dài: giữ object để không cấp phát quá nhiều bộ nhớ
+            self.values = np.array(lowered, dtype=object)
+        self._last_query = None
+        self._last_matches = None  # Vị trí trong values khớp với _last_query
+
+    def matching_values(self, query):
+        """Vị trí các giá trị khác nhau chứa query"""
+        if self._last_query and self._last_query in query:
+            candidates = self._last_matches
+        else:
+            candidates = np.arange(len(self.values))
+        if self.values.dtype.kind == "U":
+            found = np.char.find(self.values[candidates], query) >= 0
+        else:
+            found = np.fromiter((query in self.values[i] for i in candidates), dtype=bool, count=len(candidates))
+        matches = candidates[found]
+        self._last_query = query
+        self._last_matches = matches
+        return matches
+
+    def mask(self, query, out=None):
+        """Mask bool theo dòng; nếu có out thì OR trực tiếp vào out"""
+        lookup = np.zeros(len(self.values) + 1, dtype=bool)  # Phần tử cuối cho mã -1 (ô trống)
+        lookup[self.matching_values(query)] = True
+        rows = lookup[self.codes]
+        if out is None:
+            return rows
+        np.logical_or(out, rows, out=out)
+        return out
+
+
+class DataFrameSearchIndex:
+    """Tìm kiếm chuỗi con (không phân biệt hoa thường) trên một hoặc tất cả các cột"""
+
+    def __init__(self, df):
+        self.df = df
+        self.columns = {column: _ColumnIndex(df[column]) for column in df.columns}
+
+    def __len__(self):
+        return len(self.df)
+
+    def mask(self, query, column=None):
+        """Mask bool theo dòng cho query; column=None để tìm trên tất cả các cột"""
+        query = (query or "").strip().lower()
+        if not query:
+            return np.ones(len(self.df), dtype=bool)
+        if column is not None:
+            return self.columns[column].mask(query)
+        result = np.zeros(len(self.df), dtype=bool)
+        for index in self.columns.values():
+            index.mask(query, out=result)
+        return result
@@ -0,0 +1,195 @@
+"""
+Module shopee_api.py
+Lấy sản phẩm Shopee từ JSON của API tìm kiếm mà chính trang gọi (không đọc DOM):
+  - Driver bật performance log (goog:loggingPrefs) để nhận sự kiện CDP Network.*
+  - Bắt request tới SEARCH_API_PATH, chờ Network.loadingFinished rồi đọc body bằng Network.getResponseBody
+  - Trang tiếp theo: gửi lại đúng request đó (đổi tham số newest) bằng fetch trong trang, kèm header của trang;
+    nếu bị từ chối thì mở trang kết quả tiếp theo và bắt response như trang đầu
+"""
+
+import json
+import time
+import base64
+import logging
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from .config import SHOPEE_CAPTURE_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+SEARCH_API_PATH = "/api/v4/search/search_items"
+PRODUCT_URL = "https://shopee.vn/product/{shopid}/{itemid}"
+PRICE_DIVISOR = 100000  # Giá trong API nhân 100000
+
+# Header trình duyệt tự đặt, fetch() không cho gán (hoặc là pseudo-header HTTP/2)
+_FORBIDDEN_HEADERS = {"cookie", "user-agent", "referer", "host", "content-length", "accept-encoding",
+                      "connection", "origin"}
+
+_FETCH_JS = """
+var url = arguments[0];
+var headers = arguments[1];
+var done = arguments[arguments.length - 1];
+fetch(url, {credentials: 'include', headers: headers})
+    .then(function (response) {
+        return response.text().then(function (text) { done({status: response.status, body: text}); });
+    })
+    .catch(function (error) { done({status: 0, body: String(error)}); });
+"""
+
+
+def enable_capture(options):
+    """Bật performance log (chỉ sự kiện Network) cho Options của Chrome/Brave"""
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+    return options
+
+
+def format_price(value):
+    """Giá API (đơn vị 1/100000 đồng) -> chuỗi "₫123.000" như trên trang"""
+    if value in (None, ""):
+        return ""
+    return "₫" + f"{int(value) // PRICE_DIVISOR:,}".replace(",", ".")
+
+
+def _raw_items(data):
+    if not isinstance(data, dict):
+        return []
+    items = data.get("items")
+    if items is None and isinstance(data.get("data"), dict):
+        items = data["data"].get("items")
+    return items or []
+
+
+def parse_search_items(data, limit=None):
+    """JSON của API tìm kiếm -> list dict sản phẩm (name, price, url, shopid, itemid, sold, rating)"""
+    products = []
+    for item in _raw_items(data):
+        basic = item.get("item_basic") or item
+        name = basic.get("name")
+        if not name or basic.get("itemid") is None:
+            continue
+        price = basic.get("price")
+        if price is None:
+            price = basic.get("price_min")
+        rating = basic.get("item_rating") or {}
+        products.append({
+            "name": name,
+            "price": format_price(price),
+            "url": PRODUCT_URL.format(shopid=basic.get("shopid"), itemid=basic.get("itemid")),
+            "shopid": basic.get("shopid"),
+            "itemid": basic.get("itemid"),
+            "sold": basic.get("historical_sold", basic.get("sold")),
+            "rating": rating.get("rating_star"),
+        })
+        if limit and len(products) >= limit:
+            break
+    return products
+
+
+def has_more(data, limit):
+    """Còn trang sau không (theo cờ nomore, hoặc trang hiện tại đủ limit sản phẩm)"""
+    if not isinstance(data, dict) or data.get("nomore"):
+        return False
+    return len(_raw_items(data)) >= limit > 0
+
+
+def page_request_url(api_url, page):
+    """URL API của trang page (0 = trang đầu), đổi tham số newest theo limit của request gốc"""
+    parts = urlsplit(api_url)
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    limit = int(dict(params).get("limit") or 60)
+    params = [(key, str(page * limit) if key == "newest" else value) for key, value in params]
+    if "newest" not in dict(params):
+        params.append(("newest", str(page * limit)))
+    return urlunsplit(parts._replace(query=urlencode(params)))
+
+
+def request_limit(api_url):
+    return int(dict(parse_qsl(urlsplit(api_url).query)).get("limit") or 60)
+
+
+class ShopeeNetworkCapture:
+    """Đọc response API tìm kiếm của Shopee từ performance log của một driver"""
+
+    def __init__(self, driver, api_path=SEARCH_API_PATH):
+        self.driver = driver
+        self.api_path = api_path
+        self.request = None  # {"url": ..., "headers": {...}} của request tìm kiếm gần nhất
+
+    def drain(self):
+        """Bỏ các sự kiện cũ trong log (gọi trước khi mở trang cần bắt)"""
+        try:
+            self.driver.get_log("performance")
+        except Exception:
+            pass
+
+    def wait_for_response(self, timeout=SHOPEE_CAPTURE_TIMEOUT, poll=0.1):
+        """
+        Chờ request API tìm kiếm tải xong, trả về JSON của response (None nếu quá hạn hoặc lỗi).
+        Request (url, header) được giữ lại để gửi lại cho các trang sau.
+        """
+        pending = {}
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            for entry in self.driver.get_log("performance"):
+                try:
+                    message = json.loads(entry["message"])["message"]
+                except (KeyError, TypeError, ValueError):
+                    continue
+                method = message.get("method")
+                params = message.get("params", {})
+                if method == "Network.requestWillBeSent":
+                    request = params.get("request", {})
+                    if self.api_path in request.get("url", ""):
+                        pending[params["requestId"]] = {"url": request["url"],
+                                                        "headers": request.get("headers", {})}
+                elif method == "Network.responseReceived" and params.get("requestId") in pending:
+                    pending[params["requestId"]]["status"] = params.get("response", {}).get("status")
+                elif method == "Network.loadingFinished" and params.get("requestId") in pending:
+                    request = pending.pop(params["requestId"])
+                    if request.get("status", 200) != 200:
+                        logger.warning(f"API tìm kiếm Shopee trả về HTTP {request.get('status')}")
+                        continue
+                    data = self._response_json(params["requestId"])
+                    if data is not None:
+                        self.request = request
+                        return data
+            time.sleep(poll)
+        return None
+
+    def _response_json(self, request_id):
+        try:
+            response = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+            body = response.get("body") or "null"
+            if response.get("base64Encoded"):
+                body = base64.b64decode(body).decode("utf-8")
+            return json.loads(body)
+        except Exception as e:
+            logger.warning(f"Không đọc được response API Shopee: {e}")
+            return None
+
+    def fetch_page(self, page):
+        """
+        Gửi lại request tìm kiếm cho trang page bằng fetch trong trang (cookie và header giống trang gửi).
+        Trả về JSON, hoặc None nếu chưa bắt được request nào hoặc server từ chối.
+        """
+        if not self.request:
+            return None
+        headers = {key: value for key, value in self.request["headers"].items()
+                   if not key.startswith(":") and key.lower() not in _FORBIDDEN_HEADERS
+                   and not key.lower().startswith(("sec-", "proxy-"))}
+        try:
+            result = self.driver.execute_async_script(_FETCH_JS, page_request_url(self.request["url"], page), headers)
+        except Exception as e:
+            logger.warning(f"Gửi lại request API Shopee thất bại: {e}")
+            return None
+        if not result or result.get("status") != 200:
+            return None
+        try:
+            data = json.loads(result.get("body") or "null")
+        except ValueError:
+            return None
+        # API từ chối (chống bot) vẫn trả 200 kèm mã lỗi
+        if not isinstance(data, dict) or data.get("error"):
+            return None
+        return data
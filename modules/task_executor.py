@@ -0,0 +1,251 @@
+"""
+Module task_executor.py
+Bộ thực thi task đứng sau scheduler:
+  - Số task chạy đồng thời có giới hạn (pool thread dùng chung)
+  - Giới hạn riêng theo trang đích (Google/Facebook/Shopee) và theo proxy
+  - Hàng đợi FIFO có ưu tiên: task ưu tiên cao chạy trước, cùng ưu tiên thì theo thứ tự vào hàng
+  - Back-pressure: task cần trình duyệt chỉ được chạy khi browser pool còn chỗ
+"""
+
+import time
+import heapq
+import itertools
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from .config import (
+    TASK_EXECUTOR_MAX_WORKERS, TASK_EXECUTOR_SITE_LIMITS,
+    TASK_EXECUTOR_PROXY_LIMIT, TASK_EXECUTOR_MAX_QUEUE
+)
+from .browser_pool import get_browser_pool
+
+# Dấu hiệu nhận biết trang đích trong nội dung script
+SITE_MARKERS = {
+    "google": ("google.com", "google.com.vn", "trends.google"),
+    "facebook": ("facebook.com", "fb.com", "messenger.com"),
+    "shopee": ("shopee.vn", "shopee.com", "shopee.co"),
+}
+
+
+def detect_site(text):
+    """Đoán trang đích của script từ nội dung (None nếu không nhận ra)"""
+    text = (text or "").lower()
+    for site, markers in SITE_MARKERS.items():
+        if any(marker in text for marker in markers):
+            return site
+    return None
+
+
+class TaskJob:
+    """Một lần chạy task: func(job) chạy trong thread của executor, trả về kết quả"""
+
+    def __init__(self, task_id, func, priority=0, site=None, proxy=None, browser_key=None, name=None):
+        self.task_id = task_id
+        self.func = func
+        self.priority = priority
+        self.site = site
+        self.proxy = proxy or None
+        self.browser_key = browser_key  # PoolKey nếu task cần trình duyệt từ browser pool
+        self.name = name or task_id
+        self.cancelled = False
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def cancel(self):
+        """Hủy job còn trong hàng đợi (job đang chạy sẽ chạy tới hết)"""
+        self.cancelled = True
+
+
+class TaskExecutor(QObject):
+    """Hàng đợi ưu tiên + pool thread có giới hạn theo trang đích và proxy"""
+    task_queued = pyqtSignal(str, int)             # task_id, số job đang chờ
+    task_started = pyqtSignal(str)                 # task_id
+    task_finished = pyqtSignal(str, bool, object)  # task_id, thành công, kết quả hoặc thông báo lỗi
+    log_signal = pyqtSignal(str)
+
+    def __init__(self, max_workers=TASK_EXECUTOR_MAX_WORKERS, site_limits=None,
+                 proxy_limit=TASK_EXECUTOR_PROXY_LIMIT, max_queue=TASK_EXECUTOR_MAX_QUEUE,
+                 browser_pool=None, parent=None):
+        super().__init__(parent)
+        self.max_workers = max_workers
+        self.site_limits = dict(TASK_EXECUTOR_SITE_LIMITS if site_limits is None else site_limits)
+        self.proxy_limit = proxy_limit
+        self.max_queue = max_queue
+        self.browser_pool = browser_pool or get_browser_pool()
+
+        self._cond = threading.Condition()
+        self._queue = []          # heap (-priority, seq, job)
+        self._counter = itertools.count()
+        self._queued_ids = {}     # task_id -> job đang chờ
+        self._running = {}        # task_id -> job đang chạy
+        self._site_counts = {}
+        self._proxy_counts = {}
+        self._browser_counts = {}  # PoolKey -> số job đang giữ/chuẩn bị lấy trình duyệt
+        self._closed = False
+        self._threads = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="task-executor")
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="task-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    # ---------------- API ----------------
+    def submit(self, job):
+        """Đưa job vào hàng đợi. Trả về False nếu hàng đợi đầy hoặc task đang chờ/đang chạy"""
+        with self._cond:
+            if self._closed:
+                return False
+            if job.task_id in self._queued_ids or job.task_id in self._running:
+                self.log_signal.emit(f"⚠️ Task {job.name} đang chờ hoặc đang chạy, bỏ qua lần kích hoạt này")
+                return False
+            if len(self._queued_ids) >= self.max_queue:
+                self.log_signal.emit(f"⚠️ Hàng đợi task đã đầy ({self.max_queue}), bỏ qua task {job.name}")
+                return False
+            heapq.heappush(self._queue, (-job.priority, next(self._counter), job))
+            self._queued_ids[job.task_id] = job
+            waiting = len(self._queued_ids)
+            self._cond.notify_all()
+        self.task_queued.emit(job.task_id, waiting)
+        return True
+
+    def cancel(self, task_id):
+        """Hủy task đang chờ trong hàng đợi"""
+        with self._cond:
+            job = self._queued_ids.pop(task_id, None)
+            if job is None:
+                return False
+            job.cancel()
+            self._cond.notify_all()
+        return True
+
+    def is_active(self, task_id):
+        with self._cond:
+            return task_id in self._queued_ids or task_id in self._running
+
+    def stats(self):
+        with self._cond:
+            return {
+                "queued": len(self._queued_ids),
+                "running": len(self._running),
+                "max_workers": self.max_workers,
+                "sites": dict(self._site_counts),
+                "proxies": dict(self._proxy_counts)
+            }
+
+    def shutdown(self, wait=False):
+        """Dừng nhận task mới, hủy các task đang chờ"""
+        with self._cond:
+            self._closed = True
+            for job in self._queued_ids.values():
+                job.cancel()
+            self._queued_ids.clear()
+            self._queue = []
+            self._cond.notify_all()
+        self._threads.shutdown(wait=wait)
+
+    # ---------------- ĐIỀU PHỐI ----------------
+    def _dispatch_loop(self):
+        while True:
+            with self._cond:
+                job = None
+                while not self._closed:
+                    job = self._take_runnable()
+                    if job is not None:
+                        break
+                    # Chờ có slot trống; timeout để kiểm tra lại browser pool (được giải phóng ở nơi khác)
+                    self._cond.wait(1.0)
+                if self._closed:
+                    return
+                self._acquire_slots(job)
+            self._threads.submit(self._run, job)
+
+    def _take_runnable(self):
+        """Job đầu tiên (theo ưu tiên, rồi FIFO) đủ điều kiện chạy; job bị chặn không cản job sau"""
+        if len(self._running) >= self.max_workers:
+            return None
+        for entry in sorted(self._queue):
+            job = entry[2]
+            if job.cancelled:
+                continue
+            if not self._has_slots(job):
+                continue
+            self._queue.remove(entry)
+            heapq.heapify(self._queue)
+            self._queued_ids.pop(job.task_id, None)
+            return job
+        # Dọn các job đã hủy
+        self._queue = [e for e in self._queue if not e[2].cancelled]
+        heapq.heapify(self._queue)
+        return None
+
+    def _has_slots(self, job):
+        if job.site and self._site_counts.get(job.site, 0) >= self.site_limits.get(job.site, self.max_workers):
+            return False
+        if job.proxy and self._proxy_counts.get(job.proxy, 0) >= self.proxy_limit:
+            return False
+        if job.browser_key is not None:
+            # Tính cả job đã được điều phối nhưng chưa kịp acquire để không giao quá số trình duyệt
+            in_flight = self._browser_counts.get(job.browser_key, 0)
+            if in_flight >= self.browser_pool.capacity(job.browser_key):
+                return False
+            if sum(self._browser_counts.values()) >= self.browser_pool.max_total:
+                return False
+            if not self.browser_pool.has_free_slot(job.browser_key):
+                return False
+        return True
+
+    def _acquire_slots(self, job):
+        self._running[job.task_id] = job
+        if job.site:
+            self._site_counts[job.site] = self._site_counts.get(job.site, 0) + 1
+        if job.proxy:
+            self._proxy_counts[job.proxy] = self._proxy_counts.get(job.proxy, 0) + 1
+        if job.browser_key is not None:
+            self._browser_counts[job.browser_key] = self._browser_counts.get(job.browser_key, 0) + 1
+
+    def _release_slots(self, job):
+        with self._cond:
+            self._running.pop(job.task_id, None)
+            for counts, key in ((self._site_counts, job.site), (self._proxy_counts, job.proxy),
+                                (self._browser_counts, job.browser_key)):
+                if key is not None and key in counts:
+                    counts[key] -= 1
+                    if counts[key] <= 0:
+                        del counts[key]
+            self._cond.notify_all()
+
+    def _run(self, job):
+        job.started_at = time.time()
+        self.task_started.emit(job.task_id)
+        wait = job.started_at - job.submitted_at
+        self.log_signal.emit(f"▶️ Bắt đầu task {job.name} (chờ {wait:.1f}s trong hàng đợi)")
+        success = False
+        result = None
+        try:
+            result = job.func(job)
+            success = result is not False
+        except Exception as e:
+            result = str(e)
+            self.log_signal.emit(f"❌ Task {job.name} lỗi: {e}")
+            traceback.print_exc()
+        finally:
+            job.finished_at = time.time()
+            self._release_slots(job)
+        self.log_signal.emit(
+            f"{'✅' if success else '❌'} Task {job.name} kết thúc sau {job.finished_at - job.started_at:.1f}s"
+        )
+        self.task_finished.emit(job.task_id, success, result)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_task_executor():
+    """Trả về TaskExecutor dùng chung (tạo ở thread giao diện để signal được chuyển đúng thread)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = TaskExecutor()
+        return _executor
@@ -14,25 +14,32 @@ from PyQt5.QtWidgets import QLineEdit
 import time
 import traceback
 from .config import THEMES, DEFAULT_THEME
+from .scheduler_core import TaskHeap, parse_run_time, format_run_time
+from .schedules import Schedule, ScheduleError
 
 class TaskSchedulerWidget(QWidget):
     task_scheduled = pyqtSignal(dict)  # Signal khi task được lên lịch
     task_ready = pyqtSignal(str, str)  # task_id, script_path - khi đến thời gian chạy task
     task_log = pyqtSignal(str)  # Signal để gửi thông báo log
+    task_cancelled = pyqtSignal(str)  # task_id - khi task bị xóa (hủy nếu còn trong hàng đợi thực thi)
     
     def __init__(self, parent=None):
         super().__init__(parent)
         self.tasks = []
-        self.running_tasks = {}  # Dictionary of task_id: timer
+        self.running_tasks = {}  # task_id -> thời điểm bắt đầu chạy (do bộ thực thi báo về)
         self.task_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "scheduled_tasks.json")
+        
+        # Heap theo thời điểm chạy kế tiếp + một timer duy nhất cho deadline sớm nhất
+        self.task_heap = TaskHeap()
+        self.schedules = {}  # task_id -> (chữ ký cấu hình lịch, Schedule đã biên dịch)
+        self.fire_timer = QTimer(self)
+        self.fire_timer.setSingleShot(True)
+        self.fire_timer.setTimerType(Qt.PreciseTimer)
+        self.fire_timer.timeout.connect(self.check_scheduled_tasks)
+        
         self.init_ui()
         self.load_tasks()
         
-        # Timer để kiểm tra tasks cần chạy
-        self.check_timer = QTimer(self)
-        self.check_timer.timeout.connect(self.check_scheduled_tasks)
-        self.check_timer.start(60000)  # Check mỗi phút
-        
     def init_ui(self):
         layout = QVBoxLayout(self)
         
@@ -93,9 +100,23 @@ class TaskSchedulerWidget(QWidget):
         form_layout.addRow("Lặp lại:", self.repeat_check)
         
         self.repeat_interval = QComboBox()
-        self.repeat_interval.addItems(["Hàng ngày", "Hàng tuần", "Hàng tháng"])
+        self.repeat_interval.addItems(["Hàng giờ", "Hàng ngày", "Hàng tuần", "Hàng tháng", "Theo khoảng (giây)", "Cron"])
+        self.repeat_interval.setCurrentText("Hàng ngày")
         form_layout.addRow("Chu kỳ lặp:", self.repeat_interval)
         
+        self.repeat_value = QLineEdit()
+        self.repeat_value.setPlaceholderText("Số giây (vd: 300) hoặc biểu thức cron (vd: */15 8-18 * * mon-fri)")
+        form_layout.addRow("Khoảng / Cron:", self.repeat_value)
+        
+        self.timezone_edit = QLineEdit()
+        self.timezone_edit.setPlaceholderText("Múi giờ IANA, vd: Asia/Ho_Chi_Minh (để trống = giờ máy)")
+        form_layout.addRow("Múi giờ:", self.timezone_edit)
+        
+        self.jitter_spin = QSpinBox()
+        self.jitter_spin.setRange(0, 3600)
+        self.jitter_spin.setSuffix(" giây")
+        form_layout.addRow("Dời ngẫu nhiên tối đa:", self.jitter_spin)
+        
         form_group.setLayout(form_layout)
         layout.addWidget(form_group)
         
@@ -154,6 +175,7 @@ class TaskSchedulerWidget(QWidget):
                         valid_tasks.append(task)
                         
                     self.tasks = valid_tasks
+                    self.rebuild_schedule()
                     
                     # Phát signal thông báo
                     if hasattr(self, 'task_log'):
@@ -163,6 +185,7 @@ class TaskSchedulerWidget(QWidget):
             else:
                 # Tạo file mới nếu chưa tồn tại
                 self.tasks = []
+                self.rebuild_schedule()
                 self.save_tasks()
                 
                 # Phát signal thông báo
@@ -178,6 +201,7 @@ class TaskSchedulerWidget(QWidget):
                 
             # Tạo danh sách task trống
             self.tasks = []
+            self.rebuild_schedule()
     
     def save_tasks(self):
         """Lưu danh sách task vào file JSON"""
@@ -224,21 +248,9 @@ class TaskSchedulerWidget(QWidget):
                 status = task.get('status', 'Chưa chạy')
                 
                 # Định dạng thời gian hiển thị
-                try:
-                    # Thử chuyển đổi thời gian sang định dạng đẹp hơn
-                    dt = None
-                    try:
-                        dt = datetime.datetime.strptime(run_time, "%Y-%m-%d %H:%M:%S")
-                    except ValueError:
-                        try:
-                            dt = datetime.datetime.strptime(run_time, "yyyy-MM-dd hh:mm:ss")
-                        except ValueError:
-                            pass
-                            
-                    if dt:
-                        run_time = dt.strftime("%d/%m/%Y %H:%M")
-                except:
-                    pass
+                dt = self.task_heap.when(task.get('id')) or parse_run_time(run_time)
+                if dt:
+                    run_time = dt.strftime("%d/%m/%Y %H:%M:%S")
                 
                 item_text = f"{name} - {run_time}"
                 
@@ -246,8 +258,9 @@ class TaskSchedulerWidget(QWidget):
                 item_text += f" [{status}]"
                 
                 # Thêm thông tin lặp lại
-                if task.get('repeat'):
-                    item_text += f" (Lặp lại: {task.get('repeat_interval', 'Không xác định')})"
+                schedule = self.get_schedule(task)
+                if schedule is not None and schedule.repeating:
+                    item_text += f" (Lặp lại: {schedule.describe()})"
                     
                 # Thêm thông tin script
                 script = task.get('script', 'Không có script')
@@ -262,8 +275,8 @@ class TaskSchedulerWidget(QWidget):
                 # Set màu dựa trên trạng thái
                 if not task.get('enabled', True):
                     item.setForeground(QBrush(QColor("#888888")))  # Màu xám cho task bị tắt
-                elif status == "Running":
-                    item.setForeground(QBrush(QColor("#2ecc71")))  # Màu xanh lá cho task đang chạy
+                elif status in ("Running", "Queued"):
+                    item.setForeground(QBrush(QColor("#2ecc71")))  # Màu xanh lá cho task đang chạy/chờ chạy
                 elif status == "Failed":
                     item.setForeground(QBrush(QColor("#e74c3c")))  # Màu đỏ cho task lỗi
                 elif status == "Completed":
@@ -280,55 +293,75 @@ class TaskSchedulerWidget(QWidget):
     
     def is_task_due_soon(self, task):
         """Kiểm tra xem task có sắp chạy trong 15 phút tới không"""
+        schedule_time = self.task_heap.when(task.get('id')) or parse_run_time(task.get('run_time'))
+        if not schedule_time:
+            return False
+            
+        diff = (schedule_time - datetime.datetime.now()).total_seconds() / 60  # Chênh lệch phút
+        
+        # Trả về True nếu task sẽ chạy trong 15 phút tới và chưa quá hạn
+        return 0 <= diff <= 15
+    
+    def get_schedule(self, task):
+        """Schedule đã biên dịch của task (cache, chỉ biên dịch lại khi cấu hình lịch thay đổi)"""
+        task_id = task.get('id')
+        signature = repr((task.get('schedule'), task.get('repeat'), task.get('repeat_interval'), task.get('recurring')))
+        cached = self.schedules.get(task_id)
+        if cached and cached[0] == signature:
+            return cached[1]
+            
         try:
-            run_time = task.get('run_time', '')
-            if not run_time:
-                return False
-                
-            # Thử nhiều định dạng thời gian khác nhau
-            schedule_time = None
-            try:
-                schedule_time = datetime.datetime.strptime(run_time, "%Y-%m-%d %H:%M:%S")
-            except ValueError:
-                try:
-                    schedule_time = datetime.datetime.strptime(run_time, "%Y-%m-%d %H:%M")
-                except ValueError:
-                    try:
-                        schedule_time = datetime.datetime.strptime(run_time, "yyyy-MM-dd hh:mm:ss")
-                    except ValueError:
-                        # Thử chuyển đổi từ QDateTime string
-                        date_parts = run_time.split(" ")
-                        if len(date_parts) >= 2:
-                            date_str = date_parts[0]
-                            time_str = date_parts[1]
-                            
-                            # Xử lý date
-                            date_parts = date_str.split("-")
-                            if len(date_parts) == 3:
-                                year = int(date_parts[0])
-                                month = int(date_parts[1])
-                                day = int(date_parts[2])
-                                
-                                # Xử lý time
-                                time_parts = time_str.split(":")
-                                if len(time_parts) >= 2:
-                                    hour = int(time_parts[0])
-                                    minute = int(time_parts[1])
-                                    second = int(time_parts[2]) if len(time_parts) > 2 else 0
-                                    
-                                    schedule_time = datetime.datetime(year, month, day, hour, minute, second)
+            schedule = Schedule.from_task(task)
+        except ScheduleError as e:
+            print(f"Lỗi lịch chạy của task {task.get('name', task_id)}: {e}")
+            schedule = None
+        self.schedules[task_id] = (signature, schedule)
+        return schedule
+    
+    def schedule_task(self, task, arm=True):
+        """Đưa task vào heap theo thời điểm chạy kế tiếp (hoặc gỡ ra nếu không cần chạy)"""
+        task_id = task.get('id')
+        self.task_heap.cancel(task_id)
+        
+        if not task.get('enabled', True):
+            return
+        schedule = self.get_schedule(task)
+        if schedule is None:
+            return
+        if task.get('status') == "Completed" and not schedule.repeating:
+            return
             
-            if not schedule_time:
-                return False
-                
-            now = datetime.datetime.now()
-            diff = (schedule_time - now).total_seconds() / 60  # Chênh lệch phút
+        run_time = parse_run_time(task.get('run_time'))
+        if run_time is None:
+            if not schedule.repeating:
+                print(f"Lỗi: thời gian chạy không hợp lệ cho task {task.get('name', task_id)}: {task.get('run_time')}")
+                return
+            run_time = schedule.first_run(datetime.datetime.now())
+            task['run_time'] = format_run_time(run_time)
+        if schedule.repeating and not parse_run_time(task.get('anchor_time')):
+            # Mốc neo của lịch lặp: run_time bị ghi đè sau mỗi lần chạy, mốc này thì không
+            task['anchor_time'] = format_run_time(run_time)
             
-            # Trả về True nếu task sẽ chạy trong 15 phút tới và chưa quá hạn
-            return 0 <= diff <= 15
-        except Exception as e:
-            print(f"Lỗi khi kiểm tra thời gian task: {str(e)}")
-            return False
+        self.task_heap.schedule(task_id, schedule.fire_time(run_time))
+        if arm:
+            self.arm_timer()
+    
+    def rebuild_schedule(self):
+        """Dựng lại heap từ toàn bộ danh sách task (khi tải file hoặc thay đổi hàng loạt)"""
+        self.task_heap.clear()
+        known_ids = {task.get('id') for task in self.tasks}
+        self.schedules = {k: v for k, v in self.schedules.items() if k in known_ids}
+        for task in self.tasks:
+            self.schedule_task(task, arm=False)
+        self.arm_timer()
+    
+    def arm_timer(self):
+        """Hẹn timer đúng tới deadline sớm nhất trong heap"""
+        delay = self.task_heap.seconds_until_next(datetime.datetime.now())
+        if delay is None:
+            self.fire_timer.stop()
+            return
+        self.fire_timer.start(int(delay * 1000) + 1)
     
     def add_task(self):
         """Add a new scheduled task"""
@@ -353,8 +386,34 @@ class TaskSchedulerWidget(QWidget):
             "status": "Scheduled"
         }
         
+        # Lịch nâng cao: khoảng lặp tính bằng giây hoặc biểu thức cron, múi giờ, jitter
+        timezone = self.timezone_edit.text().strip()
+        jitter = self.jitter_spin.value()
+        if repeat and repeat_interval in ("Theo khoảng (giây)", "Cron"):
+            value = self.repeat_value.text().strip()
+            if repeat_interval == "Cron":
+                task["schedule"] = {"type": "cron", "cron": value}
+            else:
+                task["schedule"] = {"type": "interval", "every": float(value) if value.replace(".", "", 1).isdigit() else 0}
+        elif timezone or jitter:
+            task["schedule"] = {}
+        if "schedule" in task:
+            if timezone:
+                task["schedule"]["timezone"] = timezone
+            if jitter:
+                task["schedule"]["jitter"] = jitter
+            try:
+                Schedule.from_task(task)
+            except ScheduleError as e:
+                QMessageBox.warning(self, "Lịch không hợp lệ", str(e))
+                return
+            if task["schedule"].get("type") == "cron":
+                # Cron tự xác định lần chạy đầu tiên, bỏ qua thời gian chọn trên form
+                task["run_time"] = None
+        
         # Add to list and update UI
         self.tasks.append(task)
+        self.schedule_task(task)
         self.update_table()
         
         # Save tasks
@@ -363,7 +422,7 @@ class TaskSchedulerWidget(QWidget):
         # Clear form
         self.task_name.clear()
         
-        QMessageBox.information(self, "Task đã tạo", f"Task '{name}' đã được lập lịch chạy vào {run_time}")
+        QMessageBox.information(self, "Task đã tạo", f"Task '{name}' đã được lập lịch chạy vào {task['run_time']}")
     
     def edit_task(self):
         selected = self.task_list.currentRow()
@@ -371,10 +430,21 @@ class TaskSchedulerWidget(QWidget):
             task = self.tasks[selected]
             dlg = TaskDialog(self, task, is_new=False)
             if dlg.exec_() == QDialog.Accepted:
-                self.tasks[selected] = dlg.get_task_data()
-                # Giữ lại ID gốc
-                if 'id' in task:
-                    self.tasks[selected]['id'] = task['id']
+                # Gộp vào task cũ: dialog không hiển thị id, schedule (timezone, jitter), anchor_time...
+                updated = dict(task)
+                updated.update(dlg.get_task_data())
+                recurring_changed = (updated.get('recurring') or '') != (task.get('recurring') or '')
+                if recurring_changed:
+                    # Lựa chọn lặp trong dialog thay cho lịch lặp kiểu cũ (repeat được ưu tiên hơn recurring)
+                    updated.pop('repeat', None)
+                    updated.pop('repeat_interval', None)
+                if recurring_changed or updated.get('run_time') != task.get('run_time'):
+                    # Đổi thời gian hoặc kiểu lặp: neo lại lịch từ run_time mới, task một lần được chạy lại
+                    updated.pop('anchor_time', None)
+                    if updated.get('status') == "Completed":
+                        updated.pop('status')
+                self.tasks[selected] = updated
+                self.schedule_task(self.tasks[selected])
                 self.update_table()
                 self.save_tasks()
     
@@ -385,7 +455,10 @@ class TaskSchedulerWidget(QWidget):
                                       f"Xóa task '{self.tasks[selected]['name']}'?",
                                       QMessageBox.Yes | QMessageBox.No)
             if reply == QMessageBox.Yes:
+                self.task_heap.cancel(self.tasks[selected].get('id'))
+                self.task_cancelled.emit(self.tasks[selected].get('id'))
                 del self.tasks[selected]
+                self.arm_timer()
                 self.update_table()
                 self.save_tasks()
     
@@ -415,142 +488,108 @@ class TaskSchedulerWidget(QWidget):
         enabled = state == Qt.Checked
         for task in self.tasks:
             task['enabled'] = enabled
+        self.rebuild_schedule()
         self.update_table()
         self.save_tasks()
     
     def check_scheduled_tasks(self):
-        """Kiểm tra xem có task nào cần chạy không"""
+        """Chạy các task đã đến hạn trong heap rồi hẹn timer cho deadline kế tiếp"""
         current_time = datetime.datetime.now()
-        
-        for task in self.tasks:
-            # Bỏ qua nếu task đã đang chạy
-            if task["id"] in self.running_tasks:
-                continue
-                
-            # Bỏ qua nếu task đã hoàn thành và không lặp lại
-            if task["status"] == "Completed" and not task.get("repeat", False):
-                continue
-                
-            # Bỏ qua nếu task bị vô hiệu hóa
-            if not task.get("enabled", True):
+        due = self.task_heap.pop_due(current_time)
+        if not due:
+            self.arm_timer()
+            return
+            
+        tasks_by_id = {task.get('id'): task for task in self.tasks}
+        for fire_time, task_id in due:
+            task = tasks_by_id.get(task_id)
+            # Bỏ qua nếu task đã bị xóa
+            if task is None:
                 continue
                 
-            # Kiểm tra xem đã đến thời gian chạy chưa
             try:
-                # Xử lý định dạng thời gian
-                try:
-                    run_time = datetime.datetime.strptime(task["run_time"], "%Y-%m-%d %H:%M:%S")
-                except ValueError:
-                    try:
-                        run_time = datetime.datetime.strptime(task["run_time"], "yyyy-MM-dd hh:mm:ss")
-                    except ValueError:
-                        # Thử chuyển đổi từ QDateTime string
-                        date_parts = task["run_time"].split(" ")
-                        if len(date_parts) >= 2:
-                            date_str = date_parts[0]
-                            time_str = date_parts[1]
-                            
-                            # Xử lý date
-                            date_parts = date_str.split("-")
-                            if len(date_parts) == 3:
-                                year = int(date_parts[0])
-                                month = int(date_parts[1])
-                                day = int(date_parts[2])
-                                
-                                # Xử lý time
-                                time_parts = time_str.split(":")
-                                if len(time_parts) >= 2:
-                                    hour = int(time_parts[0])
-                                    minute = int(time_parts[1])
-                                    second = int(time_parts[2]) if len(time_parts) > 2 else 0
-                                    
-                                    run_time = datetime.datetime(year, month, day, hour, minute, second)
-                                else:
-                                    continue
-                            else:
-                                continue
-                        else:
-                            continue
-                
-                if current_time >= run_time:
-                    # Chạy task
-                    self.run_task(task)
-                    
-                    # Cập nhật trạng thái - kiểm tra xem 'repeat' có tồn tại không
-                    if "repeat" in task and task["repeat"]:
-                        task["status"] = "Running"
-                    else:
-                        task["status"] = "Completed"
+                if task_id in self.running_tasks:
+                    # Lần chạy trước chưa xong: bỏ qua lần này nhưng vẫn giữ lịch kế tiếp
+                    self.task_log.emit(f"⏭️ Task {task.get('name', task_id)} vẫn đang chạy, bỏ qua lần kích hoạt này")
+                elif self.run_task(task):
                     task["last_run"] = current_time.strftime("%Y-%m-%d %H:%M:%S")
                     
-                    # Tính thời gian chạy tiếp theo nếu lặp lại
-                    if "repeat" in task and task["repeat"]:
-                        if task["repeat_interval"] == "Hàng ngày":
-                            new_run_time = run_time + datetime.timedelta(days=1)
-                        elif task["repeat_interval"] == "Hàng tuần":
-                            new_run_time = run_time + datetime.timedelta(days=7)
-                        elif task["repeat_interval"] == "Hàng tháng":
-                            # Xử lý tháng
-                            new_month = run_time.month + 1
-                            new_year = run_time.year
-                            if new_month > 12:
-                                new_month = 1
-                                new_year += 1
-                            
-                            # Xử lý ngày cuối tháng
-                            last_day = 28
-                            if new_month in [1, 3, 5, 7, 8, 10, 12]:
-                                last_day = 31
-                            elif new_month in [4, 6, 9, 11]:
-                                last_day = 30
-                            elif new_month == 2:
-                                # Xử lý năm nhuận
-                                if (new_year % 4 == 0 and new_year % 100 != 0) or (new_year % 400 == 0):
-                                    last_day = 29
-                                else:
-                                    last_day = 28
-                            
-                            new_day = min(run_time.day, last_day)
-                            new_run_time = datetime.datetime(new_year, new_month, new_day, 
-                                                           run_time.hour, run_time.minute, run_time.second)
-                        
-                        task["run_time"] = new_run_time.strftime("%Y-%m-%d %H:%M:%S")
+                # Kể cả khi không khởi động được (vd script tạm thời thiếu), task lặp vẫn giữ lịch kế tiếp
+                schedule = self.get_schedule(task)
+                if schedule is None or not schedule.repeating:
+                    continue
+                    
+                # Thời điểm kế tiếp tính từ mốc neo của lịch (bỏ qua các lần đã lỡ khi ứng dụng không chạy)
+                base = parse_run_time(task.get("anchor_time")) or parse_run_time(task.get("run_time")) or fire_time
+                new_run_time = schedule.next_after(base, current_time)
+                if new_run_time is not None:
+                    task["run_time"] = format_run_time(new_run_time)
+                    self.schedule_task(task, arm=False)
             except Exception as e:
-                print(f"Lỗi khi kiểm tra task {task.get('name', 'unknown')}: {str(e)}")
-                import traceback
+                print(f"Lỗi khi chạy task {task.get('name', 'unknown')}: {str(e)}")
                 print(traceback.format_exc())
                 
-        # Cập nhật bảng với trạng thái mới
+        # Chỉ lưu và vẽ lại khi thực sự có task được kích hoạt
         self.update_table()
         self.save_tasks()
+        self.arm_timer()
 
     def run_task(self, task):
-        """Chạy một task đã lên lịch"""
+        """Chạy một task đã lên lịch, trả về False nếu không khởi động được"""
         script_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "scripts", task["script"])
         
         # Kiểm tra xem script có tồn tại không
         if not os.path.exists(script_path):
             print(f"Lỗi: Script không tồn tại: {script_path}")
             task["status"] = "Failed"
-            self.update_table()
-            self.save_tasks()
-            return
+            return False
             
         # Phát signal để chạy task
         task_id = task["id"]
         print(f"Đang chạy task: {task.get('name', task_id)} với script: {task['script']}")
         
+        # Cập nhật trạng thái trước khi phát signal (chuyển sang Running khi bộ thực thi thực sự bắt đầu chạy);
+        # bộ thực thi từ chối thì on_task_finished đặt lại thành Failed ngay trong lúc emit
+        task["status"] = "Queued"
+        
         # Phát signal để main_window xử lý
         self.task_ready.emit(task_id, script_path)
+        if task["status"] == "Failed":
+            return False
         
         # Phát signal task_log nếu có
         if hasattr(self, 'task_log'):
             self.task_log.emit(f"Task {task.get('name', task_id)} đã được kích hoạt")
-            
-        # Cập nhật trạng thái
-        task["status"] = "Running"
-        self.update_table()
-        self.save_tasks()
+        return True
+
+    def on_task_started(self, task_id):
+        """Bộ thực thi báo task bắt đầu chạy"""
+        self.running_tasks[task_id] = time.time()
+        for task in self.tasks:
+            if task.get('id') == task_id:
+                task['status'] = "Running"
+                self.update_table()
+                break
+
+    def on_task_finished(self, task_id, success, result=None):
+        """Bộ thực thi báo task kết thúc: cập nhật trạng thái và lưu"""
+        started = self.running_tasks.pop(task_id, None)
+        for task in self.tasks:
+            if task.get('id') != task_id:
+                continue
+            schedule = self.get_schedule(task)
+            if not success:
+                task['status'] = "Failed"
+                task['last_error'] = str(result)[:500] if result is not None else ""
+            elif schedule is not None and schedule.repeating:
+                task['status'] = "Scheduled"
+            else:
+                task['status'] = "Completed"
+            if started:
+                task['last_duration'] = round(time.time() - started, 1)
+            self.update_table()
+            self.save_tasks()
+            break
 
     def update_script_list(self):
         """Update the list of available scripts"""
@@ -576,13 +615,14 @@ class TaskSchedulerWidget(QWidget):
         for row in sorted(selected_rows, reverse=True):
             if 0 <= row < len(self.tasks):
                 task_id = self.tasks[row]["id"]
-                # Stop timer if running
-                if task_id in self.running_tasks:
-                    self.running_tasks[task_id].stop()
-                    del self.running_tasks[task_id]
+                # Hủy nếu task còn trong hàng đợi thực thi
+                self.running_tasks.pop(task_id, None)
+                self.task_cancelled.emit(task_id)
                     
+                self.task_heap.cancel(task_id)
                 self.tasks.pop(row)
                 
+        self.arm_timer()
         self.update_table()
         self.save_tasks()
 
@@ -760,13 +800,11 @@ class TaskDialog(QDialog):
         
         # Nếu là task đã tồn tại, đặt thời gian lên lịch
         if 'run_time' in self.task:
-            try:
-                dt = datetime.datetime.strptime(self.task['run_time'], "%Y-%m-%d %H:%M")
+            dt = parse_run_time(self.task['run_time'])
+            if dt:
                 self.datetime_edit.setDateTime(QDateTime(
                     dt.year, dt.month, dt.day, dt.hour, dt.minute
                 ))
-            except:
-                pass
                 
         basic_layout.addRow("Thời gian chạy:", self.datetime_edit)
         
@@ -0,0 +1,127 @@
+"""
+Module telemetry.py
+Ghi thời gian từng giai đoạn của task tự động hóa thành sự kiện JSON-lines (chỉ ghi thêm):
+  - Mỗi lần chạy worker có một run id; mỗi giai đoạn (driver_setup, navigation, wait_for_element,
+    extraction, pagination, teardown, ...) là một dòng với thời lượng (ms), proxy và kết quả
+  - Kết quả: "ok", "timeout", "error" (kèm tên exception) hoặc giá trị do code gọi tự đặt (vd "fallback")
+  - File mặc định logs/telemetry.jsonl; phân tích p50/p95/p99 bằng analyze_telemetry.py
+"""
+
+import os
+import json
+import time
+import uuid
+import threading
+from contextlib import contextmanager
+
+from .config import TELEMETRY_ENABLED, TELEMETRY_FILE
+
+# Site ứng với từng task của EnhancedAutomationWorker
+TASK_SITES = {
+    "google": "google",
+    "google_batch": "google",
+    "facebook": "facebook",
+    "shopee": "shopee",
+}
+
+
+class TelemetryWriter:
+    """Ghi thêm sự kiện vào file JSONL (dùng chung giữa các thread)"""
+
+    def __init__(self, path=TELEMETRY_FILE):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, event):
+        line = json.dumps(event, ensure_ascii=False, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class RunTelemetry:
+    """Thời gian các giai đoạn của một lần chạy task"""
+
+    def __init__(self, task, proxy=None, writer=None, **fields):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.task = task
+        self.site = TASK_SITES.get(task, task)
+        self.proxy = proxy
+        self.fields = fields
+        self.writer = writer
+        self.started = time.perf_counter()
+
+    def event(self, phase, duration_ms, outcome="ok", **fields):
+        """Ghi một sự kiện (lỗi ghi không làm hỏng task)"""
+        if self.writer is None:
+            return
+        event = {
+            "ts": round(time.time(), 3),
+            "run": self.run_id,
+            "task": self.task,
+            "site": self.site,
+            "phase": phase,
+            "ms": round(duration_ms, 1),
+            "outcome": outcome,
+            "proxy": self.proxy,
+            "thread": threading.current_thread().name,
+        }
+        event.update(self.fields)
+        event.update(fields)
+        try:
+            self.writer.write(event)
+        except Exception:
+            pass
+
+    @contextmanager
+    def span(self, phase, **fields):
+        """
+        Đo thời gian một khối lệnh. Khối lệnh có thể thêm trường hoặc đặt "outcome" vào dict được yield;
+        exception được ghi lại rồi ném tiếp.
+        """
+        details = dict(fields)
+        started = time.perf_counter()
+        try:
+            yield details
+        except Exception as e:
+            name = type(e).__name__
+            details.setdefault("outcome", "timeout" if "Timeout" in name else "error")
+            details.setdefault("error", name)
+            raise
+        finally:
+            outcome = details.pop("outcome", "ok")
+            self.event(phase, (time.perf_counter() - started) * 1000, outcome, **details)
+
+    def finish(self, success, **fields):
+        """Sự kiện "run" với tổng thời gian của lần chạy"""
+        self.event("run", (time.perf_counter() - self.started) * 1000,
+                   "ok" if success else "error", **fields)
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_telemetry_writer():
+    """Trả về TelemetryWriter dùng chung (None nếu tắt telemetry hoặc không mở được file)"""
+    global _writer
+    if not TELEMETRY_ENABLED:
+        return None
+    with _writer_lock:
+        if _writer is None:
+            try:
+                _writer = TelemetryWriter()
+            except OSError:
+                return None
+        return _writer
+
+
+def start_run(task, proxy=None, **fields):
+    """RunTelemetry cho một lần chạy mới, ghi vào file dùng chung"""
+    return RunTelemetry(task, proxy, get_telemetry_writer(), **fields)
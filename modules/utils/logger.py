@@ -1,34 +1,135 @@
 import os
+import json
+import queue
+import atexit
 import logging
 import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
 
-def setup_logging(log_level=logging.INFO):
+from ..config import (
+    LOGS_DIR, LOG_FORMAT, LOG_DATE_FORMAT,
+    LOG_FILE_MAX_BYTES, LOG_BACKUP_COUNT, LOG_JSON_FILE
+)
+
+_listener = None
+_queue_handler = None
+
+
+class SizedTimedRotatingFileHandler(TimedRotatingFileHandler):
+    """Xoay file log lúc nửa đêm hoặc khi file vượt max_bytes (file cùng ngày được đánh số .1, .2, ...)"""
+
+    def __init__(self, filename, max_bytes=0, backup_count=0, encoding="utf-8"):
+        super().__init__(filename, when="midnight", backupCount=backup_count, encoding=encoding)
+        self.max_bytes = max_bytes
+        self.namer = self._unique_name
+
+    @staticmethod
+    def _unique_name(name):
+        if not os.path.exists(name):
+            return name
+        index = 1
+        while os.path.exists(f"{name}.{index}"):
+            index += 1
+        return f"{name}.{index}"
+
+    def shouldRollover(self, record):
+        if super().shouldRollover(record):
+            return 1
+        if self.max_bytes > 0:
+            if self.stream is None:
+                self.stream = self._open()
+            if self.stream.tell() + len(self.format(record)) + 1 >= self.max_bytes:
+                return 1
+        return 0
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Mỗi bản ghi log là một dòng JSON (kèm các trường truyền qua extra=...)"""
+
+    _STANDARD = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+    def format(self, record):
+        entry = {
+            "time": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in self._STANDARD and not key.startswith("_"):
+                entry[key] = value
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def _build_handlers(log_level, json_file):
+    formatter = logging.Formatter(LOG_FORMAT, LOG_DATE_FORMAT)
+
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(log_level)
+    console_handler.setFormatter(formatter)
+
+    file_handler = SizedTimedRotatingFileHandler(
+        os.path.join(LOGS_DIR, "app.log"), max_bytes=LOG_FILE_MAX_BYTES, backup_count=LOG_BACKUP_COUNT
+    )
+    file_handler.setLevel(logging.DEBUG)  # Ghi chi tiết hơn vào file
+    file_handler.setFormatter(formatter)
+
+    handlers = [console_handler, file_handler]
+    if json_file:
+        json_handler = RotatingFileHandler(
+            os.path.join(LOGS_DIR, "app.jsonl"), maxBytes=LOG_FILE_MAX_BYTES,
+            backupCount=LOG_BACKUP_COUNT, encoding="utf-8"
+        )
+        json_handler.setLevel(logging.DEBUG)
+        json_handler.setFormatter(JsonLinesFormatter())
+        handlers.append(json_handler)
+    return handlers
+
+
+def setup_logging(log_level=logging.INFO, json_file=LOG_JSON_FILE):
     """
-    Thiết lập logging với định dạng và mức độ cụ thể
+    Thiết lập logging với định dạng và mức độ cụ thể.
+    Logger gốc chỉ có một QueueHandler: thread gọi log chỉ đưa bản ghi vào hàng đợi,
+    QueueListener ghi ra console/file ở thread riêng. Gọi lại nhiều lần chỉ đổi mức log.
     """
-    # Tạo thư mục logs nếu chưa tồn tại
-    log_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'logs')
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
-    
-    # Tạo tên file log theo ngày-tháng-năm
-    today = datetime.datetime.now().strftime('%Y-%m-%d')
-    log_file = os.path.join(log_dir, f'app_{today}.log')
-    
-    # Cấu hình logging
-    logging.basicConfig(
-        level=log_level,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S',
-        handlers=[
-            logging.FileHandler(log_file, encoding='utf-8'),
-            logging.StreamHandler()
-        ]
-    )
-    
+    global _listener, _queue_handler
+    root_logger = logging.getLogger()
+
+    if _listener is None:
+        os.makedirs(LOGS_DIR, exist_ok=True)
+
+        # Xóa các handler cũ nếu có (basicConfig hoặc thư viện khác đã gắn)
+        for handler in list(root_logger.handlers):
+            root_logger.removeHandler(handler)
+
+        log_queue = queue.SimpleQueue()  # Không giới hạn nên put() không bao giờ chặn
+        _queue_handler = QueueHandler(log_queue)
+        root_logger.addHandler(_queue_handler)
+        _listener = QueueListener(log_queue, *_build_handlers(log_level, json_file), respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+    root_logger.setLevel(log_level)
+    _listener.handlers[0].setLevel(log_level)
+
     # Giảm log level của một số module gây noise
     logging.getLogger('urllib3').setLevel(logging.WARNING)
     logging.getLogger('selenium').setLevel(logging.WARNING)
+    logging.getLogger('requests').setLevel(logging.WARNING)
     logging.getLogger('webdriver_manager').setLevel(logging.INFO)
-    
-    return logging.getLogger() 
\ No newline at end of file
+
+    return root_logger
+
+
+def shutdown_logging():
+    """Ghi nốt các bản ghi còn trong hàng đợi và đóng file log"""
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    logging.getLogger().removeHandler(_queue_handler)
+    _listener = None
+    _queue_handler = None
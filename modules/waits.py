@@ -0,0 +1,204 @@
+"""
+Module waits.py
+Chờ theo điều kiện thay cho time.sleep cố định (xong ngay khi trang sẵn sàng, chậm nhất bằng timeout):
+  - Điều kiện là hàm driver -> giá trị (truthy = đạt), dùng được với WebDriverWait như expected_conditions
+  - Ghép điều kiện bằng all_of / any_of
+  - min_children: container có ít nhất N phần tử con
+  - network_idle: không có request nào trong idle_ms (bộ đếm fetch/XHR + Resource Timing,
+    cài vào mọi trang qua CDP Page.addScriptToEvaluateOnNewDocument)
+  - dom_stable: không có thay đổi DOM (MutationObserver) trong quiet_ms
+
+Ví dụ:
+    wait_until(driver, all_of(min_children((By.ID, "search"), 5), network_idle(300)), timeout=10)
+"""
+
+from selenium.common.exceptions import (
+    NoSuchElementException, StaleElementReferenceException, TimeoutException, WebDriverException
+)
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from .config import WAIT_TIMEOUT, WAIT_POLL_INTERVAL, NETWORK_IDLE_MS, DOM_QUIET_MS
+
+# Đếm request fetch/XHR đang chạy và thời điểm có hoạt động mạng gần nhất (performance.now())
+_NETWORK_TRACKER_JS = """
+(function () {
+    if (window.__waitsNet) return;
+    var state = window.__waitsNet = {inflight: 0, last: 0};
+    function begin() { state.inflight++; state.last = performance.now(); }
+    function end() { state.inflight = Math.max(0, state.inflight - 1); state.last = performance.now(); }
+    try { performance.setResourceTimingBufferSize(5000); } catch (e) {}
+    if (window.fetch) {
+        var fetch = window.fetch;
+        window.fetch = function () {
+            begin();
+            return fetch.apply(this, arguments).then(
+                function (response) { end(); return response; },
+                function (error) { end(); throw error; }
+            );
+        };
+    }
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        begin();
+        this.addEventListener('loadend', end);
+        return send.apply(this, arguments);
+    };
+})();
+"""
+
+# Trả về [số request đang chạy, số ms từ lần hoạt động mạng gần nhất]
+_NETWORK_STATE_JS = """
+var state = window.__waitsNet || {inflight: 0, last: 0};
+var last = state.last;
+var entries = performance.getEntriesByType('resource');
+for (var i = entries.length - 1; i >= 0 && i >= entries.length - 50; i--) {
+    last = Math.max(last, entries[i].responseEnd);
+}
+if (document.readyState !== 'complete') return [state.inflight + 1, 0];
+return [state.inflight, performance.now() - last];
+"""
+
+# Gắn MutationObserver lên target (lần gọi đầu), trả về số ms từ lần thay đổi DOM gần nhất
+_DOM_QUIET_JS = """
+var target = arguments[0] || document.body;
+if (!target) return 0;
+if (!target.__waitsObserver) {
+    target.__waitsLast = performance.now();
+    target.__waitsObserver = new MutationObserver(function () { target.__waitsLast = performance.now(); });
+    target.__waitsObserver.observe(target, {childList: true, subtree: true, characterData: true, attributes: true});
+    return 0;
+}
+return performance.now() - target.__waitsLast;
+"""
+
+IGNORED_EXCEPTIONS = (NoSuchElementException, StaleElementReferenceException)
+
+
+# ---------------- CHỜ ----------------
+def wait_until(driver, condition, timeout=WAIT_TIMEOUT, poll=WAIT_POLL_INTERVAL, message=""):
+    """Chờ tới khi condition(driver) trả về giá trị truthy và trả về giá trị đó (TimeoutException nếu quá hạn)"""
+    return WebDriverWait(driver, timeout, poll_frequency=poll,
+                         ignored_exceptions=IGNORED_EXCEPTIONS).until(condition, message)
+
+
+def wait_optional(driver, condition, timeout=WAIT_TIMEOUT, poll=WAIT_POLL_INTERVAL):
+    """Như wait_until nhưng trả về None khi quá hạn (cho các bước không bắt buộc như popup)"""
+    try:
+        return wait_until(driver, condition, timeout, poll)
+    except TimeoutException:
+        return None
+
+
+def wait_for_page_load(driver, timeout=WAIT_TIMEOUT, idle_ms=NETWORK_IDLE_MS):
+    """Chờ document load xong và mạng rảnh idle_ms (không báo lỗi khi trang có request chạy mãi)"""
+    return wait_optional(driver, all_of(document_ready(), network_idle(idle_ms)), timeout)
+
+
+def install_network_tracker(driver):
+    """
+    Cài bộ đếm request vào mọi trang sẽ mở (CDP) và trang hiện tại.
+    Gọi lại nhiều lần không sao; trình duyệt không hỗ trợ CDP thì chỉ dựa vào Resource Timing.
+    """
+    if getattr(driver, "_waits_tracker", False):
+        return
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": _NETWORK_TRACKER_JS})
+        driver._waits_tracker = True
+    except (AttributeError, WebDriverException):
+        pass
+    try:
+        driver.execute_script(_NETWORK_TRACKER_JS)
+    except WebDriverException:
+        pass
+
+
+# ---------------- ĐIỀU KIỆN ----------------
+def all_of(*conditions):
+    """Đạt khi mọi điều kiện đều đạt; trả về list giá trị"""
+    def _predicate(driver):
+        values = []
+        for condition in conditions:
+            value = condition(driver)
+            if not value:
+                return False
+            values.append(value)
+        return values
+    return _predicate
+
+
+def any_of(*conditions):
+    """Đạt khi một điều kiện bất kỳ đạt; trả về giá trị của điều kiện đó"""
+    def _predicate(driver):
+        for condition in conditions:
+            try:
+                value = condition(driver)
+            except IGNORED_EXCEPTIONS:
+                continue
+            if value:
+                return value
+        return False
+    return _predicate
+
+
+def element_present(locator):
+    return EC.presence_of_element_located(locator)
+
+
+def element_clickable(locator):
+    return EC.element_to_be_clickable(locator)
+
+
+def min_children(locator, count=1):
+    """Container (locator) có ít nhất count phần tử con; trả về container"""
+    def _predicate(driver):
+        container = driver.find_element(*locator)
+        if driver.execute_script("return arguments[0].children.length", container) >= count:
+            return container
+        return False
+    return _predicate
+
+
+def min_elements(locator, count=1):
+    """Trang có ít nhất count phần tử khớp locator; trả về list phần tử"""
+    def _predicate(driver):
+        elements = driver.find_elements(*locator)
+        return elements if len(elements) >= count else False
+    return _predicate
+
+
+def document_ready():
+    def _predicate(driver):
+        return driver.execute_script("return document.readyState") == "complete"
+    return _predicate
+
+
+def url_changed(old_url):
+    def _predicate(driver):
+        return driver.current_url != old_url
+    return _predicate
+
+
+def url_contains(fragment):
+    return EC.url_contains(fragment)
+
+
+def staleness_of(element):
+    """Element cũ đã bị gỡ khỏi DOM (trang đã chuyển hoặc danh sách đã render lại)"""
+    return EC.staleness_of(element)
+
+
+def network_idle(idle_ms=NETWORK_IDLE_MS):
+    """Không có request fetch/XHR đang chạy và không có tài nguyên nào tải xong trong idle_ms"""
+    def _predicate(driver):
+        inflight, quiet_ms = driver.execute_script(_NETWORK_STATE_JS)
+        return inflight == 0 and quiet_ms >= idle_ms
+    return _predicate
+
+
+def dom_stable(locator=None, quiet_ms=DOM_QUIET_MS):
+    """Không có thay đổi DOM trong quiet_ms (trong container locator, hoặc cả trang)"""
+    def _predicate(driver):
+        target = driver.find_element(*locator) if locator else None
+        return driver.execute_script(_DOM_QUIET_JS, target) >= quiet_ms
+    return _predicate
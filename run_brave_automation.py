@@ -7,14 +7,19 @@ Công cụ tự động hóa với Brave Browser
 
 import os
 import sys
-import time
 import argparse
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from webdriver_manager.chrome import ChromeDriverManager
+
+from modules.driver_resolver import resolve_chromedriver
+from modules.dom_extractor import extract, GOOGLE_RESULT_SPEC, SHOPEE_PRODUCT_SPEC
+from modules.waits import (
+    wait_until, wait_optional, wait_for_page_load, install_network_tracker,
+    document_ready, element_present, min_children, dom_stable, staleness_of
+)
 
 # Đường dẫn mặc định của Brave
 DEFAULT_BRAVE_PATH = r"C:\Program Files\BraveSoftware\Brave-Browser\Application\brave.exe"
@@ -53,7 +58,7 @@ def run_brave_automation(task="google", keyword=None, headless=False, keep_open=
     
     # Thiết lập ChromeDriver
     print("Đang thiết lập ChromeDriver...")
-    chromedriver_path = ChromeDriverManager().install()
+    chromedriver_path = resolve_chromedriver(brave_path)
     print(f"✅ ChromeDriver: {chromedriver_path}")
     
     # Thiết lập options
@@ -106,11 +111,12 @@ def run_brave_automation(task="google", keyword=None, headless=False, keep_open=
             delete window.cdc_adoQpoasnfa76pfcZLmcfl_Symbol;
         '''
     })
+    install_network_tracker(driver)
     
     try:
         # Xác nhận trình duyệt
         driver.get("chrome://version")
-        time.sleep(1)
+        wait_until(driver, document_ready())
         page_source = driver.page_source.lower()
         
         if "brave" in page_source:
@@ -157,17 +163,17 @@ def run_google_search(driver, keyword):
     # Truy cập Google
     print("Đang truy cập Google...")
     driver.get("https://www.google.com")
-    time.sleep(2)
     
     # Tìm kiếm
     print("Đang tìm kiếm...")
-    search_box = driver.find_element(By.NAME, "q")
+    search_box = wait_until(driver, element_present((By.NAME, "q")))
     search_box.clear()
     search_box.send_keys(keyword)
     search_box.send_keys(Keys.RETURN)
     
-    # Đợi kết quả
-    time.sleep(2)
+    # Đợi kết quả (trang cũ được thay thế và khối kết quả đã có nội dung)
+    wait_until(driver, staleness_of(search_box))
+    wait_until(driver, min_children((By.ID, "search"), 1))
     
     # Lấy tiêu đề trang
     print(f"✅ Tiêu đề trang: {driver.title}")
@@ -175,20 +181,12 @@ def run_google_search(driver, keyword):
     # Thu thập kết quả
     try:
         print("\nĐang thu thập kết quả tìm kiếm...")
-        results = driver.find_elements(By.CSS_SELECTOR, "div.g")
-        
-        if not results:
-            results = driver.find_elements(By.XPATH, "//div[@jscontroller]//a[@jsname]/../../..")
+        results = extract(driver, GOOGLE_RESULT_SPEC)
         
         print(f"Đã tìm thấy {len(results)} kết quả, hiển thị 5 kết quả đầu tiên:")
         
         for i, result in enumerate(results[:5]):
-            try:
-                title = result.find_element(By.CSS_SELECTOR, "h3").text
-                link = result.find_element(By.CSS_SELECTOR, "a").get_attribute("href")
-                print(f"\n{i+1}. {title}\n   URL: {link}")
-            except:
-                continue
+            print(f"\n{i+1}. {result['title']}\n   URL: {result['url']}")
     except Exception as e:
         print(f"Lỗi khi thu thập kết quả: {e}")
 
@@ -199,7 +197,7 @@ def run_facebook_task(driver):
     # Truy cập Facebook
     print("Đang truy cập Facebook...")
     driver.get("https://www.facebook.com")
-    time.sleep(3)
+    wait_for_page_load(driver)
     
     # Kiểm tra đã đăng nhập chưa
     if "facebook.com/home" in driver.current_url or "/login" not in driver.current_url:
@@ -214,7 +212,7 @@ def run_shopee_task(driver, keyword):
     # Truy cập Shopee
     print("Đang truy cập Shopee...")
     driver.get("https://shopee.vn")
-    time.sleep(5)
+    wait_for_page_load(driver, timeout=15)
     
     # Tìm kiếm
     try:
@@ -224,34 +222,31 @@ def run_shopee_task(driver, keyword):
             for button in close_buttons:
                 if button.is_displayed():
                     button.click()
-                    time.sleep(1)
+                    wait_optional(driver, staleness_of(button), timeout=3)
                     break
         except:
             pass
         
         # Tìm kiếm
         print(f"Đang tìm kiếm: {keyword}")
-        search_box = driver.find_element(By.CSS_SELECTOR, "input[type='text']")
+        search_box = wait_until(driver, element_present((By.CSS_SELECTOR, "input[type='text']")))
         search_box.clear()
         search_box.send_keys(keyword)
         search_box.send_keys(Keys.RETURN)
         
-        # Đợi kết quả
-        time.sleep(3)
+        # Đợi kết quả: danh sách sản phẩm có phần tử và ngừng render thêm
+        results = (By.CSS_SELECTOR, ".shopee-search-item-result__items")
+        wait_until(driver, min_children(results, 1), timeout=15)
+        wait_optional(driver, dom_stable(results))
         
         # Thu thập kết quả
         print("Đang thu thập kết quả...")
-        product_items = driver.find_elements(By.CSS_SELECTOR, "div.shopee-search-item-result__item")
+        product_items = extract(driver, SHOPEE_PRODUCT_SPEC)
         
         print(f"Đã tìm thấy {len(product_items)} sản phẩm, hiển thị 5 sản phẩm đầu tiên:")
         
         for i, item in enumerate(product_items[:5]):
-            try:
-                name = item.find_element(By.CSS_SELECTOR, 'div.ie3A\\+n').text
-                price = item.find_element(By.CSS_SELECTOR, 'div.vioxXd').text
-                print(f"\n{i+1}. {name}\n   Giá: {price}")
-            except:
-                continue
+            print(f"\n{i+1}. {item['name']}\n   Giá: {item['price']}")
                 
     except Exception as e:
         print(f"Lỗi khi thực hiện tác vụ Shopee: {e}")